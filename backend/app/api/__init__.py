@@ -8,6 +8,10 @@ from app.api.news import router as news_router
 from app.api.questions import router as questions_router
 from app.api.search import router as search_router
 from app.api.chat import router as chat_router
+from app.api.home import router as home_router
+from app.api.sync import router as sync_router
+from app.api.push import router as push_router
+from app.api.facets import router as facets_router
 
 # Include all routers
 api_router.include_router(learning_router, prefix="/learning", tags=["learning"])
@@ -15,3 +19,7 @@ api_router.include_router(news_router, prefix="/news", tags=["news"])
 api_router.include_router(questions_router, prefix="/questions", tags=["questions"])
 api_router.include_router(search_router, prefix="/search", tags=["search"])
 api_router.include_router(chat_router, prefix="/chat", tags=["chat"])
+api_router.include_router(home_router, prefix="/home", tags=["home"])
+api_router.include_router(sync_router, prefix="/sync", tags=["sync"])
+api_router.include_router(push_router, prefix="/push", tags=["push"])
+api_router.include_router(facets_router, prefix="/facets", tags=["facets"])
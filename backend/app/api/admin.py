@@ -0,0 +1,76 @@
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.database import engine_registry
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import is_admin, route_profiles, sampling_session
+
+router = APIRouter()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """校验 X-Admin-Token 请求头，未配置 ADMIN_TOKEN 时管理接口不可用"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="管理员令牌无效")
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def sample_profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=100),
+    idle: bool = False,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """
+    对当前工作进程的所有线程采样调用栈
+
+    collapsed 格式可直接用于 flamegraph.pl 或 speedscope，json 格式返回摘要和栈顶函数排行。
+    """
+    if sampling_session.busy:
+        raise HTTPException(status_code=409, detail="已有采样分析正在运行")
+    profile = await sampling_session.run(seconds, interval_ms / 1000, include_idle=idle)
+    if format == "json":
+        return {**profile.summary(), "collapsed": profile.to_collapsed()}
+    filename = f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    return PlainTextResponse(
+        profile.to_collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/profile/requests", response_model=List[Dict[str, Any]], dependencies=[Depends(require_admin)])
+async def list_request_profiles():
+    """按路由列出已累计的请求分析结果"""
+    return route_profiles.summary()
+
+@router.get("/profile/requests/report", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def request_profile_report(
+    route: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls|time)$"),
+    limit: int = Query(30, ge=1, le=500),
+):
+    """输出某个路由累计的 cProfile 报告"""
+    report = route_profiles.report(route, sort, limit)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"路由 {route} 没有分析结果")
+    return report
+
+@router.delete("/profile/requests", dependencies=[Depends(require_admin)])
+async def reset_request_profiles():
+    """清除累计的请求分析结果"""
+    route_profiles.reset()
+    return {"status": "ok"}
+
+@router.get("/loop", dependencies=[Depends(require_admin)])
+async def loop_health():
+    """事件循环监控状态和最近的阻塞回调（含阻塞时的调用栈）"""
+    return loop_monitor.stats()
+
+@router.get("/db", dependencies=[Depends(require_admin)])
+async def database_health():
+    """立即检查主库和只读副本的连接，返回各自状态"""
+    return await engine_registry.check_health()
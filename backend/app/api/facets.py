@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Callable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.facets import EntityFacets, FacetCount, FacetsResponse
+from app.services.facet_service import DIMENSIONS, facet_service
+from app.services.news_service import news_service
+from app.services.search_service import search_service
+from app.core.database import get_async_read_db, get_async_session_factory
+
+router = APIRouter()
+
+@router.get("", response_model=FacetsResponse)
+async def get_facets(
+    types: Optional[List[str]] = Query(None, alias="type", description="内容类型，可重复，默认全部（news、learning、questions）"),
+    q: Optional[str] = Query(None, description="只统计匹配该关键词的内容"),
+    tag: Optional[List[str]] = Query(None, description="只统计同时带有这些标签的内容，可重复"),
+    db: AsyncSession = Depends(get_async_read_db),
+    session_factory: Callable = Depends(get_async_session_factory)
+):
+    """获取筛选项的分面计数（新闻分类、学习难度、问题分类和各类标签）"""
+    keyword = q.strip() if q else None
+    items = []
+    for entity_type in types or DIMENSIONS:
+        if entity_type not in DIMENSIONS:
+            continue
+        item_ids = await search_service.matching_ids(entity_type, keyword, db) if keyword else None
+        total, counts = await facet_service.facets(session_factory, entity_type, item_ids=item_ids, tags=tag)
+        facets = {
+            dimension: [FacetCount(value=value, count=count) for value, count in values]
+            for dimension, values in counts.items()
+        }
+        if entity_type == "news":
+            # 雪球分类即使没有内容也作为筛选项返回，"全部"的数量就是 total
+            present = {facet.value for facet in facets["category"]}
+            facets["category"] += [
+                FacetCount(value=category, count=0)
+                for category in await news_service.get_xueqiu_categories()
+                if category != "全部" and category not in present
+            ]
+        items.append(EntityFacets(type=entity_type, total=total, facets=facets))
+    return FacetsResponse(query=keyword, items=items)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Callable
+
+from app.models.home import HomeFeed
+from app.services.home_service import home_service
+from app.core.database import get_async_read_session_factory
+
+router = APIRouter()
+
+@router.get("", response_model=HomeFeed)
+async def get_home_feed(
+    limit: int = Query(5, ge=1, le=20),
+    session_factory: Callable = Depends(get_async_read_session_factory)
+):
+    """获取首页聚合数据（最新新闻、推荐学习、热门问题）"""
+    return await home_service.get_home(session_factory, limit)
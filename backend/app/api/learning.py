@@ -6,33 +6,33 @@ import traceback
 
 from app.models.learning import LearningItem, LearningList, LearningCreate, LearningUpdate, Learning
 from app.services.learning_service import learning_service
-from app.core.database import get_async_db
+from app.core.database import get_async_db, get_async_read_db
 from app.core.logging import logger
 
 router = APIRouter()
 
 @router.get("/debug", response_model=Dict[str, Any])
 async def debug_learning_items(
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """调试端点：获取原始学习内容列表"""
     response = {"success": False, "error": None, "items": []}
     try:
         logger.info("开始执行调试查询")
         query = select(Learning)
-        logger.info(f"查询: {query}")
+        logger.debug("查询: %s", query)
         
         result = await db.execute(query)
-        logger.info("查询执行完成")
+        logger.debug("查询执行完成")
         
         items = result.scalars().all()
-        logger.info(f"获取到 {len(items)} 条记录")
+        logger.info("获取到 %d 条记录", len(items))
         
         # 手动转换为字典列表
         item_dicts = []
         for item in items:
             try:
-                logger.info(f"处理记录ID: {item.id}")
+                logger.debug("处理记录ID: %s", item.id)
                 item_dict = {
                     "id": item.id,
                     "title": item.title,
@@ -44,24 +44,24 @@ async def debug_learning_items(
                 
                 try:
                     item_dict["tags"] = item.tags_list
-                    logger.info(f"成功获取标签: {item_dict['tags']}")
+                    logger.debug("成功获取标签: %s", item_dict["tags"])
                 except Exception as e:
-                    logger.error(f"获取标签失败: {str(e)}")
+                    logger.error("获取标签失败: %s", e)
                     item_dict["tags"] = []
                     item_dict["tags_error"] = str(e)
                     
                 try:
                     item_dict["related_items"] = item.related_items_list
-                    logger.info(f"成功获取相关项目: {item_dict['related_items']}")
+                    logger.debug("成功获取相关项目: %s", item_dict["related_items"])
                 except Exception as e:
-                    logger.error(f"获取相关项目失败: {str(e)}")
+                    logger.error("获取相关项目失败: %s", e)
                     item_dict["related_items"] = []
                     item_dict["related_items_error"] = str(e)
                     
                 item_dicts.append(item_dict)
-                logger.info(f"成功添加记录到结果列表")
+                logger.debug("成功添加记录到结果列表")
             except Exception as e:
-                logger.error(f"处理记录时出错: {str(e)}")
+                logger.error("处理记录时出错: %s", e)
                 item_dicts.append({"error": str(e), "traceback": traceback.format_exc()})
         
         response["success"] = True
@@ -80,15 +80,16 @@ async def debug_learning_items(
 @router.get("", response_model=LearningList)
 async def get_learning_items(
     difficulty: Optional[str] = None,
-    db: AsyncSession = Depends(get_async_db)
+    tag: Optional[List[str]] = Query(None, description="按标签筛选，可重复，需同时带有全部标签"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取学习内容列表"""
-    return await learning_service.get_all(db=db, difficulty=difficulty)
+    return await learning_service.get_all(db=db, difficulty=difficulty, tags=tag)
 
 @router.get("/{item_id}", response_model=LearningItem)
 async def get_learning_item(
     item_id: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取特定学习内容详情"""
     return await learning_service.get_by_id(item_id, db=db)
@@ -96,7 +97,7 @@ async def get_learning_item(
 @router.get("/search/{keyword}", response_model=LearningList)
 async def search_learning_items(
     keyword: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """搜索学习内容"""
     return await learning_service.search(keyword, db=db)
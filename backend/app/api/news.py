@@ -2,13 +2,12 @@ from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-import aiohttp
 
 from app.models.news import NewsItem, NewsList
 from app.services.news_service import news_service
 from app.services.xueqiu_service import xueqiu_service
 from app.services.sina_service import sina_service
-from app.core.database import get_async_db
+from app.core.database import get_async_read_db
 from app.core.config import settings
 
 router = APIRouter()
@@ -19,15 +18,16 @@ class Message(BaseModel):
 @router.get("", response_model=NewsList)
 async def get_news_items(
     category: Optional[str] = None,
-    db: AsyncSession = Depends(get_async_db)
+    tag: Optional[List[str]] = Query(None, description="按标签筛选，可重复，需同时带有全部标签"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取新闻列表"""
-    return await news_service.get_all(db=db, category=category)
+    return await news_service.get_all(db=db, category=category, tags=tag)
 
 @router.get("/{news_id}", response_model=NewsItem)
 async def get_news_item(
     news_id: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取特定新闻详情"""
     news = await news_service.get_by_id(news_id, db=db)
@@ -38,7 +38,7 @@ async def get_news_item(
 @router.get("/search/{keyword}", response_model=NewsList)
 async def search_news(
     keyword: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """搜索新闻内容"""
     return await news_service.search(keyword, db=db)
@@ -91,7 +91,8 @@ async def fetch_xueqiu_news(category: Optional[str] = "全部"):
             if category in category_mapping:
                 params["category"] = category_mapping[category]
         
-        # 发送请求
+        # 发送请求，aiohttp 导入较慢，首次请求时再导入
+        import aiohttp
         async with aiohttp.ClientSession() as session:
             async with session.get(url, params=params, headers=headers) as response:
                 if response.status != 200:
@@ -0,0 +1,57 @@
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.push_service import news_broker, format_sse
+
+router = APIRouter()
+
+async def _sse_stream(subscription):
+    """SSE消息流，空闲时定期发送心跳"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await subscription.get(timeout=settings.PUSH_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield format_sse(None)
+                continue
+            if event is None:
+                # 订阅因消费过慢被丢弃，通知客户端重连并补齐
+                yield "event: dropped\ndata: {}\n\n"
+                break
+            yield format_sse(event)
+    finally:
+        subscription.close()
+
+@router.get("/news/sse")
+async def subscribe_news_sse():
+    """通过Server-Sent Events订阅新入库新闻通知"""
+    subscription = news_broker.subscribe()
+    return StreamingResponse(
+        _sse_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/news/ws")
+async def subscribe_news_ws(websocket: WebSocket):
+    """通过WebSocket订阅新入库新闻通知"""
+    await websocket.accept()
+    subscription = news_broker.subscribe()
+    try:
+        while True:
+            try:
+                event = await subscription.get(timeout=settings.PUSH_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ping"})
+                continue
+            if event is None:
+                await websocket.close(code=1013, reason="subscriber too slow")
+                break
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
@@ -4,33 +4,50 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.questions import QuestionItem, QuestionList
 from app.services.questions_service import questions_service
-from app.core.database import get_async_db
+from app.services.view_counter import view_counter
+from app.core.database import get_async_read_db
 
 router = APIRouter()
 
 @router.get("", response_model=QuestionList)
 async def get_questions(
     category: Optional[str] = None,
-    db: AsyncSession = Depends(get_async_db)
+    tag: Optional[List[str]] = Query(None, description="按标签筛选，可重复，需同时带有全部标签"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取问题列表"""
-    return await questions_service.get_all(db=db, category=category)
+    return await questions_service.get_all(db=db, category=category, tags=tag)
+
+@router.get("/most-viewed", response_model=QuestionList)
+async def get_most_viewed_questions(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """获取浏览量最高的问题（基于内存中的浏览计数）"""
+    ranking = view_counter.most_viewed(limit)
+    items = await questions_service.get_by_ids([question_id for question_id, _ in ranking], db=db)
+    for item in items:
+        item.viewCount += view_counter.pending(item.id)
+    return QuestionList(items=items, total=len(items))
 
 @router.get("/{question_id}", response_model=QuestionItem)
 async def get_question(
     question_id: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取特定问题详情"""
     question = await questions_service.get_by_id(question_id, db=db)
     if not question:
         raise HTTPException(status_code=404, detail=f"未找到ID为{question_id}的问题")
+    # 浏览次数先在内存中累加，由后台任务批量写入数据库
+    view_counter.increment(question_id)
+    question.viewCount += view_counter.pending(question_id)
     return question
 
 @router.get("/search/{keyword}", response_model=QuestionList)
 async def search_questions(
     keyword: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """搜索问题"""
     return await questions_service.search(keyword, db=db)
@@ -39,7 +56,7 @@ async def search_questions(
 async def get_related_questions(
     question_id: str, 
     limit: int = Query(5, ge=1, le=10),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """获取相关问题列表"""
     return await questions_service.get_related_questions(question_id, limit, db=db) 
\ No newline at end of file
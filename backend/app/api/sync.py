@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sync import SyncResponse
+from app.services.sync_service import sync_service
+from app.core.database import get_async_read_db
+
+router = APIRouter()
+
+@router.get("", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """获取自since游标以来的增量变更（新增/更新与删除）"""
+    return await sync_service.get_changes(db, since, limit)
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TableVersions:
+    """记录每张表的数据版本号，事务提交后自增，用于判断缓存是否过期"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, table_name: str) -> None:
+        """标记表数据已变更"""
+        self._versions[table_name] = self._versions.get(table_name, 0) + 1
+
+    def get(self, table_name: str) -> int:
+        """获取表的当前版本号"""
+        return self._versions.get(table_name, 0)
+
+    def snapshot(self, table_names: Iterable[str]) -> Tuple[int, ...]:
+        """获取一组表的版本号快照"""
+        return tuple(self.get(name) for name in table_names)
+
+
+class VersionedCache:
+    """
+    按表版本号失效的结果缓存
+
+    缓存项记录构建时依赖表的版本号快照，只有依赖的表发生变更后才会重新构建；
+    同一个键的并发未命中只会触发一次构建。
+    """
+
+    def __init__(self, versions: "TableVersions"):
+        self._versions = versions
+        self._entries: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_or_build(
+        self,
+        key: str,
+        tables: Iterable[str],
+        builder: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        获取缓存结果，依赖的表变更后重新构建
+
+        Args:
+            key: 缓存键
+            tables: 结果依赖的表名
+            builder: 构建结果的协程函数
+
+        Returns:
+            缓存的结果
+        """
+        tables = tuple(tables)
+        entry = self._entries.get(key)
+        if entry and entry[0] == self._versions.snapshot(tables):
+            return entry[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # 在构建前记录版本号，构建期间发生的提交会让下一次请求重新构建
+            versions = self._versions.snapshot(tables)
+            entry = self._entries.get(key)
+            if entry and entry[0] == versions:
+                return entry[1]
+
+            value = await builder()
+            self._entries[key] = (versions, value)
+            return value
+
+    def invalidate(self, key: str = None) -> None:
+        """清除指定缓存项，不指定键时清空全部"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+def _changed_tables(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changed_tables(session, flush_context):
+    """记录本次事务中写入过的表"""
+    changed = _changed_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name:
+            changed.add(table_name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_tables(session):
+    """事务提交后更新表版本号"""
+    changed = session.info.pop("changed_tables", None)
+    for table_name in changed or ():
+        table_versions.bump(table_name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session):
+    """事务回滚后丢弃变更记录"""
+    session.info.pop("changed_tables", None)
+
+
+# 创建单例
+table_versions = TableVersions()
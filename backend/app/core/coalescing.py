@@ -0,0 +1,207 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.metrics import metrics
+
+# 所有合并组，按名称索引，用于统计输出
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    合并相同键的并发调用
+
+    同一时刻相同键只执行一次计算，其余调用等待并共享同一个结果（或异常）。
+    结果对象在调用者之间共享，调用方不得修改返回值。
+    """
+
+    def __init__(self, name: str):
+        """
+        初始化合并组
+
+        Args:
+            name: 合并组名称，用于统计
+        """
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0  # 总调用次数
+        self.executions = 0  # 实际执行次数
+        self.coalesced = 0  # 被合并的调用次数
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行或加入相同键的进行中计算
+
+        Args:
+            key: 合并键
+            fn: 实际执行计算的协程函数
+
+        Returns:
+            计算结果
+        """
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 领头的调用被取消时由当前调用重新执行，而不是跟着失败
+                if future.cancelled():
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # 没有等待者时也要读取异常，避免"exception was never retrieved"警告
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计数据"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+def _freeze(value: Any) -> Hashable:
+    """把参数转换为可哈希的合并键"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _default_key(args: tuple, kwargs: dict) -> Hashable:
+    """默认合并键：忽略数据库会话参数，其余参数全部参与"""
+    key_args = tuple(_freeze(arg) for arg in args if not isinstance(arg, (AsyncSession, Session)))
+    key_kwargs = tuple(
+        sorted((name, _freeze(value)) for name, value in kwargs.items() if not isinstance(value, (AsyncSession, Session)))
+    )
+    return key_args, key_kwargs
+
+
+def coalesce(name: str = None, key: Callable[..., Hashable] = None):
+    """
+    合并相同参数并发调用的装饰器，用于只读的异步服务方法
+
+    Args:
+        name: 合并组名称，默认使用函数的限定名
+        key: 根据调用参数生成合并键的函数，默认忽略数据库会话后使用全部参数
+    """
+    def decorator(func):
+        group = SingleFlight(name or f"{func.__module__}.{func.__qualname__}")
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key else _default_key(args, kwargs)
+            return await group.do(call_key, lambda: func(*args, **kwargs))
+
+        wrapper.single_flight = group
+        return wrapper
+
+    return decorator
+
+
+def coalescing_stats() -> Dict[str, Dict[str, int]]:
+    """获取所有合并组的统计数据"""
+    return {name: group.stats() for name, group in _groups.items()}
+
+
+@metrics.register_collector
+def _coalescing_metrics():
+    """合并组的调用次数指标"""
+    stats = coalescing_stats()
+    counters = {
+        "coalesce_calls_total": ("合并组的总调用次数", "calls"),
+        "coalesce_executions_total": ("合并组实际执行的次数", "executions"),
+        "coalesce_coalesced_total": ("被合并的调用次数", "coalesced"),
+    }
+    families = [
+        (name, "counter", documentation, [("", {"group": group}, item[key]) for group, item in stats.items()])
+        for name, (documentation, key) in counters.items()
+    ]
+    families.append((
+        "coalesce_inflight", "gauge", "正在执行的合并计算数",
+        [("", {"group": group}, item["inflight"]) for group, item in stats.items()],
+    ))
+    return families
+
+
+class CoalescingMiddleware:
+    """
+    合并相同GET请求的ASGI中间件
+
+    相同路径、查询参数和内容协商请求头的并发GET请求只执行一次，
+    完整响应被缓存在内存中并回放给所有等待的请求，因此只适用于非流式的JSON接口。
+    """
+
+    # 会影响响应内容的请求头，参与合并键计算
+    VARY_HEADERS = (b"accept", b"accept-encoding", b"origin", b"authorization", b"cookie")
+
+    def __init__(self, app, paths: Iterable[str] = ()):
+        """
+        Args:
+            app: 下游ASGI应用
+            paths: 需要合并的路径前缀，按路径段匹配
+        """
+        self.app = app
+        self.paths = tuple(paths)
+        self.flight = SingleFlight("http")
+
+    def _matches(self, path: str) -> bool:
+        """路径等于配置的前缀或位于其下一级，/api/news 不匹配 /api/newsletter"""
+        return any(path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in self.paths)
+
+    def _key(self, scope) -> Hashable:
+        headers = dict(scope.get("headers") or [])
+        return (
+            scope["path"],
+            scope.get("query_string", b""),
+            tuple(headers.get(name, b"") for name in self.VARY_HEADERS),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not self._matches(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def run() -> List[dict]:
+            messages: List[dict] = []
+
+            async def capture(message):
+                messages.append(message)
+
+            await self.app(scope, receive, capture)
+            return messages
+
+        messages = await self.flight.do(self._key(scope), run)
+        for message in messages:
+            await send(message)
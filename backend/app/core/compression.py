@@ -0,0 +1,298 @@
+"""
+大文本列的透明压缩
+
+News.content、Learning.content、Question.answer/content 使用 CompressedText 列类型。
+SQLite 上超过 TEXT_COMPRESSION_MIN_BYTES 的值写入时用 zlib（raw deflate）压缩为BLOB，
+并使用从内容语料训练出的共享预置字典，短文本也能得到较好的压缩率。
+列的声明类型仍是 TEXT，未压缩的旧数据照常读取，迁移可以分批进行。
+PostgreSQL 的 TOAST 已经会压缩大字段，其他数据库上原样存储。
+
+压缩值的格式为 1 字节字典编号（0 表示不使用字典）加 raw deflate 数据。
+已经写入的数据依赖对应编号的字典解压，字典文件发布后不能修改，只能新增编号。
+
+SQL 中需要按内容匹配时（如 LIKE 搜索）使用 plain_text(列)，SQLite 上会通过
+连接上注册的 decompress_text() 函数解压后再比较。
+
+训练新字典:
+    python -m app.core.compression train --output app/core/dictionaries/text-2.zdict
+"""
+import argparse
+import functools
+import json
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from sqlalchemy import Text, bindparam, column, event, func, select, table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+DICTIONARY_DIR = Path(__file__).resolve().parent / "dictionaries"
+
+# zlib 的滑动窗口为 32KB，更长的字典只有最后 32KB 有效
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+# 压缩后至少要节省的比例，否则按原文存储，省去读取时的解压
+MIN_SAVING = 0.1
+
+# 训练字典时按标点和空白切分片段
+_SEGMENT_SEPARATORS = re.compile(r"[\s。！？；，、：:,.!?;（）()“”\"'《》【】\[\]#*>|-]+")
+
+# 使用 CompressedText 的表和列，供迁移和转换已有数据使用
+COMPRESSED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "news": ("content",),
+    "learning": ("content",),
+    "questions": ("content", "answer"),
+}
+
+# 转换已有数据时每批处理的行数
+CONVERT_BATCH = 500
+
+# 运行时注册的字典（基准测试、测试用），编号 -> 字典
+_registered: Dict[int, bytes] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _dictionary_file(dictionary_id: int) -> bytes:
+    path = DICTIONARY_DIR / f"text-{dictionary_id}.zdict"
+    if not path.exists():
+        raise LookupError(f"找不到编号为 {dictionary_id} 的压缩字典: {path}")
+    return path.read_bytes()
+
+
+def get_dictionary(dictionary_id: int) -> bytes:
+    """获取编号对应的字典，编号0表示不使用字典"""
+    if dictionary_id == 0:
+        return b""
+    if dictionary_id in _registered:
+        return _registered[dictionary_id]
+    return _dictionary_file(dictionary_id)
+
+
+def register_dictionary(dictionary_id: int, dictionary: bytes) -> None:
+    """在运行时注册字典，不写入字典目录"""
+    if not 0 < dictionary_id < 256:
+        raise ValueError("字典编号必须在 1-255 之间")
+    _registered[dictionary_id] = dictionary[-MAX_DICTIONARY_SIZE:]
+
+
+def compress_text(
+    value: str, dictionary_id: int = None, level: int = None, min_bytes: int = None,
+) -> Union[str, bytes]:
+    """
+    压缩文本
+
+    Args:
+        value: 文本
+        dictionary_id: 字典编号，默认使用 TEXT_COMPRESSION_DICTIONARY
+        level: 压缩级别，默认使用 TEXT_COMPRESSION_LEVEL
+        min_bytes: 低于该长度（UTF-8字节）不压缩，默认使用 TEXT_COMPRESSION_MIN_BYTES
+
+    Returns:
+        压缩后的字节串；太短或压缩收益不足时返回原文本
+    """
+    raw = value.encode("utf-8")
+    if len(raw) < (settings.TEXT_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes):
+        return value
+    if dictionary_id is None:
+        dictionary_id = settings.TEXT_COMPRESSION_DICTIONARY
+    dictionary = get_dictionary(dictionary_id)
+    level = settings.TEXT_COMPRESSION_LEVEL if level is None else level
+    compressor = (
+        zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+        if dictionary else zlib.compressobj(level, zlib.DEFLATED, -15)
+    )
+    compressed = bytes([dictionary_id]) + compressor.compress(raw) + compressor.flush()
+    if len(compressed) > len(raw) * (1 - MIN_SAVING):
+        return value
+    return compressed
+
+
+def decompress_text(value: Any) -> Any:
+    """解压文本，未压缩的值原样返回"""
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+    value = bytes(value)
+    dictionary = get_dictionary(value[0])
+    decompressor = zlib.decompressobj(-15, zdict=dictionary) if dictionary else zlib.decompressobj(-15)
+    return (decompressor.decompress(value[1:]) + decompressor.flush()).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """
+    透明压缩的文本列类型
+
+    只在 SQLite 上压缩（见模块说明）。与该列比较的值按普通文本绑定，不会被压缩。
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Any:
+        if value is None or dialect.name != "sqlite" or not settings.TEXT_COMPRESSION_ENABLED:
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value: Any, dialect) -> Optional[str]:
+        return decompress_text(value)
+
+    def coerce_compared_value(self, op, value):
+        return Text()
+
+
+class plain_text(FunctionElement):
+    """压缩列的明文，用于 LIKE 等按内容匹配的条件"""
+
+    type = Text()
+    name = "plain_text"
+    inherit_cache = True
+
+
+@compiles(plain_text)
+def _compile_plain_text(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(plain_text, "sqlite")
+def _compile_plain_text_sqlite(element, compiler, **kw):
+    return f"decompress_text({compiler.process(element.clauses, **kw)})"
+
+
+def _sql_decompress_text(value: Any) -> Any:
+    try:
+        return decompress_text(value)
+    except Exception:
+        # SQL 函数中抛出的异常会中止整条语句，无法解压的值按不匹配处理
+        return None
+
+
+@event.listens_for(Engine, "connect")
+def _register_sql_functions(dbapi_connection, connection_record):
+    """在每个新建的SQLite连接（包括 aiosqlite）上注册 decompress_text()"""
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("decompress_text", 1, _sql_decompress_text, deterministic=True)
+
+
+def convert_rows(
+    connection: Connection, table_name: str, columns: Iterable[str], compress: bool = True, batch_size: int = CONVERT_BATCH,
+) -> int:
+    """
+    转换表中已有的数据（仅SQLite）
+
+    按主键分批读取仍是明文（压缩时）或已压缩（解压时）的值并原地更新，
+    每批只持有少量行，可以在大表上运行。转换后需要 VACUUM 才能缩小数据库文件。
+
+    Args:
+        connection: 数据库连接
+        table_name: 表名
+        columns: 要转换的列
+        compress: True 压缩明文，False 解压为明文
+        batch_size: 每批的行数
+
+    Returns:
+        更新的值的数量
+    """
+    columns = list(columns)
+    target = table(table_name, column("id"), *(column(name) for name in columns))
+    stored_as = "text" if compress else "blob"
+    converted = 0
+    for name in columns:
+        col = target.c[name]
+        last_id = None
+        while True:
+            query = select(target.c.id, col).where(func.typeof(col) == stored_as).order_by(target.c.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(target.c.id > last_id)
+            rows = connection.execute(query).all()
+            if not rows:
+                break
+            updates = []
+            for item_id, value in rows:
+                new_value = compress_text(value) if compress else decompress_text(value)
+                # 太短或压缩收益不足的值保持明文
+                if new_value is not value:
+                    updates.append({"item_id": item_id, "value": new_value})
+            if updates:
+                connection.execute(
+                    target.update().where(target.c.id == bindparam("item_id")).values({name: bindparam("value")}),
+                    updates,
+                )
+            converted += len(updates)
+            last_id = rows[-1][0]
+    return converted
+
+
+def _segments(text: str) -> Iterator[str]:
+    for segment in _SEGMENT_SEPARATORS.split(text):
+        if len(segment) >= 2:
+            yield segment
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE, min_documents: int = 2) -> bytes:
+    """
+    从内容语料训练预置字典
+
+    统计各片段出现在多少篇文档中（同一篇文档内的重复压缩时可以直接引用前文），
+    按 出现篇数 x 字节数 选取收益最高的片段直到字典大小上限。
+    deflate 引用距离越短编码越短，收益最高的片段放在字典末尾，离待压缩数据最近。
+
+    Args:
+        samples: 文档文本
+        size: 字典大小上限（字节）
+        min_documents: 片段至少出现在多少篇文档中，语料很少时可以设为1
+
+    Returns:
+        字典
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update(set(_segments(sample)))
+    candidates = sorted(
+        ((count * len(segment.encode("utf-8")), segment) for segment, count in counts.items() if count >= min_documents),
+        reverse=True,
+    )
+    chosen = []
+    total = 0
+    for _, segment in candidates:
+        encoded = segment.encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
+
+def corpus_from_files(paths: Iterable[Path]) -> Iterator[str]:
+    """从JSON数据文件中读取需要压缩的长文本字段"""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for item in json.load(f):
+                for field in ("content", "fullContent", "answer", "fullAnswer"):
+                    if isinstance(item.get(field), str):
+                        yield item[field]
+
+
+def main(argv: Iterable[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="大文本列压缩工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train = subparsers.add_parser("train", help="从JSON数据文件训练压缩字典")
+    train.add_argument("paths", nargs="*", type=Path, help="数据文件，默认使用 DATA_DIR 下的 *_data.json")
+    train.add_argument("--output", type=Path, required=True, help="字典文件，命名为 text-<编号>.zdict")
+    train.add_argument("--size", type=int, default=MAX_DICTIONARY_SIZE, help="字典大小上限（字节）")
+    train.add_argument("--min-documents", type=int, default=2, help="片段至少出现在多少篇文档中")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(Path(settings.DATA_DIR).glob("*_data.json"))
+    dictionary = train_dictionary(corpus_from_files(paths), args.size, args.min_documents)
+    args.output.write_bytes(dictionary)
+    print(f"已从 {len(paths)} 个文件训练出 {len(dictionary)} 字节的字典: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+import logging
 import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from dotenv import load_dotenv
@@ -43,6 +44,9 @@ class Settings(BaseSettings):
     
     # 数据目录
     DATA_DIR: Path = ROOT_DIR / "data"
+    DATA_RELOAD_INTERVAL: float = 2.0  # 检查数据文件变更的间隔（秒），不大于0时关闭热加载
+    DATA_LOG_COMPACT_THRESHOLD: int = 500  # 变更日志达到该条数后在后台合并回JSON文件
+    CATALOG_SNAPSHOT_FILE: str = "catalog.snap"  # 内容目录二进制快照文件名（位于数据目录下）
     
     # 雪球API配置
     XUEQIU_API_ENABLED: bool = os.getenv("XUEQIU_API_ENABLED", "False") == "True"
@@ -52,6 +56,58 @@ class Settings(BaseSettings):
     XUEQIU_FETCH_INTERVAL: int = 3600  # 每小时获取一次
     XUEQIU_NEWS_LIMIT: int = 20  # 每次获取的新闻数量
     
+    # 新浪财经抓取配置：是否在启动时开启每日定时抓取
+    SINA_FETCH_ENABLED: bool = False
+    
+    # 推送配置
+    PUSH_BUFFER_SIZE: int = 100  # 每个订阅者最多缓存的未发送消息数，超出后断开该订阅者
+    PUSH_HEARTBEAT_INTERVAL: int = 15  # 空闲连接的心跳间隔（秒）
+    
+    # 浏览量计数配置
+    VIEW_COUNTER_FLUSH_INTERVAL: float = 5.0  # 浏览量批量写入数据库的间隔（秒）
+    VIEW_COUNTER_SHARDS: int = 16  # 内存计数分片数
+    
+    # 标签索引配置
+    TAG_FACET_LIMIT: int = 50  # 列表接口返回的标签统计的最大数量
+    FACET_REFRESH_SECONDS: float = 300.0  # 分面计数索引整体重建的间隔（秒），用于同步其他进程的写入，不大于0时只增量维护
+    
+    # 大文本列压缩配置（仅SQLite，见 app/core/compression.py）
+    TEXT_COMPRESSION_ENABLED: bool = True  # 关闭后新写入的内容不再压缩，已压缩的内容照常读取
+    TEXT_COMPRESSION_MIN_BYTES: int = 256  # 低于该长度（UTF-8字节）的文本不压缩
+    TEXT_COMPRESSION_LEVEL: int = 6  # zlib 压缩级别
+    TEXT_COMPRESSION_DICTIONARY: int = 1  # 压缩使用的字典编号，对应 app/core/dictionaries/text-<编号>.zdict，0表示不使用字典
+    
+    # 请求合并配置：这些路径前缀下相同的并发GET请求只执行一次
+    COALESCE_PATHS: List[str] = ["/api/news"]
+    
+    # 日志配置
+    LOG_LEVEL: str = ""  # 日志级别，为空时 DEBUG 模式下为 DEBUG，否则为 INFO
+    LOG_FORMAT: str = "json"  # json: 每条记录一行JSON；text: 纯文本
+    LOG_QUEUE_SIZE: int = 10000  # 等待后台线程写入的最大记录数，超出时丢弃新记录
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # 日志器名称 -> WARNING 以下记录的保留比例，如 {"app.api.learning": 0.1}
+    LOG_RATE_LIMIT: float = 20.0  # 同一调用位置每秒最多输出的 ERROR 以下记录数，不大于0时不限流
+    LOG_RATE_BURST: int = 100  # 同一调用位置允许的突发记录数
+    SQL_ECHO: bool = False  # 是否在日志中输出所有SQL语句
+    
+    # 指标配置：是否记录请求指标并在 /metrics 输出
+    METRICS_ENABLED: bool = True
+    
+    # SQL查询统计配置
+    SQL_SLOW_QUERY_MS: float = 200.0  # 单条语句耗时超过该值（毫秒）时记录慢查询日志
+    SQL_QUERY_BUDGET: int = 20  # 单个请求的查询次数超过该值时记录疑似 N+1 警告
+    SQL_REPEAT_THRESHOLD: int = 5  # 同一语句结构在一个请求中执行达到该次数时记录疑似 N+1 警告
+    SERVER_TIMING_ENABLED: bool = True  # 是否在响应中加入 Server-Timing 头
+    
+    # 事件循环监控配置
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.5  # 心跳间隔（秒）
+    LOOP_SLOW_CALLBACK_MS: float = 100.0  # 单个回调执行超过该值（毫秒）时记录阻塞日志和调用栈
+    
+    # 管理接口配置
+    ADMIN_TOKEN: str = ""  # 管理接口（/admin）的访问令牌，通过 X-Admin-Token 请求头传递，为空时关闭管理接口
+    PROFILE_HEADER: str = "X-Profile"  # 带有该请求头和管理员令牌的请求会在 cProfile 下执行
+    PROFILE_MAX_SECONDS: float = 60.0  # 单次采样分析的最长时间（秒）
+    
     # AI聊天相关配置
     OPENAI_API_KEY: str = ""
     AI_MODEL: str = "gpt-3.5-turbo"
@@ -72,17 +128,47 @@ class Settings(BaseSettings):
     # SQLite设置
     SQLITE_DB: str = "app.db"
     
+    # 启动配置
+    DB_CREATE_TABLES_ON_STARTUP: bool = False  # 启动时创建缺少的表，正式环境应通过 python migrate.py --schema-only 显式执行
+    SEED_TEST_DATA: bool = False  # 启动时插入示例新闻（已插入过时跳过）
+    
+    # SQLite 性能配置
+    SQLITE_WAL: bool = True  # 使用 WAL 日志模式，读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 只在检查点时同步磁盘
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 数据库被锁定时的最长等待时间（毫秒）
+    SQLITE_CACHE_SIZE: int = -65536  # 每个连接的页缓存，负数表示KB（64MB）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的最大字节数（256MB），0 表示关闭
+    SQLITE_READ_POOL: bool = True  # 没有只读副本时，只读查询使用主库文件上单独的只读连接池
+    
     # 数据库URL
     DATABASE_URL: str = ""
     ASYNC_DATABASE_URL: str = ""
     SQLALCHEMY_DATABASE_URI: str = ""
     
+    # 读写分离配置：只读查询（列表、详情、搜索）使用只读副本，写操作使用主库
+    DATABASE_READ_URLS: List[str] = []  # 只读副本的异步连接URL，为空时只读查询也使用主库
+    DB_POOL_SIZE: int = 5  # 主库连接池大小（SQLite 使用单独的只读连接池时主库只保留一个写连接）
+    DB_MAX_OVERFLOW: int = 10  # 主库连接池允许超出的连接数
+    DB_WRITE_POOL_TIMEOUT: float = 10.0  # SQLite 主库只有一个写连接时，等待该连接的最长时间（秒），超时的写请求报错
+    DB_READ_POOL_SIZE: int = 5  # 每个只读副本的连接池大小
+    DB_READ_MAX_OVERFLOW: int = 10  # 每个只读副本连接池允许超出的连接数
+    DB_HEALTH_CHECK_INTERVAL: float = 10.0  # 只读副本健康检查间隔（秒），不大于0时只在连接失败时切换
+    DB_HEALTH_CHECK_TIMEOUT: float = 2.0  # 健康检查超时时间（秒）
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # 不可用的副本多久之后重新尝试（秒）
+    
     @field_validator('DEBUG', mode='before')
     def parse_debug(cls, v):
         if isinstance(v, str):
             return v.lower() == "true"
         return v
     
+    @field_validator('LOG_LEVEL')
+    def check_log_level(cls, v):
+        # 在加载配置时拒绝未知的级别名，否则配置日志时 setLevel 才会报错
+        if v and v.upper() not in logging.getLevelNamesMapping():
+            raise ValueError(f"未知的日志级别: {v}")
+        return v.upper()
+    
     @field_validator('DATABASE_URL', mode='before')
     def assemble_db_url(cls, v, values):
         if v:
@@ -1,29 +1,127 @@
-from sqlalchemy import create_engine
+import asyncio
+import contextvars
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from .config import settings
+from .metrics import instrument_engine, metrics
+from .query_stats import instrument_queries
 import logging
 
 logger = logging.getLogger(__name__)
 
+def pool_options(url: str, pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    """
+    连接池参数
+
+    aiosqlite 默认每次检出都新建连接（NullPool），这里改为队列池以复用连接；
+    内存数据库只能使用单个连接，不设置连接池参数。
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            return {}
+        if parsed.get_driver_name() == "aiosqlite":
+            return {"poolclass": AsyncAdaptedQueuePool, "pool_size": pool_size, "max_overflow": max_overflow}
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+def sqlite_writer_pool_options(url: str) -> Dict[str, Any]:
+    """
+    SQLite 主库单写连接的连接池参数
+
+    写操作排队等待唯一的连接，等待超过 DB_WRITE_POOL_TIMEOUT 秒时报错，而不是使用默认的30秒。
+    """
+    options = pool_options(url, 1, 0)
+    if options:
+        options["pool_timeout"] = settings.DB_WRITE_POOL_TIMEOUT
+    return options
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    """
+    按配置生成SQLite连接参数
+
+    WAL 模式下读不阻塞写、写不阻塞读；synchronous=NORMAL 在 WAL 模式下只在检查点时同步磁盘，
+    断电时可能丢失最近提交的事务，但不会损坏数据库。只读连接额外设置 query_only。
+    """
+    pragmas: Dict[str, Any] = {}
+    if settings.SQLITE_WAL and not read_only:
+        pragmas["journal_mode"] = "WAL"
+    pragmas.update({
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    })
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    在每个新建的SQLite连接上设置 PRAGMA
+
+    Args:
+        engine: 同步引擎，异步引擎传入其 sync_engine
+        pragmas: PRAGMA 名称 -> 值
+    """
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+IS_SQLITE = make_url(settings.ASYNC_DATABASE_URL).get_backend_name() == "sqlite"
+
+# SQLite 同一时刻只允许一个写事务。只读查询有单独的连接池（只读副本或 SQLITE_READ_POOL）时，
+# 主库异步引擎只保留一个连接，进程内的写操作（接口、浏览量写回、采集任务、写入队列）在这个连接上依次执行，
+# 等待连接池而不是等待数据库锁
+SQLITE_SINGLE_WRITER = IS_SQLITE and bool(settings.DATABASE_READ_URLS or settings.SQLITE_READ_POOL)
+
 # 同步数据库引擎
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
     pool_pre_ping=True,
     pool_recycle=3600,
+    **pool_options(settings.DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
 )
 
 # 异步数据库引擎
 async_engine = create_async_engine(
     settings.ASYNC_DATABASE_URL,
-    echo=settings.DEBUG,
     pool_pre_ping=True,
     pool_recycle=3600,
+    **(
+        sqlite_writer_pool_options(settings.ASYNC_DATABASE_URL) if SQLITE_SINGLE_WRITER
+        else pool_options(settings.ASYNC_DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+    ),
 )
 
+if IS_SQLITE:
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+
+# 采集连接池指标和查询耗时
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+instrument_queries(engine, "sync")
+instrument_queries(async_engine.sync_engine, "async")
+
 # 同步会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -56,6 +154,377 @@ async def get_async_db():
         finally:
             await session.close()
 
+def get_async_session_factory():
+    """获取异步会话工厂，供需要并发执行多个查询的服务使用"""
+    return AsyncSessionLocal
+
+class ReadOnlySession(Session):
+    """只读会话，有待写入的修改时拒绝提交，避免写入只读副本"""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("只读会话不能写入数据，请使用 get_async_db")
+        super().flush(objects)
+
+
+class ReadTarget:
+    """只读查询可以使用的一个数据库（只读副本或主库）"""
+
+    def __init__(self, name: str, engine: AsyncEngine, replica: bool):
+        self.name = name
+        self.engine = engine
+        self.replica = replica
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.retry_at = 0.0  # 不可用的副本在该时间（monotonic）之后重新尝试
+        self.session_factory = sessionmaker(
+            engine, class_=AsyncSession, sync_session_class=ReadOnlySession,
+            expire_on_commit=False, autoflush=False,
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "replica": self.replica,
+            "healthy": self.healthy,
+            "last_error": self.last_error,
+            "checked_at": self.checked_at,
+        }
+
+
+class EngineRegistry:
+    """
+    数据库引擎注册表
+
+    写操作使用主库；只读查询按轮询分配到健康的只读副本，没有可用副本时使用主库。
+    副本连接失败时标记为不可用，在健康检查成功或 retry_seconds 之后重新使用。
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica_urls: List[str],
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        health_timeout: float = 2.0,
+        retry_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            primary: 主库异步引擎
+            replica_urls: 只读副本的异步连接URL
+            pool_size: 每个副本的连接池大小
+            max_overflow: 每个副本连接池允许超出的连接数
+            health_timeout: 健康检查的超时时间（秒）
+            retry_seconds: 不可用的副本多久之后重新尝试（秒）
+        """
+        self.primary = ReadTarget("primary", primary, replica=False)
+        self.replicas: List[ReadTarget] = []
+        self.health_timeout = health_timeout
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        for index, url in enumerate(replica_urls):
+            self.add_replica(f"replica-{index}", create_async_engine(
+                url, pool_pre_ping=True, pool_recycle=3600, **pool_options(url, pool_size, max_overflow),
+            ))
+
+    def add_replica(self, name: str, engine: AsyncEngine) -> ReadTarget:
+        """添加只读副本（或主库的只读连接池）"""
+        target = ReadTarget(name, engine, replica=True)
+        instrument_engine(engine.sync_engine, name)
+        instrument_queries(engine.sync_engine, name)
+        self.replicas.append(target)
+        return target
+
+    def read_targets(self) -> List[ReadTarget]:
+        """只读查询依次尝试的数据库：可用的副本（轮询起点）在前，主库最后"""
+        now = time.monotonic()
+        available = [replica for replica in self.replicas if replica.healthy or now >= replica.retry_at]
+        if available:
+            start = next(self._next) % len(available)
+            available = available[start:] + available[:start]
+        return available + [self.primary]
+
+    def mark_unhealthy(self, target: ReadTarget, error: BaseException) -> None:
+        """标记副本不可用"""
+        if target.healthy:
+            logger.warning(f"只读副本 {target.name} 不可用，切换到其他副本或主库: {error}")
+        target.healthy = False
+        target.last_error = str(error)
+        target.retry_at = time.monotonic() + self.retry_seconds
+
+    def mark_healthy(self, target: ReadTarget) -> None:
+        if not target.healthy:
+            logger.info(f"只读副本 {target.name} 已恢复")
+        target.healthy = True
+        target.last_error = None
+
+    async def _ping(self, target: ReadTarget) -> None:
+        async def ping():
+            async with target.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            await asyncio.wait_for(ping(), self.health_timeout)
+        except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+            if target.replica:
+                self.mark_unhealthy(target, e)
+            else:
+                target.healthy = False
+                target.last_error = str(e) or type(e).__name__
+        else:
+            if target.replica:
+                self.mark_healthy(target)
+            else:
+                target.healthy = True
+                target.last_error = None
+        target.checked_at = time.time()
+
+    async def check_health(self) -> List[Dict[str, Any]]:
+        """检查主库和所有副本的连接，返回各自状态"""
+        await asyncio.gather(*(self._ping(target) for target in [self.primary, *self.replicas]))
+        return self.status()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [target.status() for target in [self.primary, *self.replicas]]
+
+    async def read_session_factory(self) -> "sessionmaker":
+        """
+        当前可用的只读会话工厂
+
+        与 get_async_read_db 相同，依次尝试连接可用的副本，连接失败时标记该副本不可用并换下一个，
+        最后使用主库（主库不预先检查）。
+        """
+        for target in self.read_targets():
+            if not target.replica:
+                return target.session_factory
+            try:
+                async with target.engine.connect():
+                    pass
+            except (DBAPIError, OSError) as e:
+                self.mark_unhealthy(target, e)
+                continue
+            self.mark_healthy(target)
+            return target.session_factory
+        return self.primary.session_factory
+
+    async def _health_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"数据库健康检查失败: {e}")
+
+    def start(self, interval: float) -> None:
+        """启动定期健康检查，没有配置副本时不启动"""
+        if self._task is None and self.replicas and interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._health_loop(interval))
+
+    async def stop(self) -> None:
+        """停止健康检查并关闭副本连接池"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+# 创建引擎注册表单例
+engine_registry = EngineRegistry(
+    async_engine,
+    settings.DATABASE_READ_URLS,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+    health_timeout=settings.DB_HEALTH_CHECK_TIMEOUT,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+
+# SQLite 没有配置副本时，只读查询使用主库文件上的只读连接池，与写连接分开
+if IS_SQLITE and not settings.DATABASE_READ_URLS and settings.SQLITE_READ_POOL:
+    sqlite_read_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        **pool_options(settings.ASYNC_DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW),
+    )
+    apply_sqlite_pragmas(sqlite_read_engine.sync_engine, sqlite_pragmas(read_only=True))
+    engine_registry.add_replica("sqlite-read", sqlite_read_engine)
+
+
+@metrics.register_collector
+def _replica_metrics():
+    """主库和只读副本的可用状态"""
+    return [(
+        "db_target_up", "gauge", "数据库是否可用（1 可用，0 不可用）",
+        [("", {"target": target["name"]}, 1 if target["healthy"] else 0) for target in engine_registry.status()],
+    )]
+
+
+async def get_async_read_db():
+    """
+    获取只读数据库会话
+
+    依次尝试可用的只读副本，连接失败时标记该副本不可用并换下一个，最后使用主库。
+    需要读到刚写入的数据时应使用 get_async_db。
+    """
+    for target in engine_registry.read_targets():
+        session = target.session_factory()
+        try:
+            await session.connection()
+        except (DBAPIError, OSError) as e:
+            await session.close()
+            if not target.replica:
+                raise
+            engine_registry.mark_unhealthy(target, e)
+            continue
+        if target.replica:
+            engine_registry.mark_healthy(target)
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
+
+async def get_async_read_session_factory():
+    """获取只读会话工厂，供需要并发执行多个只读查询的服务使用"""
+    return await engine_registry.read_session_factory()
+
+T = TypeVar("T")
+
+write_queue_wait = metrics.histogram(
+    "db_write_queue_wait_seconds", "写操作在写入队列中的等待时间（秒）",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+write_jobs = metrics.counter("db_write_jobs", "写入队列执行的写操作数", ["result"])
+
+
+class WriteQueue:
+    """
+    单写入者队列
+
+    SQLite 同一时刻只允许一个写事务，多个协程同时写入时后来者只能等待锁或收到 database is locked。
+    提交到队列的写操作按顺序逐个执行，每个操作是一个事务（成功提交，异常回滚）。
+    不需要串行写入的数据库（serialize=False）直接执行。
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], serialize: bool = True):
+        """
+        Args:
+            session_factory: 写操作使用的会话工厂
+            serialize: 是否通过队列串行执行
+        """
+        self.session_factory = session_factory
+        self.serialize = serialize
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def depth(self) -> int:
+        """排队中的写操作数"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """
+        提交写操作并等待执行完成
+
+        Args:
+            job: 接收会话的协程函数，返回值作为结果，不需要自行提交
+
+        Returns:
+            job 的返回值
+        """
+        if not self.serialize:
+            return await self._execute(job)
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((job, future, time.perf_counter()))
+        return await future
+
+    async def _execute(self, job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with self.session_factory() as session:
+            try:
+                result = await job(session)
+                await session.commit()
+            except BaseException:
+                await session.rollback()
+                write_jobs.inc("error")
+                raise
+        write_jobs.inc("ok")
+        return result
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        # 在空的上下文中创建任务，避免继承提交者所在请求的上下文（如SQL统计）
+        self._worker = contextvars.Context().run(loop.create_task, self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        future: Optional[asyncio.Future] = None
+        try:
+            while True:
+                entry = await queue.get()
+                if entry is None:
+                    return
+                job, future, queued_at = entry
+                if future.cancelled():
+                    continue
+                write_queue_wait.observe(time.perf_counter() - queued_at)
+                try:
+                    result = await self._execute(job)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # 被取消时正在执行的写操作已回滚，排队中的不再执行，取消它们使提交者不会一直等待
+            if future is not None and not future.done():
+                future.cancel()
+            while not queue.empty():
+                entry = queue.get_nowait()
+                if entry is not None and not entry[1].done():
+                    entry[1].cancel()
+
+    async def stop(self) -> None:
+        """
+        等待已提交的写操作完成后停止
+
+        在队列末尾放入停止标记并等待写入任务退出；stop 本身被取消时写入任务随之取消，
+        未完成的写操作被取消。
+        """
+        worker, self._worker = self._worker, None
+        if worker is None or worker.done() or self._loop is not asyncio.get_running_loop():
+            return
+        self._queue.put_nowait(None)
+        try:
+            await worker
+        except asyncio.CancelledError:
+            worker.cancel()
+            raise
+
+
+# 写入队列与接口等其他写操作使用同一个主库引擎，SQLite 上按提交顺序串行执行
+write_queue = WriteQueue(AsyncSessionLocal, serialize=IS_SQLITE)
+
+
+@metrics.register_collector
+def _write_queue_metrics():
+    return [("db_write_queue_depth", "gauge", "排队中的写操作数", [("", {}, write_queue.depth)])]
+
+
 def init_db():
     """初始化数据库"""
     try:
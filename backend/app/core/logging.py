@@ -1,30 +1,277 @@
+"""
+应用日志
+
+日志记录在调用线程中只做级别判断、过滤和入队，格式化（JSON序列化、异常堆栈）和写入标准输出
+由后台线程的 QueueListener 完成，事件循环不会因为终端或管道写入缓慢而停顿。
+入队前的过滤:
+    采样: 按日志器名称配置保留比例，只作用于 WARNING 以下的记录。
+    限流: 同一调用位置每秒最多输出的记录数（令牌桶），只作用于 ERROR 以下的记录，
+        被抑制的条数附在该位置下一条输出的记录上。
+每个HTTP请求有一个请求ID（沿用合法的 X-Request-ID 请求头，否则生成），请求处理期间的日志都带有该ID，
+并写入 X-Request-ID 响应头。
+"""
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import queue
+import re
 import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
 from app.core.config import settings
+from app.core.metrics import metrics
+
+log_records_discarded = metrics.counter(
+    "log_records_discarded", "未输出的日志记录数（sampled=采样丢弃, rate_limited=限流, queue_full=队列已满）", ["reason"],
+)
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# 允许沿用的请求ID格式，避免把任意内容写进日志和响应头
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# LogRecord 的标准属性，其余属性（通过 extra 传入）会作为字段写入JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+
+def current_request_id() -> Optional[str]:
+    """获取当前请求的ID，不在请求中时返回None"""
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出一行JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id and request_id != "-":
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """按日志器名称保留一定比例的 WARNING 以下记录"""
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Args:
+            rates: 日志器名称 -> 保留比例（0~1），对子日志器同样生效，最长的名称优先
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, Tuple[int, "itertools.count"]] = {}
+
+    def _resolve(self, name: str) -> Tuple[int, "itertools.count"]:
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            # 保留比例换算为每 every 条保留一条，0 表示全部丢弃
+            every = 0 if rate <= 0 else max(1, round(1 / rate))
+            resolved = self._resolved[name] = (every, itertools.count())
+        return resolved
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        every, counter = self._resolve(record.name)
+        if every == 1 or (every and next(counter) % every == 0):
+            return True
+        log_records_discarded.inc("sampled")
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """限制同一调用位置每秒输出的 ERROR 以下记录数"""
+
+    # 记录的调用位置数上限，超过后清空重新计数
+    MAX_SITES = 10000
+
+    def __init__(self, per_second: float, burst: int):
+        """
+        Args:
+            per_second: 每个调用位置每秒补充的令牌数
+            burst: 令牌桶容量，即允许的突发条数
+        """
+        super().__init__()
+        self.per_second = per_second
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int], list] = {}  # 调用位置 -> [令牌数, 上次补充时间, 已抑制条数]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or self.per_second <= 0:
+            return True
+        # 按调用位置而不是消息模板计数，f-string 拼接的消息同样受限
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(site)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_SITES:
+                    self._buckets.clear()
+                bucket = self._buckets[site] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+                bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                log_records_discarded.inc("rate_limited")
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """入队不阻塞的 QueueHandler，队列已满时丢弃记录"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 只在调用线程中合并消息参数（参数可能在之后被修改）和记录请求ID，
+        # 异常堆栈和JSON序列化留给后台线程
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = _request_id.get() or "-"
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_discarded.inc("queue_full")
+
+
+class _ContextFilter(logging.Filter):
+    """直接输出的记录（如 pytest 等接管根日志器时）也带有请求ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get() or "-"
+        return True
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging() -> None:
+    """停止后台写入线程，等待队列中的记录写完"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logging() -> logging.Logger:
     """配置应用日志"""
-    
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    global _listener
+    stop_logging()
+
     log_level = logging.DEBUG if settings.DEBUG else logging.INFO
-    
+    if settings.LOG_LEVEL:
+        log_level = settings.LOG_LEVEL
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    output.addFilter(_ContextFilter())
+
+    handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT, settings.LOG_RATE_BURST))
+
     # 配置根日志器
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
-    
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(log_level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
     # 设置第三方库的日志级别
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
-    
+    # SQL语句通过日志级别开启，与其他日志一样经由队列输出（不使用引擎的 echo 参数，它会直接写标准输出）
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.SQL_ECHO else logging.WARNING)
+
     # 创建应用日志器
     logger = logging.getLogger("app")
     logger.setLevel(log_level)
-    
+
     return logger
 
+
+class RequestIdMiddleware:
+    """为每个请求设置请求ID并写入 X-Request-ID 响应头的ASGI中间件"""
+
+    def __init__(self, app, header: str = "x-request-id"):
+        """
+        Args:
+            app: 下游ASGI应用
+            header: 请求ID的请求头和响应头
+        """
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(self.header, b"").decode("latin-1")
+        request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # 合并的请求会复用其他请求的响应头，这里替换为本请求的ID
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != self.header]
+                headers.append((self.header, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
+
+
 # 创建日志器单例
-logger = setup_logging() 
\ No newline at end of file
+logger = setup_logging()
+atexit.register(stop_logging)
@@ -0,0 +1,185 @@
+"""
+事件循环健康监控
+
+事件循环上的同步操作（HTML解析、大JSON解码、同步日志输出等）会让所有异步接口一起停顿。
+监控由三部分组成:
+    心跳任务: 按固定间隔 sleep，实际醒来时间与预期的差值即调度延迟，记入直方图。
+    回调计时: 包装 asyncio.Handle._run，记录执行时间超过阈值的回调（协程的一步或普通回调）。
+    看门狗线程: 发现当前回调执行超过阈值时，立即抓取事件循环线程的调用栈，
+        这样日志中能看到阻塞发生的具体位置，而不只是哪个任务阻塞了。
+"""
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+loop_lag = metrics.histogram(
+    "event_loop_lag_seconds", "事件循环调度延迟（秒）",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+slow_callbacks = metrics.counter("event_loop_slow_callbacks", "执行时间超过阈值的事件循环回调数")
+slow_callback_duration = metrics.histogram(
+    "event_loop_slow_callback_duration_seconds", "超过阈值的事件循环回调执行时间（秒）",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# 保留最近的慢回调记录数
+RECENT_LIMIT = 20
+
+_original_run = asyncio.events.Handle._run
+_active: Optional["LoopMonitor"] = None
+
+
+def _timed_run(handle: asyncio.Handle) -> None:
+    """替换 Handle._run，只对被监控的事件循环计时"""
+    monitor = _active
+    if monitor is None or handle._loop is not monitor._loop:
+        return _original_run(handle)
+    started = time.perf_counter()
+    monitor._current = (handle, started)
+    try:
+        return _original_run(handle)
+    finally:
+        monitor._current = None
+        elapsed = time.perf_counter() - started
+        if elapsed >= monitor.threshold:
+            monitor._record(handle, elapsed)
+
+
+def describe_handle(handle: asyncio.Handle) -> str:
+    """描述回调：协程的一步显示任务名和协程名，其他回调显示函数名"""
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f"Task {task.get_name()} {getattr(coro, '__qualname__', repr(coro))}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class LoopMonitor:
+    """事件循环健康监控"""
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        """
+        Args:
+            interval: 心跳间隔（秒）
+            threshold: 回调执行时间超过该值（秒）时视为阻塞
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._current: Optional[Tuple[asyncio.Handle, float]] = None  # 正在执行的回调和开始时间
+        self._captured: Optional[Tuple[asyncio.Handle, str]] = None  # 看门狗抓取的调用栈
+        self.recent: Deque[Dict[str, Any]] = collections.deque(maxlen=RECENT_LIMIT)
+        self.max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    def start(self) -> None:
+        """在当前事件循环上开始监控，需要在事件循环中调用"""
+        global _active
+        if self.running:
+            return
+        if _active is not None and _active is not self:
+            raise RuntimeError("已有其他事件循环监控在运行")
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopping.clear()
+        _active = self
+        asyncio.events.Handle._run = _timed_run
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-monitor-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"已启动事件循环监控，心跳间隔 {self.interval}s，阻塞阈值 {self.threshold * 1000:.0f}ms")
+
+    async def stop(self) -> None:
+        """停止监控"""
+        global _active
+        if not self.running:
+            return
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat = None
+        self._stopping.set()
+        self._watchdog.join()
+        self._watchdog = None
+        if _active is self:
+            _active = None
+            asyncio.events.Handle._run = _original_run
+
+    async def _beat(self) -> None:
+        """心跳任务，测量调度延迟"""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            loop_lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self) -> None:
+        """看门狗线程：回调执行超过阈值时抓取事件循环线程的调用栈"""
+        poll = max(0.005, self.threshold / 2)
+        while not self._stopping.wait(poll):
+            current = self._current
+            if current is None:
+                continue
+            handle, started = current
+            captured = self._captured
+            if (captured is not None and captured[0] is handle) or time.perf_counter() - started < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None and self._current is current:
+                self._captured = (handle, "".join(traceback.format_stack(frame)))
+
+    def _record(self, handle: asyncio.Handle, elapsed: float) -> None:
+        """记录一次慢回调"""
+        captured = self._captured
+        stack = captured[1] if captured is not None and captured[0] is handle else None
+        self._captured = None
+        description = describe_handle(handle)
+        slow_callbacks.inc()
+        slow_callback_duration.observe(elapsed)
+        self.recent.append({
+            "callback": description,
+            "seconds": round(elapsed, 4),
+            "at": time.time(),
+            "stack": stack,
+        })
+        logger.warning(
+            f"事件循环被阻塞 {elapsed * 1000:.0f}ms: {description}"
+            + (f"\n阻塞时的调用栈:\n{stack}" if stack else "")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """获取监控状态和最近的慢回调"""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "threshold_seconds": self.threshold,
+            "max_lag_seconds": round(self.max_lag, 4),
+            "recent": list(self.recent),
+        }
+
+
+# 创建单例
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    threshold=settings.LOOP_SLOW_CALLBACK_MS / 1000,
+)
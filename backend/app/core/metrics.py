@@ -0,0 +1,376 @@
+"""
+Prometheus 文本格式的运行指标
+
+计数器和直方图按线程分片存储：每个线程只写自己的分片，请求路径上不需要加锁，
+采集时再把所有分片相加。连接池状态、合并请求和数据文件等已有统计
+通过采集回调在 /metrics 被请求时读取。
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 与 Prometheus 客户端默认值相同的延迟桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 采集结果: (指标名, 类型, 说明, [(样本名后缀, 标签, 值)])
+Family = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Shards:
+    """按线程分片的存储，每个线程首次写入时创建自己的分片"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+
+    def local(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            # list.append 在 GIL 下是原子操作
+            self._shards.append(values)
+            return values
+
+    def snapshot(self) -> List[dict]:
+        """复制所有分片，dict.copy 在 GIL 下一次完成，不受并发写入影响"""
+        return [shard.copy() for shard in self._shards]
+
+
+class Metric:
+    """指标基类"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+
+    def _labels(self, values: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def collect(self) -> Family:
+        raise NotImplementedError
+
+
+class _SummedMetric(Metric):
+    """各分片数值相加得到结果的指标"""
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        增加数值
+
+        Args:
+            labels: 按 labelnames 顺序排列的标签值
+            amount: 增加量
+        """
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        """各标签组合的当前值"""
+        totals: Dict[tuple, float] = {}
+        for shard in self._shards.snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def collect(self) -> Family:
+        samples = [("", self._labels(labels), value) for labels, value in sorted(self.values().items())]
+        return self.name, self.type, self.documentation, samples
+
+
+class Counter(_SummedMetric):
+    """只增不减的计数器，输出时指标名加上 _total 后缀"""
+
+    type = "counter"
+
+    def collect(self) -> Family:
+        name, metric_type, documentation, samples = super().collect()
+        return f"{name}_total", metric_type, documentation, samples
+
+
+class Gauge(_SummedMetric):
+    """可增可减的仪表值，如进行中的请求数"""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """减少数值"""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        设置数值
+
+        通过增加与当前值的差值实现，只适用于单一写入方的仪表值，如最近一次成功的时间。
+        """
+        self.inc(*labels, amount=value - self.values().get(labels, 0))
+
+
+class Histogram(Metric):
+    """分桶统计的直方图"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        记录一次观测
+
+        Args:
+            value: 观测值
+            labels: 按 labelnames 顺序排列的标签值
+        """
+        shard = self._shards.local()
+        counts = shard.get(labels)
+        if counts is None:
+            # 各桶计数（最后一个为 +Inf）和观测值总和
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> Dict[tuple, List[float]]:
+        """各标签组合的分桶计数（非累计）和总和"""
+        totals: Dict[tuple, List[float]] = {}
+        for shard in self._shards.snapshot():
+            for labels, counts in shard.items():
+                counts = list(counts)
+                if labels in totals:
+                    counts = [a + b for a, b in zip(totals[labels], counts)]
+                totals[labels] = counts
+        return totals
+
+    def collect(self) -> Family:
+        samples = []
+        for labels, counts in sorted(self.values().items()):
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", {**base, "le": _format_value(float(bound))}, cumulative))
+            samples.append(("_sum", base, counts[-1]))
+            samples.append(("_count", base, cumulative))
+        return self.name, self.type, self.documentation, samples
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # 模块被重复导入时返回已有指标，保持计数连续
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册计数器"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册仪表值"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """注册直方图"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> Callable[[], Iterable[Family]]:
+        """
+        注册采集回调，每次输出指标时调用
+
+        Args:
+            collector: 返回指标族列表的函数，可用作装饰器
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def collect(self) -> Iterator[Family]:
+        """采集全部指标"""
+        for metric in self._metrics.values():
+            yield metric.collect()
+        for collector in self._collectors:
+            yield from collector()
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = []
+        for name, metric_type, documentation, samples in self.collect():
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# 创建单例
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests", "HTTP请求数", ("method", "route", "status"),
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP请求处理耗时（秒）", ("method", "route"),
+)
+http_requests_in_progress = metrics.gauge(
+    "http_requests_in_progress", "正在处理的HTTP请求数", ("method",),
+)
+db_pool_checkouts = metrics.counter(
+    "db_pool_checkouts", "从连接池检出连接的次数", ("engine",),
+)
+db_pool_connects = metrics.counter(
+    "db_pool_connects", "连接池新建数据库连接的次数", ("engine",),
+)
+db_pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds", "从连接池获取可用连接的耗时（秒）", ("engine",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# 已接入指标的连接池: 引擎名 -> 连接池
+_pools: Dict[str, object] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    采集引擎连接池的检出次数、获取连接耗时和当前状态
+
+    Args:
+        engine: 同步引擎，异步引擎传入其 sync_engine
+        name: 引擎名，作为 engine 标签
+    """
+    pool = engine.pool
+    if _pools.get(name) is pool:
+        return
+    _pools[name] = pool
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc(name)
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        db_pool_connects.inc(name)
+
+    # SQLAlchemy 没有"开始获取连接"的事件，包装 connect 计时；
+    # 其中包括排队等待、新建连接和连接检查的时间
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, name)
+
+    pool.connect = timed_connect
+
+
+@metrics.register_collector
+def _pool_gauges() -> List[Family]:
+    """连接池当前状态，StaticPool 等没有这些方法的连接池不输出"""
+    gauges = {
+        "db_pool_size": ("连接池容量", "size"),
+        "db_pool_checked_out": ("已检出的连接数", "checkedout"),
+        "db_pool_checked_in": ("池中空闲的连接数", "checkedin"),
+        "db_pool_overflow": ("超出容量的连接数", "overflow"),
+    }
+    families = []
+    for metric_name, (documentation, method) in gauges.items():
+        samples = [
+            ("", {"engine": name}, float(getattr(pool, method)()))
+            for name, pool in _pools.items() if hasattr(pool, method)
+        ]
+        families.append((metric_name, "gauge", documentation, samples))
+    return families
+
+
+def route_template(scope) -> str:
+    """获取请求匹配的路由模板，避免把路径参数作为标签值"""
+    route = scope.get("route")
+    if route is None:
+        # 被合并的请求和中途返回的请求不会经过路由，按路由表重新匹配
+        from starlette.routing import Match
+        app = scope.get("app")
+        for candidate in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """按路由模板和状态码记录请求数和处理耗时的ASGI中间件"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec(method)
+            route = route_template(scope)
+            http_requests.inc(method, route, str(status))
+            http_request_duration.observe(elapsed, method, route)
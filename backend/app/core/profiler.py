@@ -0,0 +1,265 @@
+"""
+运行中进程的性能分析
+
+两种方式:
+    采样分析: 后台线程按固定间隔读取 sys._current_frames()，统计所有线程的调用栈，
+        输出 flamegraph.pl / speedscope 可直接读取的折叠栈格式。不需要修改被分析的代码，
+        开销只与采样频率和线程数有关。选择线程而不是信号实现，是因为信号只能在主线程处理，
+        而同步接口运行在线程池中。
+    请求分析: 带有指定请求头（并通过管理员令牌校验）的请求在 cProfile 下执行，
+        结果按路由模板累计。cProfile 只跟踪事件循环线程，期间并发执行的其他协程也会被计入。
+"""
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+# 视为空闲等待的栈顶函数: (文件名, 函数名)
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """校验管理员令牌，未配置 ADMIN_TOKEN 时总是返回False"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SampleProfile:
+    """一次采样分析的结果"""
+
+    def __init__(self, stacks: Counter, samples: int, duration: float, interval: float, overhead: float):
+        self.stacks = stacks  # 折叠栈 -> 采样次数
+        self.samples = samples  # 采样轮数
+        self.duration = duration  # 实际采样时长（秒）
+        self.interval = interval  # 采样间隔（秒）
+        self.overhead = overhead  # 采样本身消耗的时间（秒）
+
+    def to_collapsed(self) -> str:
+        """输出折叠栈格式，每行为 "帧;帧;帧 次数"，根帧在前"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, object]]:
+        """按出现在栈顶的次数排列的函数"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"function": function, "samples": count, "percent": round(count * 100 / total, 2)}
+            for function, count in leaves.most_common(limit)
+        ]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "samples": self.samples,
+            "stacks": sum(self.stacks.values()),
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "overhead_percent": round(self.overhead * 100 / self.duration, 2) if self.duration else 0,
+            "top": self.top_functions(),
+        }
+
+
+class StackSampler:
+    """基于线程的调用栈采样器"""
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        """
+        Args:
+            interval: 采样间隔（秒）
+            include_idle: 是否统计空闲等待中的线程（如等待IO的事件循环和空闲的线程池线程）
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+
+    def _is_idle(self, code) -> bool:
+        return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+    def run(self, seconds: float) -> SampleProfile:
+        """
+        在当前线程中采样指定时长，采样线程本身不计入结果
+
+        Args:
+            seconds: 采样时长（秒）
+
+        Returns:
+            采样结果
+        """
+        own_ident = threading.get_ident()
+        raw: Counter = Counter()
+        labels: Dict[object, str] = {}
+        samples = 0
+        overhead = 0.0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                if not self.include_idle and self._is_idle(frame.f_code):
+                    continue
+                # 先按代码对象计数，结束后再转换为文本，降低每次采样的开销
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                raw[(names.get(ident, str(ident)), tuple(codes))] += 1
+            samples += 1
+            overhead += time.perf_counter() - now
+            time.sleep(max(0.0, min(self.interval, deadline - time.perf_counter())))
+
+        stacks: Counter = Counter()
+        for (thread_name, codes), count in raw.items():
+            frames = [f"thread:{thread_name}"]
+            for code in reversed(codes):
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                frames.append(label)
+            stacks[";".join(frames)] += count
+        return SampleProfile(stacks, samples, time.perf_counter() - started, self.interval, overhead)
+
+
+class RouteProfiles:
+    """按路由模板累计的 cProfile 结果"""
+
+    def __init__(self):
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._requests: Dict[str, int] = {}
+        self._active = False  # 同一线程同时只能有一个 cProfile 生效
+
+    def try_acquire(self) -> bool:
+        """开始一次请求分析，已有请求在分析时返回False"""
+        if self._active:
+            return False
+        self._active = True
+        return True
+
+    def release(self) -> None:
+        self._active = False
+
+    def add(self, route: str, profile: cProfile.Profile) -> None:
+        """累计一次请求的分析结果"""
+        stats = self._stats.get(route)
+        if stats is None:
+            self._stats[route] = pstats.Stats(profile)
+        else:
+            stats.add(profile)
+        self._requests[route] = self._requests.get(route, 0) + 1
+
+    def summary(self) -> List[Dict[str, object]]:
+        """各路由的请求数和累计耗时"""
+        return [
+            {"route": route, "requests": self._requests[route], "total_seconds": round(stats.total_tt, 6)}
+            for route, stats in sorted(self._stats.items())
+        ]
+
+    def report(self, route: str, sort: str = "cumulative", limit: int = 30) -> Optional[str]:
+        """
+        输出路由的 pstats 文本报告
+
+        Args:
+            route: 路由模板
+            sort: 排序字段，如 cumulative、tottime、calls
+            limit: 输出的函数数
+
+        Returns:
+            报告文本，该路由没有分析结果时返回None
+        """
+        stats = self._stats.get(route)
+        if stats is None:
+            return None
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def reset(self) -> None:
+        """清除所有结果"""
+        self._stats.clear()
+        self._requests.clear()
+
+
+class ProfilingMiddleware:
+    """对带有分析请求头和管理员令牌的请求执行 cProfile 的ASGI中间件"""
+
+    def __init__(self, app, header: str = "x-profile"):
+        """
+        Args:
+            app: 下游ASGI应用
+            header: 触发请求分析的请求头
+        """
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        if self.header not in headers:
+            await self.app(scope, receive, send)
+            return
+        token = headers.get(b"x-admin-token", b"").decode("latin-1")
+        if not is_admin(token) or not route_profiles.try_acquire():
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profile.disable()
+            route_profiles.add(route_template(scope), profile)
+        finally:
+            route_profiles.release()
+
+
+class SamplingSession:
+    """保证同一时刻只运行一次采样分析"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self, seconds: float, interval: float, include_idle: bool = False) -> SampleProfile:
+        """在线程池中运行采样，不阻塞事件循环"""
+        async with self._lock:
+            sampler = StackSampler(interval=interval, include_idle=include_idle)
+            return await asyncio.to_thread(sampler.run, seconds)
+
+
+# 创建单例
+route_profiles = RouteProfiles()
+sampling_session = SamplingSession()
@@ -0,0 +1,187 @@
+"""
+SQL查询统计
+
+在引擎的游标执行事件中计时，把查询次数和数据库耗时记到当前请求上（通过 contextvars 传递，
+同步接口的线程池和异步引擎的 greenlet 都会继承当前上下文），并在响应中加入
+Server-Timing 头。单次请求查询过多或同一语句结构重复执行多次时记录疑似 N+1 的警告，
+超过阈值的慢查询单独记录。
+"""
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics, route_template
+
+db_queries = metrics.counter("db_queries", "执行的SQL语句数", ("engine",))
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "SQL语句执行耗时（秒）", ("engine",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+n_plus_one_suspected = metrics.counter("db_n_plus_one_suspected", "疑似 N+1 查询的请求数", ("route",))
+
+# 日志中语句的最大长度
+_MAX_STATEMENT_LOG = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    归一化SQL语句，去掉参数和字面量，使只有参数不同的语句得到相同的结果
+
+    Args:
+        statement: 发送给数据库驱动的SQL语句
+
+    Returns:
+        语句结构
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    # IN 列表的长度不同也视为同一结构
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+def _truncate(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement if len(statement) <= _MAX_STATEMENT_LOG else statement[:_MAX_STATEMENT_LOG] + "..."
+
+
+class QueryStats:
+    """一次请求（或一个后台任务）执行的查询统计"""
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0  # 查询次数
+        self.duration = 0.0  # 数据库总耗时（秒）
+        self.shapes: Dict[str, int] = {}  # 语句结构 -> 执行次数
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """记录一次查询"""
+        self.count += 1
+        self.duration += elapsed
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """执行次数不少于阈值的语句结构，按次数从多到少排列"""
+        return sorted(
+            ((shape, count) for shape, count in self.shapes.items() if count >= threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """获取当前上下文的查询统计，不在请求中时返回None"""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def instrument_queries(engine: Engine, name: str) -> None:
+    """
+    为引擎加上查询计时
+
+    Args:
+        engine: 同步引擎，异步引擎传入其 sync_engine
+        name: 引擎名，作为指标的 engine 标签
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        elapsed = time.perf_counter() - started
+        db_queries.inc(name)
+        db_query_duration.observe(elapsed, name)
+
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            logger.warning(f"慢查询 {elapsed * 1000:.1f}ms [{name}]: {_truncate(statement)}")
+
+    def handle_error(exception_context):
+        # 出错的语句不会触发 after_cursor_execute，丢弃对应的开始时间
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+def _check_n_plus_one(stats: QueryStats, method: str, path: str, route: str) -> None:
+    """查询次数超出预算或同一语句重复执行时记录警告"""
+    repeated = stats.repeated(settings.SQL_REPEAT_THRESHOLD)
+    over_budget = stats.count > settings.SQL_QUERY_BUDGET
+    if not repeated and not over_budget:
+        return
+
+    n_plus_one_suspected.inc(route)
+    details = "; ".join(f"{count} 次: {_truncate(shape)}" for shape, count in repeated[:3])
+    logger.warning(
+        f"疑似 N+1 查询 {method} {path}: {stats.count} 次查询"
+        f"{f'（预算 {settings.SQL_QUERY_BUDGET}）' if over_budget else ''}，"
+        f"数据库耗时 {stats.duration * 1000:.1f}ms"
+        f"{f'，重复的语句 {details}' if details else ''}"
+    )
+
+
+class QueryStatsMiddleware:
+    """统计每个请求的SQL查询，加入 Server-Timing 响应头并检查 N+1 查询的ASGI中间件"""
+
+    def __init__(self, app, server_timing: bool = True):
+        """
+        Args:
+            app: 下游ASGI应用
+            server_timing: 是否加入 Server-Timing 响应头
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                # 只能统计到响应头发出为止的查询，流式响应之后的查询不计入
+                value = (
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                ).encode("latin-1")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", value))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            _check_n_plus_one(stats, scope["method"], scope["path"], route_template(scope))
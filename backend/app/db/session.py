@@ -1,19 +1,4 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+# 兼容旧的导入路径，引擎和会话工厂统一由 app.core.database 创建
+from app.core.database import async_engine as engine, AsyncSessionLocal as async_session
 
-# 创建异步引擎
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=True,
-    future=True
-)
-
-# 创建异步会话工厂
-async_session = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-) 
\ No newline at end of file
+__all__ = ["engine", "async_session"]
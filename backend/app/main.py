@@ -1,17 +1,15 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
-from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.logging import logger
-from app.core.database import engine, Base, SessionLocal, async_session
+from app.core.logging import logger, RequestIdMiddleware
+from app.core.coalescing import CoalescingMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.profiler import ProfilingMiddleware
+from app.core.database import async_session
+import asyncio
 import datetime
-import json
-from app.models.db.news import News
-
-# 创建数据库表 (仅在需要时执行)
-Base.metadata.create_all(bind=engine)
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -29,20 +27,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 合并相同的并发GET请求
+app.add_middleware(CoalescingMiddleware, paths=settings.COALESCE_PATHS)
+
+# 按需对单个请求做 cProfile 分析，需要管理员令牌
+app.add_middleware(ProfilingMiddleware, header=settings.PROFILE_HEADER)
+
+# 统计每个请求的SQL查询次数和耗时
+app.add_middleware(QueryStatsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# 记录请求数和处理耗时，放在最外层以包含其他中间件的耗时
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# 为每个请求分配请求ID，请求处理期间的日志都带有该ID
+app.add_middleware(RequestIdMiddleware)
+
 # 应用启动和关闭事件
 @app.on_event("startup")
 async def startup_event():
     """应用启动时执行"""
     logger.info("财知道API服务正在启动...")
     
+    # 监控事件循环的调度延迟和阻塞回调
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.core.loop_monitor import loop_monitor
+        loop_monitor.start()
+    
     # 如果启用了雪球API，启动定期获取任务
     if settings.XUEQIU_API_ENABLED:
         from app.services.xueqiu_service import xueqiu_service
         await xueqiu_service.start_fetch_task()
         logger.info("已启动雪球新闻定期获取任务")
     
-    async with async_session() as session:
-        await News.create_test_data(session)
+    # 表结构通过 python migrate.py --schema-only 显式创建，这里只在开发环境按配置自动创建
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        from app.utils.db_migration import init_db
+        await asyncio.to_thread(init_db)
+    
+    if settings.SEED_TEST_DATA:
+        from app.models.db.news import News
+        async with async_session() as session:
+            await News.create_test_data(session)
+    
+    # 按配置启动新浪财经定时抓取任务
+    if settings.SINA_FETCH_ENABLED:
+        from app.services.sina_service import sina_service
+        sina_service.start_scheduled_task()
+    
+    # 定期检查只读副本，不可用时只读查询切换到其他副本或主库
+    from app.core.database import engine_registry
+    engine_registry.start(settings.DB_HEALTH_CHECK_INTERVAL)
+    
+    # 启动问题浏览量定期写入任务
+    from app.services.view_counter import view_counter
+    view_counter.start(async_session)
+    
+    # 监视data目录下的JSON数据文件，变更后自动重新加载
+    from app.services.data_service import data_watcher
+    data_watcher.start()
     
     logger.info("财知道API服务已启动完成！")
 
@@ -57,16 +100,27 @@ async def shutdown_event():
         await xueqiu_service.stop_fetch_task()
         logger.info("已停止雪球新闻定期获取任务")
     
+    if settings.SINA_FETCH_ENABLED:
+        from app.services.sina_service import sina_service
+        await sina_service.stop_scheduled_task()
+    
+    # 写入缓冲中剩余的问题浏览量
+    from app.services.view_counter import view_counter
+    await view_counter.stop(async_session)
+    
+    from app.services.data_service import data_watcher
+    await data_watcher.stop()
+    
+    from app.core.database import engine_registry, write_queue
+    await write_queue.stop()
+    await engine_registry.stop()
+    
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.core.loop_monitor import loop_monitor
+        await loop_monitor.stop()
+    
     logger.info("财知道API服务已关闭！")
 
-# 获取同步数据库会话
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # 添加API状态检查端点
 @app.get("/api/status")
 def check_api_status():
@@ -80,119 +134,19 @@ def check_api_status():
         "message": "财知道API服务运行正常"
     }
 
-# 同步测试端点
-@app.get("/api/learning")
-def test_learning(db: Session = Depends(get_db)):
-    """使用同步方式获取学习内容"""
-    try:
-        # 使用原生SQL查询
-        result = db.execute(text("SELECT id, title, short_description, difficulty, tags, related_items FROM learning"))
-        rows = result.fetchall()
-        
-        # 转换为字典列表
-        items = []
-        for row in rows:
-            item = {
-                "id": row[0],
-                "title": row[1],
-                "shortDescription": row[2],
-                "difficulty": row[3]
-            }
-            # 解析JSON字段
-            try:
-                item["tags"] = json.loads(row[4]) if row[4] else []
-            except:
-                item["tags"] = []
-                
-            try:
-                item["relatedItems"] = json.loads(row[5]) if row[5] else []
-            except:
-                item["relatedItems"] = []
-                
-            items.append(item)
-            
-        return {"items": items, "total": len(items)}
-    except Exception as e:
-        logger.error(f"测试端点出错: {e}")
-        return {"error": str(e), "items": [], "total": 0}
-
-@app.get("/api/news")
-def test_news(db: Session = Depends(get_db)):
-    """使用同步方式获取新闻内容"""
-    try:
-        # 使用原生SQL查询
-        result = db.execute(text("SELECT id, title, summary, source, publish_date, content, image_url, category FROM news"))
-        rows = result.fetchall()
-        
-        # 转换为字典列表
-        items = []
-        for row in rows:
-            item = {
-                "id": row[0],
-                "title": row[1],
-                "summary": row[2],
-                "source": row[3],
-                "publishDate": row[4],
-                "content": row[5],
-                "imageUrl": row[6]
-            }
-            # 解析JSON字段
-            try:
-                item["categories"] = json.loads(row[7]) if row[7] else []
-            except:
-                item["categories"] = []
-                
-            items.append(item)
-            
-        return {"items": items, "total": len(items)}
-    except Exception as e:
-        logger.error(f"测试端点出错: {e}")
-        return {"error": str(e), "items": [], "total": 0}
-
-@app.get("/api/questions")
-def test_questions(db: Session = Depends(get_db)):
-    """使用同步方式获取问题内容"""
-    try:
-        # 使用原生SQL查询
-        result = db.execute(text("SELECT id, title, content, answer, category, view_count, answer_count, tags, related_questions FROM questions"))
-        rows = result.fetchall()
-        
-        # 转换为字典列表
-        items = []
-        for row in rows:
-            item = {
-                "id": row[0],
-                "question": row[1],  # 这里可以保持question作为API返回字段，但从数据库获取的是title
-                "answer": row[3],
-                # 移除difficulty字段或使用其他可用字段代替
-            }
-            # 解析JSON字段
-            try:
-                item["categories"] = json.loads(row[4]) if row[4] else []
-            except:
-                item["categories"] = []
-                
-            try:
-                item["tags"] = json.loads(row[5]) if row[5] else []
-            except:
-                item["tags"] = []
-                
-            try:
-                item["relatedQuestions"] = json.loads(row[6]) if row[6] else []
-            except:
-                item["relatedQuestions"] = []
-                
-            items.append(item)
-            
-        return {"items": items, "total": len(items)}
-    except Exception as e:
-        logger.error(f"测试端点出错: {e}")
-        return {"error": str(e), "items": [], "total": 0}
-
 # 包含API路由
 from app.api import api_router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
+# Prometheus 按惯例抓取根路径下的 /metrics
+if settings.METRICS_ENABLED:
+    from app.api.metrics import router as metrics_router
+    app.include_router(metrics_router, tags=["metrics"])
+
+# 管理接口，需要配置 ADMIN_TOKEN
+from app.api.admin import router as admin_router
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+
 @app.get("/")
 async def root():
     return {"message": "欢迎使用财知道API服务"}
@@ -1,5 +1,7 @@
 from app.models.db.news import News
 from app.models.db.learning import Learning
 from app.models.db.questions import Question
+from app.models.db.change_log import ChangeLog
+from app.models.db.tags import Tag, ItemTag
 
-__all__ = ["News", "Learning", "Question"] 
\ No newline at end of file
+__all__ = ["News", "Learning", "Question", "ChangeLog", "Tag", "ItemTag"]
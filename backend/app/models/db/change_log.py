@@ -0,0 +1,60 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+# 需要记录变更的表，表名同时作为同步接口中的实体类型
+SYNC_TABLES = ("news", "learning", "questions")
+
+# 变更类型
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+class ChangeLog(Base):
+    """
+    数据变更日志模型
+    
+    seq 单调递增，作为客户端增量同步的游标；删除操作同样记录一条日志（墓碑），
+    以便离线客户端删除本地缓存。
+    """
+    __tablename__ = "change_log"
+    __table_args__ = {'extend_existing': True, 'sqlite_autoincrement': True}
+    
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    op: Mapped[str] = mapped_column(String(10), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+def _log_change(connection, target, op: str) -> None:
+    """在同一事务中写入变更日志"""
+    table_name = getattr(target, "__tablename__", None)
+    if table_name not in SYNC_TABLES:
+        return
+    connection.execute(
+        ChangeLog.__table__.insert().values(
+            entity_type=table_name,
+            entity_id=target.id,
+            op=op,
+            changed_at=datetime.now(),
+        )
+    )
+
+
+@event.listens_for(Base, "after_insert", propagate=True)
+def _after_insert(mapper, connection, target):
+    _log_change(connection, target, OP_UPSERT)
+
+
+@event.listens_for(Base, "after_update", propagate=True)
+def _after_update(mapper, connection, target):
+    _log_change(connection, target, OP_UPSERT)
+
+
+@event.listens_for(Base, "after_delete", propagate=True)
+def _after_delete(mapper, connection, target):
+    _log_change(connection, target, OP_DELETE)
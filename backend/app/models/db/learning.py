@@ -1,20 +1,27 @@
 import json
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import List, Optional
 import uuid
 
+from app.core.compression import CompressedText
 from app.models.base import BaseModel
 
 
 class Learning(BaseModel):
     """学习内容数据库模型"""
     __tablename__ = "learning"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 按难度筛选，包含 id 使只取ID的子查询不必回表
+        Index("ix_learning_difficulty_id", "difficulty", "id"),
+        # 推荐内容按更新时间倒序
+        Index("ix_learning_updated_at", "updated_at"),
+        {'extend_existing': True},
+    )
     
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     short_description: Mapped[str] = mapped_column(Text, nullable=True)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
     difficulty: Mapped[str] = mapped_column(String(50), nullable=True)
     tags: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     related_items: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
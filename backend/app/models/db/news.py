@@ -1,23 +1,30 @@
 import json
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, JSON
+from sqlalchemy import Column, String, Text, DateTime, JSON, Index, select
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import List, Optional
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
+from app.core.compression import CompressedText
 from app.models.base import BaseModel
 
 
 class News(BaseModel):
     """新闻数据库模型"""
     __tablename__ = "news"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 按分类筛选并按发布日期倒序，包含 id 使只取ID的子查询不必回表
+        Index("ix_news_category_publish_date", "category", "publish_date", "id"),
+        # 最新新闻
+        Index("ix_news_publish_date", "publish_date"),
+        {'extend_existing': True},
+    )
     
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     summary: Mapped[str] = mapped_column(Text, nullable=True)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
     source: Mapped[str] = mapped_column(String(100), nullable=True)
     url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     publish_date: Mapped[datetime] = mapped_column(DateTime, nullable=True)
@@ -51,7 +58,10 @@ class News(BaseModel):
 
     @classmethod
     async def create_test_data(cls, db: AsyncSession) -> None:
-        """插入测试数据"""
+        """插入测试数据，已插入过时跳过"""
+        existing = await db.execute(select(cls.id).where(cls.url == "http://example.com/test1").limit(1))
+        if existing.first() is not None:
+            return
         test_news = [
             cls(
                 id=str(uuid.uuid4()),
@@ -1,19 +1,26 @@
 import json
-from sqlalchemy import Column, String, Text, Integer
+from sqlalchemy import Column, Index, String, Text, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import List, Optional
 
+from app.core.compression import CompressedText
 from app.models.base import BaseModel
 
 
 class Question(BaseModel):
     """问题数据库模型"""
     __tablename__ = "questions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 按分类筛选，包含 id 使只取ID的子查询不必回表
+        Index("ix_questions_category_id", "category", "id"),
+        # 热门问题按浏览量倒序
+        Index("ix_questions_view_count", "view_count"),
+        {'extend_existing': True},
+    )
     
     title: Mapped[str] = mapped_column(String(255), nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
-    answer: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
+    answer: Mapped[Optional[str]] = mapped_column(CompressedText, nullable=True)
     category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     view_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     answer_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
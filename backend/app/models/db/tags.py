@@ -0,0 +1,152 @@
+import json
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import ForeignKey, Index, Integer, String, delete, event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# 建立标签索引的表，表名同时作为 item_tags 中的实体类型
+TAGGED_TABLES = ("news", "learning", "questions")
+
+# 标签名的最大长度，超出的部分截断
+MAX_TAG_LENGTH = 50
+
+# 每条语句包含的标签名或ID数量，低于旧版SQLite的999个绑定参数上限
+TAG_QUERY_BATCH = 900
+
+
+class Tag(Base):
+    """标签模型，每个标签名一行"""
+    __tablename__ = "tags"
+    __table_args__ = {'extend_existing': True, 'sqlite_autoincrement': True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(MAX_TAG_LENGTH), nullable=False, unique=True)
+
+
+class ItemTag(Base):
+    """
+    内容与标签的关联模型
+
+    主键 (tag_id, entity_type, item_id) 用于按标签筛选，
+    索引 (entity_type, item_id, tag_id) 用于更新、删除某条内容的全部标签和按实体类型统计标签，
+    两者都覆盖了查询用到的全部列。
+    """
+    __tablename__ = "item_tags"
+    __table_args__ = (
+        Index("ix_item_tags_item", "entity_type", "item_id", "tag_id"),
+        {'extend_existing': True},
+    )
+
+    tag_id: Mapped[int] = mapped_column(Integer, ForeignKey("tags.id"), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    item_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+
+
+def decode_tags(value: Any) -> List[str]:
+    """
+    解析标签列的值
+
+    标签列存储为JSON字符串，news.tags 是JSON类型的列，读出的值可能还要再解析一次。
+    无法解析时返回空列表。
+    """
+    try:
+        while isinstance(value, str):
+            value = json.loads(value)
+    except ValueError:
+        return []
+    return [str(tag) for tag in value] if isinstance(value, list) else []
+
+
+def normalize_tags(tags: Iterable[Any]) -> List[str]:
+    """去掉空白和重复的标签，保持原有顺序"""
+    names: Dict[str, None] = {}
+    for tag in tags or []:
+        name = str(tag).strip()[:MAX_TAG_LENGTH]
+        if name:
+            names[name] = None
+    return list(names)
+
+
+def _tag_ids(connection: Connection, names: List[str]) -> Dict[str, int]:
+    """查询标签ID，不存在的标签先插入"""
+    tags = Tag.__table__
+    ids: Dict[str, int] = {}
+    for start in range(0, len(names), TAG_QUERY_BATCH):
+        batch = names[start:start + TAG_QUERY_BATCH]
+        ids.update(connection.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(batch))).all())
+    missing = [name for name in names if name not in ids]
+    if missing:
+        connection.execute(tags.insert(), [{"name": name} for name in missing])
+        for start in range(0, len(missing), TAG_QUERY_BATCH):
+            batch = missing[start:start + TAG_QUERY_BATCH]
+            ids.update(connection.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(batch))).all())
+    return ids
+
+
+def index_item_tags(connection: Connection, entity_type: str, items: Dict[str, Iterable[Any]], replace: bool = True) -> int:
+    """
+    在同一事务中写入内容的标签索引
+
+    Args:
+        connection: 数据库连接
+        entity_type: 实体类型（表名）
+        items: 内容ID -> 标签列表
+        replace: 是否先删除这些内容已有的索引，新插入的内容可以跳过
+
+    Returns:
+        写入的关联数
+    """
+    item_tags = ItemTag.__table__
+    item_ids = list(items)
+    if replace:
+        for start in range(0, len(item_ids), TAG_QUERY_BATCH):
+            batch = item_ids[start:start + TAG_QUERY_BATCH]
+            connection.execute(
+                delete(item_tags).where(item_tags.c.entity_type == entity_type, item_tags.c.item_id.in_(batch))
+            )
+
+    names = {item_id: normalize_tags(tags) for item_id, tags in items.items()}
+    all_names = normalize_tags(name for item_names in names.values() for name in item_names)
+    if not all_names:
+        return 0
+    ids = _tag_ids(connection, all_names)
+    rows = [
+        {"tag_id": ids[name], "entity_type": entity_type, "item_id": item_id}
+        for item_id, item_names in names.items()
+        for name in item_names
+    ]
+    connection.execute(item_tags.insert(), rows)
+    return len(rows)
+
+
+def _entity_type(target) -> str:
+    table_name = getattr(target, "__tablename__", None)
+    return table_name if table_name in TAGGED_TABLES else None
+
+
+@event.listens_for(Base, "after_insert", propagate=True)
+def _after_insert(mapper, connection, target):
+    entity_type = _entity_type(target)
+    if entity_type:
+        index_item_tags(connection, entity_type, {target.id: decode_tags(target.tags)}, replace=False)
+
+
+@event.listens_for(Base, "after_update", propagate=True)
+def _after_update(mapper, connection, target):
+    entity_type = _entity_type(target)
+    # 只有标签列变化时才重建索引
+    if entity_type and inspect(target).attrs.tags.history.has_changes():
+        index_item_tags(connection, entity_type, {target.id: decode_tags(target.tags)})
+
+
+@event.listens_for(Base, "after_delete", propagate=True)
+def _after_delete(mapper, connection, target):
+    entity_type = _entity_type(target)
+    if entity_type:
+        item_tags = ItemTag.__table__
+        connection.execute(
+            delete(item_tags).where(item_tags.c.entity_type == entity_type, item_tags.c.item_id == target.id)
+        )
@@ -0,0 +1,21 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel as PydanticBaseModel
+
+
+class FacetCount(PydanticBaseModel):
+    """分面取值计数模型"""
+    value: str
+    count: int
+
+
+class EntityFacets(PydanticBaseModel):
+    """单类内容的分面计数模型"""
+    type: str  # 'news', 'learning' 或 'questions'
+    total: int  # 满足条件的内容数
+    facets: Dict[str, List[FacetCount]]  # 维度 -> 各取值计数，如 category、difficulty、tag
+
+
+class FacetsResponse(PydanticBaseModel):
+    """分面计数响应模型"""
+    query: Optional[str] = None
+    items: List[EntityFacets]
@@ -0,0 +1,14 @@
+from typing import List
+from pydantic import BaseModel as PydanticBaseModel
+
+from app.models.learning import LearningItem
+from app.models.news import NewsItem
+from app.models.questions import QuestionItem
+
+
+class HomeFeed(PydanticBaseModel):
+    """首页聚合响应模型"""
+    news: List[NewsItem]
+    learning: List[LearningItem]
+    questions: List[QuestionItem]
+    generatedAt: str  # 作为ISO格式字符串传输
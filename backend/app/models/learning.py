@@ -3,7 +3,9 @@ from sqlalchemy import Column, String, Text
 from pydantic import BaseModel as PydanticBaseModel
 import json
 
+from app.core.compression import CompressedText
 from app.models.base import BaseModel
+from app.models.tags import TagCount
 
 # 数据库模型
 class Learning(BaseModel):
@@ -13,7 +15,7 @@ class Learning(BaseModel):
     
     title = Column(String(255), nullable=False, index=True)
     short_description = Column(String(500), nullable=False)
-    content = Column(Text, nullable=False)
+    content = Column(CompressedText, nullable=False)
     difficulty = Column(String(20), nullable=False, index=True)
     tags = Column(Text, nullable=False, default='[]')  # 存储为JSON字符串
     related_items = Column(Text, nullable=True)  # 存储为JSON字符串
@@ -82,4 +84,5 @@ class LearningItem(LearningBase):
 class LearningList(PydanticBaseModel):
     """学习内容列表响应模型"""
     items: List[LearningItem]
-    total: int 
\ No newline at end of file
+    total: int
+    facets: List[TagCount] = []  # 当前筛选条件下各标签的内容数，按数量降序
\ No newline at end of file
@@ -3,6 +3,7 @@ from pydantic import BaseModel as PydanticBaseModel
 from datetime import datetime
 
 from app.models.db.news import News as NewsModel
+from app.models.tags import TagCount
 
 # Pydantic模型 - 用于API请求和响应
 class NewsBase(PydanticBaseModel):
@@ -51,7 +52,8 @@ class NewsItem(NewsBase):
 class NewsList(PydanticBaseModel):
     """新闻列表响应模型"""
     items: List[NewsItem]
-    total: int 
+    total: int
+    facets: List[TagCount] = []  # 当前筛选条件下各标签的内容数，按数量降序
 
 class News(PydanticBaseModel):
     """新闻模型"""
@@ -4,7 +4,9 @@ from sqlalchemy import Column, String, Text, Integer, Table
 from pydantic import BaseModel as PydanticBaseModel, Field
 import json
 
+from app.core.compression import CompressedText
 from app.models.base import BaseModel
+from app.models.tags import TagCount
 
 # 数据库模型
 class Question(BaseModel):
@@ -12,8 +14,12 @@ class Question(BaseModel):
     __tablename__ = "questions"
     __table_args__ = {'extend_existing': True}  # 解决重复表定义问题
     
+    # 与 app.models.db.questions 中的定义一致，不依赖两个模型的导入顺序
+    title = Column(String(255), nullable=False)
+    content = Column(CompressedText, nullable=False)
+    category = Column(String(50), nullable=True)
     question = Column(String(500), nullable=False, index=True)
-    answer = Column(Text, nullable=False)
+    answer = Column(CompressedText, nullable=False)
     difficulty = Column(String(20), nullable=False, index=True)
     categories = Column(Text, nullable=False, default='[]')  # 存储为JSON字符串
     tags = Column(Text, nullable=False, default='[]')  # 存储为JSON字符串
@@ -101,4 +107,5 @@ class QuestionItem(QuestionBase):
 class QuestionList(PydanticBaseModel):
     """问题列表响应模型"""
     items: List[QuestionItem]
-    total: int 
\ No newline at end of file
+    total: int
+    facets: List[TagCount] = []  # 当前筛选条件下各标签的内容数，按数量降序
\ No newline at end of file
@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel as PydanticBaseModel
+
+from app.models.learning import LearningItem
+from app.models.news import NewsItem
+from app.models.questions import QuestionItem
+
+
+class SyncUpserts(PydanticBaseModel):
+    """新增或更新的内容，按类型分组"""
+    news: List[NewsItem] = []
+    learning: List[LearningItem] = []
+    questions: List[QuestionItem] = []
+
+
+class SyncDeletes(PydanticBaseModel):
+    """已删除内容的ID，按类型分组"""
+    news: List[str] = []
+    learning: List[str] = []
+    questions: List[str] = []
+
+
+class SyncResponse(PydanticBaseModel):
+    """增量同步响应模型"""
+    upserts: SyncUpserts
+    deletes: SyncDeletes
+    nextToken: str  # 下次同步时作为since参数传回
+    hasMore: bool  # 为True时客户端应立即用nextToken继续拉取
@@ -0,0 +1,7 @@
+from pydantic import BaseModel as PydanticBaseModel
+
+
+class TagCount(PydanticBaseModel):
+    """标签统计模型"""
+    name: str
+    count: int
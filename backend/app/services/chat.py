@@ -24,7 +24,7 @@ class ChatService:
         """
         # TODO: 在实际项目中，这里应该调用真实的AI API
         # 当前使用模拟回复
-        logger.info(f"接收到聊天请求: {request.message}")
+        logger.debug("接收到聊天请求: %s", request.message)
         
         # 创建上下文历史
         history = request.history or []
@@ -46,7 +46,7 @@ class ChatService:
         else:
             response = "作为您的财经助手，我可以回答有关投资、理财、市场趋势等财经问题。请具体说明您想了解的财经知识，我会尽力提供专业的解答。"
         
-        logger.info(f"生成的回复: {response}")
+        logger.debug("生成的回复: %s", response)
         return ChatResponse(response=response)
 
 
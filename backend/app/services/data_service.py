@@ -1,102 +1,818 @@
-import json
+import asyncio
+import bisect
+import itertools
 import os
-from typing import Dict, List, TypeVar, Generic, Type, Optional, Any
-from pathlib import Path
-from pydantic import BaseModel
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ConfigDict, ValidationError
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import metrics
+from app.utils.catalog_snapshot import CatalogSnapshot, default_snapshot_path
+from app.utils.json_store import append_jsonl, atomic_write_json, iter_json_array, iter_jsonl
 
 # 定义泛型类型变量，限制为BaseModel的子类
 T = TypeVar('T', bound=BaseModel)
 
+# 搜索文本中字段之间的分隔符，避免关键词跨字段匹配
+_FIELD_SEPARATOR = "\x00"
+
+# 默认建立二级索引的字段
+DEFAULT_INDEX_FIELDS = ("category", "difficulty")
+
+# 变更日志记录的操作类型
+LOG_UPSERT = "upsert"
+LOG_DELETE = "delete"
+
+# 模型类到其不可变子类的映射
+_frozen_models: Dict[type, type] = {}
+
+# 已创建的数据服务，由文件监视任务检查数据文件是否变更
+_instances: "weakref.WeakSet[DataService]" = weakref.WeakSet()
+
+
+def _frozen_model(model_class: Type[T]) -> Type[T]:
+    """获取模型的不可变子类，加载后的数据项在所有请求间共享，不允许被修改"""
+    frozen = _frozen_models.get(model_class)
+    if frozen is None:
+        frozen = type(model_class.__name__, (model_class,), {
+            "__module__": model_class.__module__,
+            "model_config": ConfigDict(frozen=True),
+        })
+        _frozen_models[model_class] = frozen
+    return frozen
+
+
+class _Superseded(Exception):
+    """合并期间数据文件已被整体重写，放弃替换"""
+
+
+class _Descending:
+    """倒序排列时包装排序键，使按升序维护的有序列表得到倒序结果"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+class _SortedList:
+    """按排序键升序排列的数据项列表，插入和删除通过二分查找定位"""
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.items: List[BaseModel] = []
+
+    def insert(self, key: Any, item: BaseModel) -> None:
+        position = bisect.bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, item)
+
+    def remove(self, key: Any) -> None:
+        position = bisect.bisect_left(self.keys, key)
+        del self.keys[position]
+        del self.items[position]
+
+    def copy(self) -> "_SortedList":
+        clone = _SortedList()
+        clone.keys = list(self.keys)
+        clone.items = list(self.items)
+        return clone
+
+
+class _Snapshot:
+    """
+    一次加载得到的全部数据及索引
+
+    快照一旦被读取方看到就不再修改。重新加载时整体替换；单个数据项的修改
+    在副本上进行（复制列表和字典中的引用，只复制受影响的二级索引列表），
+    通过二分查找调整受影响的位置后再整体替换。排序键为 (排序字段, 序号)，
+    序号保证键唯一，排序字段相同时保持文件中的先后顺序。
+    """
+
+    __slots__ = ("keys", "items", "search_text", "by_id", "seqs", "indexes", "overrides", "next_seq", "owned")
+
+    def __init__(self, index_fields: Iterable[str] = ()):
+        self.keys: List[Any] = []  # 每个数据项的排序键（升序）
+        self.items: List[BaseModel] = []  # 按排序规则排列的数据项
+        self.search_text: List[str] = []  # 每个数据项预先小写拼接的字符串字段
+        self.by_id: Dict[str, BaseModel] = {}  # ID -> 数据项
+        self.seqs: Dict[str, int] = {}  # ID -> 序号
+        self.indexes: Dict[str, Dict[Any, _SortedList]] = {field: {} for field in index_fields}  # 字段 -> 字段值 -> 数据项
+        self.overrides: Dict[str, Optional[Dict[str, Any]]] = {}  # 变更日志中的记录，ID -> 原始数据（删除为None）
+        self.next_seq = 0
+        self.owned: set = set()  # 副本中已复制、可以直接修改的二级索引列表 (字段, 字段值)
+
+    def copy(self) -> "_Snapshot":
+        """复制快照，二级索引中的有序列表在修改前才复制"""
+        clone = _Snapshot()
+        clone.keys = list(self.keys)
+        clone.items = list(self.items)
+        clone.search_text = list(self.search_text)
+        clone.by_id = dict(self.by_id)
+        clone.seqs = dict(self.seqs)
+        clone.indexes = {field: dict(index) for field, index in self.indexes.items()}
+        clone.overrides = dict(self.overrides)
+        clone.next_seq = self.next_seq
+        return clone
+
+    def sorted_items(self, field: str, value: Any) -> _SortedList:
+        """获取可以修改的二级索引列表，共享的列表先复制"""
+        index = self.indexes[field]
+        sorted_items = index.get(value)
+        if sorted_items is None:
+            sorted_items = index[value] = _SortedList()
+        elif (field, value) not in self.owned:
+            sorted_items = index[value] = sorted_items.copy()
+        self.owned.add((field, value))
+        return sorted_items
+
 
 class DataService(Generic[T]):
-    """通用数据访问服务，处理JSON文件的读写操作"""
-    
-    def __init__(self, file_name: str, model_class: Type[T]):
+    """
+    通用数据访问服务，处理JSON文件的读写操作
+
+    数据在加载时一次性校验为不可变的模型实例，并建立ID索引、搜索文本和
+    二级索引，之后的查询都不再重新构造模型或扫描原始数据。
+
+    单个数据项的修改追加写入同名的 .log.jsonl 变更日志，加载时在JSON文件的
+    基础上重放；日志条数超过阈值后在后台线程合并回JSON文件，合并期间的写入
+    追加到新的日志。JSON文件总是先写入临时
+    文件再原子替换，写入过程中进程退出不会损坏数据。
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        model_class: Type[T],
+        adapter: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        index_fields: Iterable[str] = DEFAULT_INDEX_FIELDS,
+        sort_key: Optional[Callable[[T], Any]] = None,
+        reverse: bool = False,
+        snapshot_section: Optional[str] = None,
+    ):
         """
         初始化数据服务
-        
+
         Args:
             file_name: 数据文件名
             model_class: 数据模型类
+            adapter: 把JSON文件中的原始字段转换为模型字段的函数
+            index_fields: 需要建立二级索引的字段，列表字段按每个元素建立索引
+            sort_key: 数据项的排序键，查询结果均按此顺序返回
+            reverse: 是否倒序排列
+            snapshot_section: 内容目录快照（app.utils.catalog_snapshot）中对应的分区名，
+                快照由JSON文件生成且数据文件此后未变化时从快照加载，省去解析JSON和校验模型
         """
         self.file_path = settings.DATA_DIR / file_name
+        self.log_path = self.file_path.with_name(f"{self.file_path.stem}.log.jsonl")
+        # 合并期间由当前日志转出的待合并日志，合并完成后删除
+        self.compacting_path = self.file_path.with_name(f"{self.file_path.stem}.log.compacting.jsonl")
         self.model_class = model_class
-        self._data: List[Dict[str, Any]] = []
+        self.adapter = adapter
+        self.index_fields = tuple(index_fields)
+        self.sort_key = sort_key
+        self.reverse = reverse
+        self.snapshot_section = snapshot_section
+        self.source = "json"  # 最近一次加载的数据来源：json 或 snapshot
+        self._snapshot = _Snapshot(self.index_fields)
+        self._signature: Optional[tuple] = None  # 已加载的数据文件和日志文件的 (修改时间, 大小)
+        self._reload_lock = asyncio.Lock()
+        self._write_lock = threading.Lock()
+        self._compact_lock = threading.Lock()  # 同一时刻只进行一次合并
+        self._compaction: Optional[threading.Thread] = None  # 进行中的后台合并
+        self._generation = 0  # save_data 每次整体写入数据文件时加1
+        self._log_entries = 0  # 变更日志中尚未合并的记录数
+        self.reload_count = 0  # 热加载次数
+        self.last_reload_seconds = 0.0  # 最近一次加载耗时
         self._load_data()
-    
+        _instances.add(self)
+
+    def _file_signature(self) -> Optional[tuple]:
+        """获取数据文件和变更日志的修改时间和大小，数据文件不存在时返回None"""
+        signature = []
+        for path in (self.file_path, self.compacting_path, self.log_path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if path == self.file_path:
+                    return None
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _read_log(self) -> Tuple[Dict[str, Optional[Dict[str, Any]]], int]:
+        """
+        读取变更日志，待合并的日志在前
+
+        Returns:
+            (ID -> 最后一次写入的原始数据，删除为None, 日志记录数)
+        """
+        overrides: Dict[str, Optional[Dict[str, Any]]] = {}
+        log_entries = 0
+        for entry in itertools.chain(iter_jsonl(self.compacting_path), iter_jsonl(self.log_path)):
+            log_entries += 1
+            if entry.get('op') == LOG_UPSERT:
+                item = entry['item']
+                overrides[item.get('id')] = item
+            elif entry.get('op') == LOG_DELETE:
+                overrides[entry.get('id')] = None
+        return overrides, log_entries
+
+    def _validate(self, raw: Dict[str, Any], trusted: bool = False) -> Optional[T]:
+        """
+        把原始数据校验为不可变的模型实例，无效时返回None
+
+        trusted 为True时数据来自由同一个JSON文件生成的内容目录快照，快照由已校验的
+        模型导出，直接构造模型实例。
+        """
+        if trusted:
+            return _frozen_model(self.model_class).model_construct(**raw)
+        try:
+            return _frozen_model(self.model_class)(**(self.adapter(raw) if self.adapter else raw))
+        except ValidationError as e:
+            logger.warning(f"跳过 {self.file_path} 中无效的数据项 {raw.get('id')}: {e.error_count()} 个字段错误")
+            return None
+
+    @staticmethod
+    def _search_text(item: BaseModel) -> str:
+        """拼接数据项的字符串字段作为搜索文本"""
+        return _FIELD_SEPARATOR.join(
+            value.lower() for value in item.__dict__.values() if isinstance(value, str)
+        )
+
+    def _order_key(self, item: BaseModel, seq: int) -> Any:
+        """数据项的排序键"""
+        if self.sort_key is None:
+            return seq
+        key = self.sort_key(item)
+        return (_Descending(key) if self.reverse else key, seq)
+
+    @staticmethod
+    def _index_values(item: BaseModel, field: str) -> List[Any]:
+        """数据项在二级索引字段上的取值，列表字段取每个元素"""
+        value = getattr(item, field, None)
+        return [key for key in (value if isinstance(value, (list, tuple)) else (value,)) if key is not None]
+
+    def _build_snapshot(
+        self,
+        raw_items: Iterable[Dict[str, Any]],
+        overrides: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+        trusted: bool = False,
+    ) -> _Snapshot:
+        """
+        逐条校验原始数据并建立索引
+
+        原始数据校验后即被丢弃，只保留模型实例。overrides 中的记录替换同ID的
+        数据项并保持其位置（None 表示删除），文件中没有的记录按日志顺序追加在最后。
+        """
+        overrides = overrides or {}
+        snapshot = _Snapshot(self.index_fields)
+        snapshot.overrides = overrides
+        entries: List[List[Any]] = []  # [序号, 数据项]
+        positions: Dict[str, int] = {}  # ID -> entries 中的下标
+        replaced = set()
+
+        def add(raw: Dict[str, Any], trusted: bool = False) -> None:
+            item = self._validate(raw, trusted)
+            if item is None:
+                return
+            item_id = getattr(item, 'id', None)
+            position = positions.get(item_id)
+            if position is not None:
+                # 文件中重复的ID，后出现的数据替换之前的数据
+                entries[position][1] = item
+                return
+            if item_id is not None:
+                positions[item_id] = len(entries)
+            entries.append([len(entries), item])
+
+        for raw in raw_items:
+            item_id = raw.get('id')
+            if item_id in overrides:
+                if item_id in replaced:
+                    continue
+                replaced.add(item_id)
+                raw = overrides[item_id]
+                if raw is None:
+                    continue
+                add(raw)
+            else:
+                add(raw, trusted)
+        for item_id, raw in overrides.items():
+            if raw is not None and item_id not in replaced:
+                add(raw)
+
+        keyed = [(self._order_key(item, seq), seq, item) for seq, item in entries]
+        if self.sort_key is not None:
+            keyed.sort(key=lambda entry: entry[0])
+        for key, seq, item in keyed:
+            snapshot.keys.append(key)
+            snapshot.items.append(item)
+            snapshot.search_text.append(self._search_text(item))
+            item_id = getattr(item, 'id', None)
+            if item_id is not None:
+                snapshot.by_id[item_id] = item
+                snapshot.seqs[item_id] = seq
+            for field, index in snapshot.indexes.items():
+                for value in self._index_values(item, field):
+                    sorted_items = index.get(value)
+                    if sorted_items is None:
+                        sorted_items = index[value] = _SortedList()
+                    # 按排序顺序遍历，直接追加即保持有序
+                    sorted_items.keys.append(key)
+                    sorted_items.items.append(item)
+        snapshot.next_seq = len(entries)
+        return snapshot
+
+    def _put(self, snapshot: _Snapshot, item: T) -> None:
+        """在快照副本中插入或替换单个数据项，只调整该数据项所在的位置"""
+        item_id = item.id
+        seq = snapshot.seqs.get(item_id)
+        if seq is None:
+            seq = snapshot.next_seq
+            snapshot.next_seq += 1
+        else:
+            # 更新时沿用原序号，排序字段相同时位置不变
+            self._remove(snapshot, item_id)
+        key = self._order_key(item, seq)
+        position = bisect.bisect_left(snapshot.keys, key)
+        snapshot.keys.insert(position, key)
+        snapshot.items.insert(position, item)
+        snapshot.search_text.insert(position, self._search_text(item))
+        snapshot.by_id[item_id] = item
+        snapshot.seqs[item_id] = seq
+        for field in snapshot.indexes:
+            for value in self._index_values(item, field):
+                snapshot.sorted_items(field, value).insert(key, item)
+
+    def _remove(self, snapshot: _Snapshot, item_id: str) -> None:
+        """从快照副本中删除单个数据项"""
+        item = snapshot.by_id.pop(item_id)
+        key = self._order_key(item, snapshot.seqs.pop(item_id))
+        position = bisect.bisect_left(snapshot.keys, key)
+        del snapshot.keys[position]
+        del snapshot.items[position]
+        del snapshot.search_text[position]
+        for field, index in snapshot.indexes.items():
+            for value in self._index_values(item, field):
+                sorted_items = snapshot.sorted_items(field, value)
+                sorted_items.remove(key)
+                if not sorted_items.keys:
+                    del index[value]
+                    snapshot.owned.discard((field, value))
+
     def _load_data(self) -> None:
         """从JSON文件加载数据"""
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as f:
-                    self._data = json.load(f)
-                logger.info(f"成功从 {self.file_path} 加载了 {len(self._data)} 条数据")
+            self._signature = self._file_signature()
+            if self._signature is not None:
+                started = time.perf_counter()
+                self._snapshot, self._log_entries, self.source = self._read_and_build()
+                self.last_reload_seconds = time.perf_counter() - started
+                logger.info(f"成功从 {self.file_path}（{self.source}）加载了 {len(self._snapshot.items)} 条数据")
             else:
                 logger.warning(f"数据文件 {self.file_path} 不存在")
-                self._data = []
+                self._snapshot = _Snapshot(self.index_fields)
         except Exception as e:
             logger.error(f"加载数据文件 {self.file_path} 失败: {str(e)}")
-            self._data = []
-    
+            self._snapshot = _Snapshot(self.index_fields)
+
+    def data_file_info(self) -> Optional[Dict[str, Any]]:
+        """已加载的数据文件的名称、修改时间和大小，生成内容目录快照时记录"""
+        if self._signature is None:
+            return None
+        mtime_ns, size = self._signature[0]
+        return {"name": self.file_path.name, "mtime_ns": mtime_ns, "size": size}
+
+    def _open_catalog(self) -> Optional[CatalogSnapshot]:
+        """
+        打开可用的内容目录快照
+
+        只使用由JSON文件生成、且记录的数据文件修改时间和大小与当前文件一致的快照；
+        快照不存在、来源或数据文件不一致、或无法读取时返回None。
+        """
+        if not self.snapshot_section:
+            return None
+        path = default_snapshot_path()
+        stat = os.stat(self.file_path)
+        current = {"name": self.file_path.name, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        try:
+            catalog = CatalogSnapshot.open(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"无法读取内容目录快照 {path}，从JSON文件加载: {str(e)}")
+            return None
+        recorded = catalog.directory.get("files", {}).get(self.snapshot_section)
+        if catalog.directory.get("source") != "json" or recorded != current or self.snapshot_section not in catalog.sections:
+            logger.info(f"内容目录快照 {path} 不是由当前的 {self.file_path} 生成，从JSON文件加载")
+            catalog.close()
+            return None
+        return catalog
+
+    def _read_and_build(self) -> Tuple[_Snapshot, int, str]:
+        """
+        读取数据、重放变更日志并建立索引，在线程池中执行
+
+        Returns:
+            (快照, 重放的日志记录数, 数据来源)
+        """
+        overrides, log_entries = self._read_log()
+        catalog = self._open_catalog()
+        if catalog is not None:
+            # 快照生成之后写入的变更日志照常重放；生成之前的记录重放一次结果相同
+            with catalog:
+                records = (record.to_dict() for record in catalog[self.snapshot_section])
+                return self._build_snapshot(records, overrides, trusted=True), log_entries, "snapshot"
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            return self._build_snapshot(iter_json_array(f), overrides), log_entries, "json"
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        数据文件变更后重新加载
+
+        解析和建立索引在线程池中完成，完成后整体替换快照；读取方始终看到
+        完整的旧快照或新快照。加载失败时保留旧数据。
+
+        Args:
+            force: 文件未变更时是否也重新加载
+
+        Returns:
+            是否替换了数据
+        """
+        async with self._reload_lock:
+            signature = await asyncio.to_thread(self._file_signature)
+            if signature is None or (signature == self._signature and not force):
+                return False
+
+            started = time.perf_counter()
+            try:
+                snapshot, log_entries, source = await asyncio.to_thread(self._read_and_build)
+            except Exception as e:
+                # 记录签名，避免对同一个损坏的文件反复报错；文件再次写入后会重新加载
+                self._signature = signature
+                logger.error(f"重新加载数据文件 {self.file_path} 失败，继续使用旧数据: {str(e)}")
+                return False
+
+            previous = len(self._snapshot.items)
+            with self._write_lock:
+                self._snapshot = snapshot
+                self._log_entries = log_entries
+                self.source = source
+                self._signature = signature
+            self.reload_count += 1
+            self.last_reload_seconds = time.perf_counter() - started
+            logger.info(
+                f"重新加载数据文件 {self.file_path}: {previous} -> {len(snapshot.items)} 条数据，"
+                f"耗时 {self.last_reload_seconds * 1000:.1f}ms"
+            )
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """获取加载统计数据"""
+        return {
+            "file": self.file_path.name,
+            "items": len(self._snapshot.items),
+            "source": self.source,
+            "reloads": self.reload_count,
+            "log_entries": self._log_entries,
+            "last_reload_seconds": self.last_reload_seconds,
+        }
+
+    def __len__(self) -> int:
+        return len(self._snapshot.items)
+
     def get_all(self) -> List[T]:
         """获取所有数据项"""
-        return [self.model_class(**item) for item in self._data]
-    
+        return list(self._snapshot.items)
+
     def get_by_id(self, item_id: str) -> Optional[T]:
         """根据ID获取特定数据项"""
-        for item in self._data:
-            if item.get('id') == item_id:
-                return self.model_class(**item)
-        return None
-    
+        return self._snapshot.by_id.get(item_id)
+
+    def filter_by(self, field: str, value: Any) -> List[T]:
+        """
+        按二级索引字段筛选数据项
+
+        Args:
+            field: 建立了索引的字段名
+            value: 字段值，列表字段匹配任一元素
+
+        Returns:
+            符合条件的数据项列表
+        """
+        snapshot = self._snapshot
+        index = snapshot.indexes.get(field)
+        if index is None:
+            raise KeyError(f"字段 {field} 没有建立索引")
+        sorted_items = index.get(value)
+        return list(sorted_items.items) if sorted_items is not None else []
+
     def search(self, keyword: str) -> List[T]:
         """
         搜索数据项
-        
+
         Args:
             keyword: 搜索关键词
-            
+
         Returns:
             符合条件的数据项列表
         """
-        result = []
+        snapshot = self._snapshot
         keyword = keyword.lower()
-        
-        for item in self._data:
-            # 搜索所有字符串字段
-            for key, value in item.items():
-                if isinstance(value, str) and keyword in value.lower():
-                    result.append(self.model_class(**item))
-                    break
-        
-        return result
-    
+        return [item for item, text in zip(snapshot.items, snapshot.search_text) if keyword in text]
+
+    def save_item(self, item: T) -> bool:
+        """
+        新增或更新单个数据项
+
+        只向变更日志追加一行记录，写入成本与单个数据项大小相当；
+        内存中在快照副本上调整该数据项在有序列表和二级索引中的位置，
+        再整体替换快照，读取方不会看到修改到一半的数据。
+
+        Args:
+            item: 数据项，按ID匹配已有数据
+
+        Returns:
+            保存是否成功
+        """
+        with self._write_lock:
+            try:
+                raw = item.model_dump(mode='json')
+                frozen = self._validate(raw)
+                if frozen is None:
+                    return False
+                append_jsonl(self.log_path, {"op": LOG_UPSERT, "item": raw})
+            except Exception as e:
+                logger.error(f"保存数据项到 {self.log_path} 失败: {str(e)}")
+                return False
+
+            snapshot = self._snapshot.copy()
+            self._put(snapshot, frozen)
+            snapshot.overrides[frozen.id] = raw
+            self._snapshot = snapshot
+            self._commit_log_entry()
+            return True
+
+    def delete_item(self, item_id: str) -> bool:
+        """
+        删除单个数据项
+
+        Args:
+            item_id: 数据项ID
+
+        Returns:
+            是否删除了数据项
+        """
+        with self._write_lock:
+            if item_id not in self._snapshot.by_id:
+                return False
+            try:
+                append_jsonl(self.log_path, {"op": LOG_DELETE, "id": item_id})
+            except Exception as e:
+                logger.error(f"写入删除记录到 {self.log_path} 失败: {str(e)}")
+                return False
+
+            snapshot = self._snapshot.copy()
+            self._remove(snapshot, item_id)
+            snapshot.overrides[item_id] = None
+            self._snapshot = snapshot
+            self._commit_log_entry()
+            return True
+
+    def _commit_log_entry(self) -> None:
+        """记录已写入一条日志（调用方持有写锁），日志过长时在后台线程合并回JSON文件"""
+        self._log_entries += 1
+        if self._log_entries >= settings.DATA_LOG_COMPACT_THRESHOLD and self._compaction is None:
+            self._compaction = threading.Thread(
+                target=self._compact_in_background, name=f"compact-{self.file_path.name}", daemon=True,
+            )
+            self._compaction.start()
+        self._signature = self._file_signature()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self._compact()
+        finally:
+            with self._write_lock:
+                self._compaction = None
+
+    def compact(self) -> bool:
+        """
+        在调用方线程中把变更日志合并回JSON文件，后台合并进行中时等待其完成
+
+        Returns:
+            合并是否成功
+        """
+        return self._compact()
+
+    def _rotate_log(self) -> Optional[Tuple[Dict[str, Optional[Dict[str, Any]]], int, int]]:
+        """
+        把当前变更日志转为待合并的日志（调用方持有写锁），之后的写入追加到新的日志
+
+        上次合并失败留下的待合并日志保留，当前日志追加在其后。
+
+        Returns:
+            (待合并的记录, 记录数, 数据文件版本)，没有需要合并的记录时返回None
+        """
+        if not self._snapshot.overrides and not self.compacting_path.exists():
+            return None
+        if self.log_path.exists():
+            if self.compacting_path.exists():
+                with open(self.log_path, 'rb') as src, open(self.compacting_path, 'ab') as dst:
+                    dst.write(src.read())
+                os.unlink(self.log_path)
+            else:
+                os.replace(self.log_path, self.compacting_path)
+        overrides, log_entries = self._snapshot.overrides, self._log_entries
+        # 新的日志从空开始，已转出的记录只由合并使用；overrides 不被读取方使用，可以直接替换
+        self._snapshot.overrides = {}
+        self._log_entries = 0
+        return overrides, log_entries, self._generation
+
+    def _compact(self) -> bool:
+        with self._compact_lock:
+            with self._write_lock:
+                rotated = self._rotate_log()
+                self._signature = self._file_signature()
+            if rotated is None:
+                return True
+            overrides, log_entries, generation = rotated
+
+            def replace(tmp_path: str, path) -> None:
+                with self._write_lock:
+                    # 合并期间 save_data 写入了全部数据，合并结果已经过时
+                    if self._generation != generation:
+                        raise _Superseded()
+                    os.replace(tmp_path, path)
+                    # 新文件已包含全部待合并的记录；若在删除前退出，重放日志也是幂等的
+                    if self.compacting_path.exists():
+                        os.unlink(self.compacting_path)
+                    self._signature = self._file_signature()
+
+            try:
+                # 写入JSON文件不持有写锁，期间的保存照常追加到新的日志
+                atomic_write_json(self.file_path, self._compacted_records(overrides), replace=replace)
+            except _Superseded:
+                return False
+            except Exception as e:
+                # 合并失败不影响已写入日志的数据，记录放回内存，下次合并时重试
+                with self._write_lock:
+                    if self._generation == generation:
+                        overrides.update(self._snapshot.overrides)
+                        self._snapshot.overrides = overrides
+                        self._log_entries += log_entries
+                logger.error(f"合并变更日志到 {self.file_path} 失败: {str(e)}")
+                return False
+            logger.info(f"已将 {log_entries} 条变更记录合并到 {self.file_path}")
+            return True
+
+    def _compacted_records(self, overrides: Dict[str, Optional[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        流式读取JSON文件并代入变更日志中的记录
+
+        没有修改过的数据项原样写回，保留文件中的字段格式；修改过的数据项写入
+        与日志中相同的记录。
+        """
+        replaced = set()
+        if self.file_path.exists():
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                for raw in iter_json_array(f):
+                    item_id = raw.get('id')
+                    if item_id in overrides:
+                        if item_id in replaced:
+                            continue
+                        replaced.add(item_id)
+                        raw = overrides[item_id]
+                        if raw is None:
+                            continue
+                    yield raw
+        for item_id, raw in overrides.items():
+            if raw is not None and item_id not in replaced:
+                yield raw
+
     def save_data(self, data: List[T]) -> bool:
         """
-        保存数据到JSON文件
-        
+        保存全部数据到JSON文件
+
         Args:
             data: 要保存的数据列表
-            
+
         Returns:
             保存是否成功
         """
-        try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            
-            # 将模型对象转换为字典
-            data_dicts = [item.dict() for item in data]
-            
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data_dicts, f, ensure_ascii=False, indent=2)
-            
+        with self._write_lock:
+            try:
+                records = [item.model_dump(mode='json') for item in data]
+                snapshot = self._build_snapshot(records)
+                atomic_write_json(self.file_path, records)
+                # 进行中的合并不再替换数据文件
+                self._generation += 1
+                # 新文件已包含全部数据，清空变更日志
+                for path in (self.log_path, self.compacting_path):
+                    if path.exists():
+                        os.unlink(path)
+            except Exception as e:
+                logger.error(f"保存数据到 {self.file_path} 失败: {str(e)}")
+                return False
+
             logger.info(f"成功保存 {len(data)} 条数据到 {self.file_path}")
-            self._data = data_dicts
+            self._log_entries = 0
+            self._snapshot = snapshot
+            self._signature = self._file_signature()
             return True
-        except Exception as e:
-            logger.error(f"保存数据到 {self.file_path} 失败: {str(e)}")
-            return False 
\ No newline at end of file
+
+
+class DataWatcher:
+    """
+    数据文件监视器
+
+    定期检查所有数据服务的文件修改时间和大小，发生变化时在后台重新加载，
+    修改 data 目录下的JSON文件后无需重启服务。
+    """
+
+    def __init__(self, interval: float = None):
+        """
+        Args:
+            interval: 检查间隔（秒），默认使用配置
+        """
+        self.interval = interval if interval is not None else settings.DATA_RELOAD_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> int:
+        """
+        检查一次所有数据文件
+
+        Returns:
+            重新加载的数据服务数量
+        """
+        results = await asyncio.gather(*(service.reload() for service in list(_instances)))
+        return sum(results)
+
+    def start(self) -> None:
+        """启动监视任务，检查间隔不大于0时不启动"""
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """停止监视任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"检查数据文件失败: {str(e)}")
+
+
+def data_service_stats() -> List[Dict[str, Any]]:
+    """获取所有数据服务的加载统计数据"""
+    return [service.stats() for service in list(_instances)]
+
+
+@metrics.register_collector
+def _data_service_metrics():
+    """数据文件的加载状态指标"""
+    stats = data_service_stats()
+    gauges = {
+        "data_service_items": ("数据文件中的数据项数", "items"),
+        "data_service_log_entries": ("变更日志中尚未合并的记录数", "log_entries"),
+        "data_service_last_reload_seconds": ("最近一次加载耗时（秒）", "last_reload_seconds"),
+    }
+    families = [
+        (name, "gauge", documentation, [("", {"file": item["file"]}, item[key]) for item in stats])
+        for name, (documentation, key) in gauges.items()
+    ]
+    families.append((
+        "data_service_reloads_total", "counter", "数据文件热加载次数",
+        [("", {"file": item["file"]}, item["reloads"]) for item in stats],
+    ))
+    return families
+
+
+# 创建单例
+data_watcher = DataWatcher()
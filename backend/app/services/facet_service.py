@@ -0,0 +1,335 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.logging import logger
+from app.models.db.tags import decode_tags
+
+Row = Dict[str, Any]
+
+
+def _single(column: str) -> Callable[[Row], List[str]]:
+    return lambda row: [row[column]] if row.get(column) else []
+
+
+def _tags(row: Row) -> List[str]:
+    return decode_tags(row.get("tags"))
+
+
+def _question_categories(row: Row) -> List[str]:
+    # categories 与标签列一样存储为JSON字符串，旧数据只有单个 category
+    return decode_tags(row.get("categories")) or _single("category")(row)
+
+
+# 实体类型（表名） -> 维度 -> 从行数据取出该维度取值的函数
+DIMENSIONS: Dict[str, Dict[str, Callable[[Row], List[str]]]] = {
+    "news": {"category": _single("category"), "tag": _tags},
+    "learning": {"difficulty": _single("difficulty"), "tag": _tags},
+    "questions": {"category": _question_categories, "tag": _tags},
+}
+
+# 各实体计算分面时需要读取的列
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "news": ("category", "tags"),
+    "learning": ("difficulty", "tags"),
+    "questions": ("categories", "category", "tags"),
+}
+
+
+def _bitmap(slots: Iterable[int], size: int) -> int:
+    """由位序号构造位图，逐位 | 运算每次都会复制整个大整数"""
+    bits = bytearray((size + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+class FacetIndex:
+    """
+    单个实体类型的分面位图索引
+
+    每条内容分配一个位序号，每个维度的每个取值对应一个整数位图，
+    计数即位图中1的个数；限定在某个结果集内计数时先与结果集的位图求交。
+    删除内容释放的位序号会被之后插入的内容复用。
+    """
+
+    def __init__(self, dimensions: Dict[str, Callable[[Row], List[str]]]):
+        self.dimensions = dimensions
+        self._slots: Dict[str, int] = {}
+        self._values: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self._bitmaps: Dict[str, Dict[str, int]] = {dimension: {} for dimension in dimensions}
+        self._free: List[int] = []
+        self._size = 0
+        self.all = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _extract(self, row: Row) -> Dict[str, Tuple[str, ...]]:
+        return {dimension: tuple(dict.fromkeys(fn(row))) for dimension, fn in self.dimensions.items()}
+
+    @classmethod
+    def build(cls, dimensions: Dict[str, Callable[[Row], List[str]]], rows: Iterable[Tuple[str, Row]]) -> "FacetIndex":
+        """由全部内容一次性构建索引，每个位图只构造一次"""
+        index = cls(dimensions)
+        slots: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in dimensions}
+        for item_id, row in rows:
+            if item_id in index._slots:
+                continue
+            slot = index._size
+            index._size += 1
+            index._slots[item_id] = slot
+            values = index._values[item_id] = index._extract(row)
+            for dimension, dimension_values in values.items():
+                for value in dimension_values:
+                    slots[dimension].setdefault(value, []).append(slot)
+        for dimension, value_slots in slots.items():
+            index._bitmaps[dimension] = {value: _bitmap(items, index._size) for value, items in value_slots.items()}
+        index.all = _bitmap(index._slots.values(), index._size)
+        return index
+
+    def put(self, item_id: str, row: Row) -> None:
+        """插入或更新一条内容"""
+        values = self._extract(row)
+        if self._values.get(item_id) == values:
+            return
+        self.remove(item_id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._size
+            self._size += 1
+        bit = 1 << slot
+        for dimension, dimension_values in values.items():
+            bitmaps = self._bitmaps[dimension]
+            for value in dimension_values:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        self._slots[item_id] = slot
+        self._values[item_id] = values
+        self.all |= bit
+
+    def remove(self, item_id: str) -> None:
+        """删除一条内容"""
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        for dimension, dimension_values in self._values.pop(item_id).items():
+            bitmaps = self._bitmaps[dimension]
+            for value in dimension_values:
+                remaining = bitmaps[value] & mask
+                if remaining:
+                    bitmaps[value] = remaining
+                else:
+                    del bitmaps[value]
+        self.all &= mask
+        self._free.append(slot)
+
+    def mask(self, item_ids: Iterable[str]) -> int:
+        """内容ID集合对应的位图，索引中没有的ID被忽略"""
+        return _bitmap((self._slots[item_id] for item_id in item_ids if item_id in self._slots), self._size)
+
+    def select(self, dimension: str, values: Iterable[str]) -> int:
+        """同时带有全部给定取值的内容位图"""
+        bitmaps = self._bitmaps.get(dimension, {})
+        selected = self.all
+        for value in values:
+            selected &= bitmaps.get(value, 0)
+        return selected
+
+    def counts(self, dimension: str, within: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        某个维度各取值的内容数
+
+        Args:
+            dimension: 维度名
+            within: 只统计该位图中的内容，为None时统计全部
+
+        Returns:
+            (取值, 数量) 列表，按数量降序、取值升序，不含数量为0的取值
+        """
+        counts = []
+        for value, bitmap in self._bitmaps.get(dimension, {}).items():
+            count = (bitmap if within is None else bitmap & within).bit_count()
+            if count:
+                counts.append((value, count))
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts
+
+
+class FacetService:
+    """
+    分面计数服务
+
+    首次请求时从数据库读取一次各内容的分类、难度和标签构建位图索引，之后由
+    ORM事务提交事件和批量导入增量维护，查询只在内存中计数。其他进程（多个
+    worker、命令行导入）的写入无法感知，索引每隔 FACET_REFRESH_SECONDS 秒整体重建一次。
+    重建只读主库：只读副本可能落后，加载完成后只重放加载期间的变更，副本上还没有的
+    更早的提交会被新索引覆盖丢失。
+    """
+
+    def __init__(self, refresh_seconds: float = None):
+        self.refresh_seconds = settings.FACET_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._indexes: Dict[str, FacetIndex] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # 加载期间提交的变更，加载完成后在新索引上重放
+        self._pending: Dict[str, List[Tuple[str, Optional[Row]]]] = {}
+
+    def _stale(self, entity_type: str) -> bool:
+        loaded_at = self._loaded_at.get(entity_type)
+        if loaded_at is None:
+            return True
+        return self.refresh_seconds > 0 and time.monotonic() - loaded_at > self.refresh_seconds
+
+    async def load(self, db: AsyncSession, entity_type: str) -> FacetIndex:
+        """从数据库重建某个实体类型的索引"""
+        table = Base.metadata.tables[entity_type]
+        columns = COLUMNS[entity_type]
+        started = time.perf_counter()
+        self._pending[entity_type] = []
+        try:
+            result = await db.execute(select(table.c.id, *(table.c[column] for column in columns)))
+            rows = ((row[0], dict(zip(columns, row[1:]))) for row in result.all())
+            index = FacetIndex.build(DIMENSIONS[entity_type], rows)
+        finally:
+            pending = self._pending.pop(entity_type)
+        for item_id, row in pending:
+            if row is None:
+                index.remove(item_id)
+            else:
+                index.put(item_id, row)
+        self._indexes[entity_type] = index
+        self._loaded_at[entity_type] = time.monotonic()
+        logger.info(
+            "%s 分面索引已构建: %d 条内容, 耗时 %.1fms", entity_type, len(index), (time.perf_counter() - started) * 1000
+        )
+        return index
+
+    async def get_index(self, session_factory: sessionmaker, entity_type: str) -> FacetIndex:
+        """获取索引，尚未构建或已过期时用主库会话工厂打开会话构建"""
+        if not self._stale(entity_type):
+            return self._indexes[entity_type]
+        lock = self._locks.setdefault(entity_type, asyncio.Lock())
+        async with lock:
+            if not self._stale(entity_type):
+                return self._indexes[entity_type]
+            async with session_factory() as db:
+                return await self.load(db, entity_type)
+
+    def apply(self, entity_type: str, changes: Iterable[Tuple[str, Optional[Row]]]) -> None:
+        """
+        应用已提交的变更
+
+        Args:
+            entity_type: 实体类型
+            changes: (内容ID, 行数据) 列表，行数据为None表示删除
+        """
+        changes = list(changes)
+        pending = self._pending.get(entity_type)
+        if pending is not None:
+            pending.extend(changes)
+        index = self._indexes.get(entity_type)
+        if index is None:
+            return
+        for item_id, row in changes:
+            if row is None:
+                index.remove(item_id)
+            else:
+                index.put(item_id, row)
+
+    def invalidate(self, entity_type: str = None) -> None:
+        """标记索引需要重建，不指定实体类型时全部重建"""
+        for name in [entity_type] if entity_type else list(self._loaded_at):
+            self._loaded_at.pop(name, None)
+
+    async def facets(
+        self,
+        session_factory: sessionmaker,
+        entity_type: str,
+        item_ids: Optional[Iterable[str]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Tuple[int, Dict[str, List[Tuple[str, int]]]]:
+        """
+        计算某个实体类型各维度的分面计数
+
+        Args:
+            session_factory: 主库异步会话工厂，只在需要构建索引时使用
+            entity_type: 实体类型
+            item_ids: 只统计这些内容（如搜索结果），为None时统计全部
+            tags: 只统计同时带有这些标签的内容
+
+        Returns:
+            (内容数, 维度 -> (取值, 数量) 列表)
+        """
+        index = await self.get_index(session_factory, entity_type)
+        within = None
+        if item_ids is not None:
+            within = index.mask(item_ids)
+        if tags:
+            selected = index.select("tag", tags)
+            within = selected if within is None else within & selected
+        total = len(index) if within is None else within.bit_count()
+        return total, {dimension: index.counts(dimension, within) for dimension in index.dimensions}
+
+
+# 变更记录中表示"属性已过期，无法取得新值"的标记
+_EXPIRED = object()
+
+
+def _changes(session: Session) -> Dict[Tuple[str, str], Any]:
+    return session.info.setdefault("facet_changes", {})
+
+
+@event.listens_for(Session, "after_flush")
+def _record_facet_changes(session, flush_context):
+    """记录本次事务中写入的内容，同一内容只保留最后一次的值"""
+    changes = _changes(session)
+    for obj in list(session.new) + list(session.dirty):
+        entity_type = getattr(obj, "__tablename__", None)
+        if entity_type not in COLUMNS:
+            continue
+        # 只读取已加载的属性，访问过期属性会触发查询（异步会话中会直接报错）
+        loaded = inspect(obj).dict
+        if obj in session.new:
+            # 新对象上没有设置的列插入的就是NULL
+            changes[(entity_type, obj.id)] = {column: loaded.get(column) for column in COLUMNS[entity_type]}
+        elif all(column in loaded for column in COLUMNS[entity_type]):
+            changes[(entity_type, obj.id)] = {column: loaded[column] for column in COLUMNS[entity_type]}
+        else:
+            changes[(entity_type, obj.id)] = _EXPIRED
+    for obj in session.deleted:
+        entity_type = getattr(obj, "__tablename__", None)
+        if entity_type in COLUMNS:
+            changes[(entity_type, obj.id)] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_facet_changes(session):
+    """事务提交后更新分面索引"""
+    changes = session.info.pop("facet_changes", None)
+    by_entity: Dict[str, List[Tuple[str, Optional[Row]]]] = {}
+    for (entity_type, item_id), row in (changes or {}).items():
+        if row is _EXPIRED:
+            # 取不到新值时改为在下次请求时重建索引
+            facet_service.invalidate(entity_type)
+            continue
+        by_entity.setdefault(entity_type, []).append((item_id, row))
+    for entity_type, entity_changes in by_entity.items():
+        facet_service.apply(entity_type, entity_changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_facet_changes(session):
+    """事务回滚后丢弃变更记录"""
+    session.info.pop("facet_changes", None)
+
+
+# 创建服务实例
+facet_service = FacetService()
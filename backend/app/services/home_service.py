@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from app.core.cache import VersionedCache, table_versions
+from app.core.logging import logger
+from app.models.home import HomeFeed
+from app.services.learning_service import learning_service
+from app.services.news_service import news_service
+from app.services.questions_service import questions_service
+
+# 首页数据依赖的表，任意一张表变更后重新组装首页
+HOME_TABLES = ("news", "learning", "questions")
+
+
+class HomeService:
+    """首页服务，并发组装最新新闻、推荐学习和热门问题"""
+    
+    def __init__(self):
+        """初始化首页服务"""
+        self.cache = VersionedCache(table_versions)
+    
+    async def get_home(self, session_factory: Callable, limit: int) -> HomeFeed:
+        """
+        获取首页聚合数据，依赖的表未变更时直接返回缓存
+        
+        Args:
+            session_factory: 异步会话工厂，每个板块使用独立会话并发查询
+            limit: 每个板块返回的条数
+            
+        Returns:
+            首页聚合数据
+        """
+        return await self.cache.get_or_build(
+            f"home:{limit}",
+            HOME_TABLES,
+            lambda: self._compose(session_factory, limit),
+        )
+    
+    async def _compose(self, session_factory: Callable, limit: int) -> HomeFeed:
+        """并发查询各板块并组装首页数据"""
+        news, learning, questions = await asyncio.gather(
+            self._run(session_factory, news_service.get_latest, limit),
+            self._run(session_factory, learning_service.get_recommended, limit),
+            self._run(session_factory, questions_service.get_popular, limit),
+        )
+        logger.debug("首页数据已重新组装: 新闻%d条, 学习%d条, 问题%d条", len(news), len(learning), len(questions))
+        return HomeFeed(
+            news=news,
+            learning=learning,
+            questions=questions,
+            generatedAt=datetime.now().isoformat(),
+        )
+    
+    @staticmethod
+    async def _run(session_factory: Callable, method: Callable[..., Awaitable[Any]], limit: int) -> Any:
+        """在独立会话中执行查询，异步会话不能在多个并发查询间共享"""
+        async with session_factory() as session:
+            return await method(session, limit)
+
+
+# 创建服务实例
+home_service = HomeService()
@@ -1,15 +1,31 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.models.learning import LearningBase, LearningItem, LearningList
 from app.services.data_service import DataService
 from app.core.logging import logger
 
 
+def _adapt_learning(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """把JSON文件中的学习内容字段转换为模型字段"""
+    return {
+        **raw,
+        "content": raw.get("content", raw.get("fullContent")),
+        "relatedItems": raw.get("relatedItems", raw.get("nextSteps")),
+        "tags": raw.get("tags") or [],
+    }
+
+
 class LearningService:
     """学习内容服务，提供学习内容相关操作"""
     
     def __init__(self):
         """初始化学习内容服务"""
-        self.data_service = DataService("learning_data.json", LearningItem)
+        self.data_service = DataService(
+            "learning_data.json",
+            LearningItem,
+            adapter=_adapt_learning,
+            index_fields=("difficulty",),
+            snapshot_section="learning",
+        )
     
     def get_all_learning_items(self) -> LearningList:
         """
@@ -43,13 +59,12 @@ class LearningService:
         Returns:
             符合条件的学习内容列表
         """
-        items = self.data_service.get_all()
         if difficulty == "all":
-            filtered_items = items
+            items = self.data_service.get_all()
         else:
-            filtered_items = [item for item in items if item.difficulty == difficulty]
+            items = self.data_service.filter_by("difficulty", difficulty)
         
-        return LearningList(items=filtered_items, total=len(filtered_items))
+        return LearningList(items=items, total=len(items))
     
     def search_learning_items(self, keyword: str) -> LearningList:
         """
@@ -1,49 +1,77 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, desc
 from fastapi import Depends, HTTPException
 import json
 
 from app.core.logging import logger
+from app.core.compression import plain_text
 from app.models.learning import Learning, LearningItem, LearningList, LearningCreate, LearningUpdate
 from app.core.database import get_async_db
+from app.services.tag_service import tag_service
 
 class LearningService:
     """学习内容服务"""
     
-    async def get_all(self, db: AsyncSession, difficulty: Optional[str] = None) -> LearningList:
-        """获取所有学习内容"""
+    @staticmethod
+    def _to_item(item: Learning, include_content: bool = True) -> LearningItem:
+        """将数据库模型转换为Pydantic模型"""
+        # 使用Property Getter获取列表
+        tags = item.tags_list
+        related_items = item.related_items_list
+        
+        return LearningItem(
+            id=item.id,
+            title=item.title,
+            shortDescription=item.short_description,
+            difficulty=item.difficulty,
+            tags=tags,
+            content=item.content if include_content else None,
+            relatedItems=related_items
+        )
+    
+    async def get_all(
+        self, db: AsyncSession, difficulty: Optional[str] = None, tags: Optional[List[str]] = None,
+    ) -> LearningList:
+        """获取所有学习内容，可按难度和标签筛选，同时返回筛选结果的标签统计"""
         try:
             query = select(Learning)
+            tagged = tag_service.tagged_ids("learning", tags or [])
             if difficulty:
                 query = query.where(Learning.difficulty == difficulty)
+            if tagged is not None:
+                query = query.where(Learning.id.in_(tagged))
             
             result = await db.execute(query)
             items = result.scalars().all()
             
             # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                related_items = item.related_items_list
-                
-                pydantic_items.append(LearningItem(
-                    id=item.id,
-                    title=item.title,
-                    shortDescription=item.short_description,
-                    difficulty=item.difficulty,
-                    tags=tags,
-                    content=item.content,
-                    relatedItems=related_items
-                ))
+            pydantic_items = [self._to_item(item) for item in items]
             
-            return LearningList(items=pydantic_items, total=len(pydantic_items))
+            # 只按标签筛选时统计完全在标签索引上完成
+            ids = query.with_only_columns(Learning.id) if difficulty else tagged
+            facets = await tag_service.facets(db, "learning", ids)
+            
+            return LearningList(items=pydantic_items, total=len(pydantic_items), facets=facets)
         except Exception as e:
             logger.error(f"获取学习内容失败: {e}")
             raise HTTPException(status_code=500, detail="获取学习内容时发生错误")
     
+    async def get_recommended(self, db: AsyncSession, limit: int) -> List[LearningItem]:
+        """获取推荐的若干条学习内容（按更新时间倒序）"""
+        try:
+            # 推荐列表不返回全文，不读取（也就不解压）内容列
+            query = (
+                select(Learning).options(defer(Learning.content, raiseload=True))
+                .order_by(desc(Learning.updated_at)).limit(limit)
+            )
+            result = await db.execute(query)
+            return [self._to_item(item, include_content=False) for item in result.scalars().all()]
+        except Exception as e:
+            logger.error(f"获取推荐学习内容失败: {e}")
+            raise HTTPException(status_code=500, detail="获取推荐学习内容时发生错误")
+    
     async def get_by_id(self, item_id: str, db: AsyncSession) -> LearningItem:
         """根据ID获取学习内容"""
         try:
@@ -54,19 +82,7 @@ class LearningService:
             if not item:
                 raise HTTPException(status_code=404, detail=f"找不到ID为{item_id}的学习内容")
             
-            # 使用Property Getter获取列表
-            tags = item.tags_list
-            related_items = item.related_items_list
-            
-            return LearningItem(
-                id=item.id,
-                title=item.title,
-                shortDescription=item.short_description,
-                difficulty=item.difficulty,
-                tags=tags,
-                content=item.content,
-                relatedItems=related_items
-            )
+            return self._to_item(item)
         except HTTPException:
             raise
         except Exception as e:
@@ -76,34 +92,19 @@ class LearningService:
     async def search(self, keyword: str, db: AsyncSession) -> LearningList:
         """搜索学习内容"""
         try:
-            query = select(Learning).where(
+            query = select(Learning).options(defer(Learning.content, raiseload=True)).where(
                 or_(
                     Learning.title.ilike(f"%{keyword}%"),
                     Learning.short_description.ilike(f"%{keyword}%"),
-                    Learning.content.ilike(f"%{keyword}%")
+                    plain_text(Learning.content).ilike(f"%{keyword}%")
                 )
             )
             
             result = await db.execute(query)
             items = result.scalars().all()
             
-            # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                related_items = item.related_items_list
-                
-                pydantic_items.append(LearningItem(
-                    id=item.id,
-                    title=item.title,
-                    shortDescription=item.short_description,
-                    difficulty=item.difficulty,
-                    tags=tags,
-                    # 搜索结果不返回全文内容
-                    content=None,
-                    relatedItems=related_items
-                ))
+            # 转换为Pydantic模型，搜索结果不返回全文内容
+            pydantic_items = [self._to_item(item, include_content=False) for item in items]
             
             return LearningList(items=pydantic_items, total=len(pydantic_items))
         except Exception as e:
@@ -128,19 +129,7 @@ class LearningService:
             await db.commit()
             await db.refresh(db_item)
             
-            # 使用Property Getter获取列表
-            tags = db_item.tags_list
-            related_items = db_item.related_items_list
-            
-            return LearningItem(
-                id=db_item.id,
-                title=db_item.title,
-                shortDescription=db_item.short_description,
-                difficulty=db_item.difficulty,
-                tags=tags,
-                content=db_item.content,
-                relatedItems=related_items
-            )
+            return self._to_item(db_item)
         except Exception as e:
             await db.rollback()
             logger.error(f"创建学习内容失败: {e}")
@@ -173,19 +162,7 @@ class LearningService:
             await db.commit()
             await db.refresh(db_item)
             
-            # 使用Property Getter获取列表
-            tags = db_item.tags_list
-            related_items = db_item.related_items_list
-            
-            return LearningItem(
-                id=db_item.id,
-                title=db_item.title,
-                shortDescription=db_item.short_description,
-                difficulty=db_item.difficulty,
-                tags=tags,
-                content=db_item.content,
-                relatedItems=related_items
-            )
+            return self._to_item(db_item)
         except HTTPException:
             raise
         except Exception as e:
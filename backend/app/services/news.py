@@ -1,15 +1,35 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.models.news import NewsBase, NewsItem, NewsList
 from app.services.data_service import DataService
 from app.core.logging import logger
 
 
+def _adapt_news(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """把JSON文件中的新闻字段转换为模型字段"""
+    return {
+        **raw,
+        "publishDate": raw.get("publishDate", raw.get("date", "")),
+        "summary": raw.get("summary", ""),
+        "source": raw.get("source", ""),
+        "content": raw.get("content", ""),
+    }
+
+
 class NewsService:
     """新闻服务，提供新闻相关操作"""
     
     def __init__(self):
         """初始化新闻服务"""
-        self.data_service = DataService("news_data.json", NewsItem)
+        # 按发布日期倒序存放，查询结果无需再排序
+        self.data_service = DataService(
+            "news_data.json",
+            NewsItem,
+            adapter=_adapt_news,
+            index_fields=("category",),
+            sort_key=lambda item: item.publishDate,
+            reverse=True,
+            snapshot_section="news",
+        )
     
     def get_all_news(self) -> NewsList:
         """
@@ -19,9 +39,7 @@ class NewsService:
             新闻列表
         """
         items = self.data_service.get_all()
-        # 按日期倒序排序
-        sorted_items = sorted(items, key=lambda x: x.date, reverse=True)
-        return NewsList(items=sorted_items, total=len(sorted_items))
+        return NewsList(items=items, total=len(items))
     
     def get_news_item(self, news_id: str) -> Optional[NewsItem]:
         """
@@ -45,16 +63,12 @@ class NewsService:
         Returns:
             符合条件的新闻列表
         """
-        items = self.data_service.get_all()
-        
         if category == "all":
-            filtered_items = items
+            items = self.data_service.get_all()
         else:
-            filtered_items = [item for item in items if item.category == category]
+            items = self.data_service.filter_by("category", category)
         
-        # 按日期倒序排序
-        sorted_items = sorted(filtered_items, key=lambda x: x.date, reverse=True)
-        return NewsList(items=sorted_items, total=len(sorted_items))
+        return NewsList(items=items, total=len(items))
     
     def search_news(self, keyword: str) -> NewsList:
         """
@@ -67,9 +81,7 @@ class NewsService:
             搜索结果列表
         """
         items = self.data_service.search(keyword)
-        # 按日期倒序排序
-        sorted_items = sorted(items, key=lambda x: x.date, reverse=True)
-        return NewsList(items=sorted_items, total=len(sorted_items))
+        return NewsList(items=items, total=len(items))
 
 
 # 创建单例
@@ -6,21 +6,52 @@ from datetime import datetime
 
 from app.models.news import NewsItem, NewsList
 from app.core.logging import logger
+from app.core.coalescing import coalesce
+from app.core.compression import plain_text
 from app.models.db.news import News
 from app.services.xueqiu_client import xueqiu_client, XueqiuClient
+from app.services.push_service import news_broker
+from app.services.tag_service import tag_service
 from app.core.config import settings
 
 
 class NewsService:
     """新闻服务"""
     
-    async def get_all(self, db: AsyncSession, category: Optional[str] = None) -> NewsList:
-        """获取所有新闻"""
+    @staticmethod
+    def _to_item(item: News) -> NewsItem:
+        """将数据库模型转换为Pydantic模型"""
+        # 使用Property Getter获取列表
+        tags = item.tags_list
+        categories = item.categories_list
+        
+        return NewsItem(
+            id=item.id,
+            title=item.title,
+            content=item.content,
+            summary=item.summary,
+            source=item.source,
+            publishDate=item.publish_date.isoformat() if item.publish_date else None,
+            category=categories[0] if categories else None,
+            tags=tags,
+            imageUrl=item.image_url,
+            url=item.url,
+            is_xueqiu=XueqiuClient.is_xueqiu_news_id(item.id)
+        )
+    
+    @coalesce()
+    async def get_all(
+        self, db: AsyncSession, category: Optional[str] = None, tags: Optional[List[str]] = None,
+    ) -> NewsList:
+        """获取所有新闻，可按分类和标签筛选，同时返回筛选结果的标签统计"""
         try:
             query = select(News)
+            tagged = tag_service.tagged_ids("news", tags or [])
             if category:
                 # 使用正确的字段名category
                 query = query.filter(News.category == category)
+            if tagged is not None:
+                query = query.where(News.id.in_(tagged))
             
             # 按发布日期降序排序
             query = query.order_by(desc(News.publish_date))
@@ -29,31 +60,28 @@ class NewsService:
             items = result.scalars().all()
             
             # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                categories = item.categories_list
-                
-                pydantic_items.append(NewsItem(
-                    id=item.id,
-                    title=item.title,
-                    content=item.content,
-                    summary=item.summary,
-                    source=item.source,
-                    publishDate=item.publish_date.isoformat() if item.publish_date else None,
-                    category=categories[0] if categories else None,
-                    tags=tags,
-                    imageUrl=item.image_url,
-                    url=item.url,
-                    is_xueqiu=XueqiuClient.is_xueqiu_news_id(item.id)
-                ))
+            pydantic_items = [self._to_item(item) for item in items]
             
-            return NewsList(items=pydantic_items, total=len(pydantic_items))
+            # 只按标签筛选时统计完全在标签索引上完成
+            ids = query.with_only_columns(News.id).order_by(None) if category else tagged
+            facets = await tag_service.facets(db, "news", ids)
+            
+            return NewsList(items=pydantic_items, total=len(pydantic_items), facets=facets)
         except Exception as e:
             logger.error(f"获取新闻列表失败: {e}")
             raise HTTPException(status_code=500, detail=f"获取新闻列表失败: {str(e)}")
     
+    async def get_latest(self, db: AsyncSession, limit: int) -> List[NewsItem]:
+        """获取最新的若干条新闻"""
+        try:
+            query = select(News).order_by(desc(News.publish_date)).limit(limit)
+            result = await db.execute(query)
+            return [self._to_item(item) for item in result.scalars().all()]
+        except Exception as e:
+            logger.error(f"获取最新新闻失败: {e}")
+            raise HTTPException(status_code=500, detail=f"获取最新新闻失败: {str(e)}")
+    
+    @coalesce()
     async def get_by_id(self, news_id: str, db: AsyncSession) -> NewsItem:
         """根据ID获取新闻详情"""
         try:
@@ -64,25 +92,9 @@ class NewsService:
             if not item:
                 return None
             
-            # 使用Property Getter获取列表
-            tags = item.tags_list
-            categories = item.categories_list
-            
             # 如果是雪球新闻且尚未生成AI解释，可以在这里添加生成逻辑
             
-            return NewsItem(
-                id=item.id,
-                title=item.title,
-                content=item.content,
-                summary=item.summary,
-                source=item.source,
-                publishDate=item.publish_date.isoformat() if item.publish_date else None,
-                category=categories[0] if categories else None,
-                tags=tags,
-                imageUrl=item.image_url,
-                url=item.url,
-                is_xueqiu=XueqiuClient.is_xueqiu_news_id(item.id)
-            )
+            return self._to_item(item)
         except Exception as e:
             logger.error(f"获取新闻ID={news_id}失败: {e}")
             raise HTTPException(status_code=500, detail=f"获取新闻详情失败: {str(e)}")
@@ -93,7 +105,7 @@ class NewsService:
             query = select(News).where(
                 or_(
                     News.title.ilike(f"%{keyword}%"),
-                    News.content.ilike(f"%{keyword}%"),
+                    plain_text(News.content).ilike(f"%{keyword}%"),
                     News.summary.ilike(f"%{keyword}%")
                 )
             )
@@ -105,25 +117,7 @@ class NewsService:
             items = result.scalars().all()
             
             # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                categories = item.categories_list
-                
-                pydantic_items.append(NewsItem(
-                    id=item.id,
-                    title=item.title,
-                    content=item.content,
-                    summary=item.summary,
-                    source=item.source,
-                    publishDate=item.publish_date.isoformat() if item.publish_date else None,
-                    category=categories[0] if categories else None,
-                    tags=tags,
-                    imageUrl=item.image_url,
-                    url=item.url,
-                    is_xueqiu=XueqiuClient.is_xueqiu_news_id(item.id)
-                ))
+            pydantic_items = [self._to_item(item) for item in items]
             
             return NewsList(items=pydantic_items, total=len(pydantic_items))
         except Exception as e:
@@ -157,7 +151,7 @@ class NewsService:
             if not db:
                 return len(news_items)
                 
-            saved_count = 0
+            saved_news = []
             for item in news_items:
                 # 检查是否已存在
                 query = select(News).where(News.id == item["id"])
@@ -182,13 +176,15 @@ class NewsService:
                 news.tags_list = item.get("tags", [])
                 
                 db.add(news)
-                saved_count += 1
+                saved_news.append(news)
             
-            if saved_count > 0:
+            if saved_news:
                 await db.commit()
-                logger.info(f"成功保存了 {saved_count} 条新雪球新闻")
+                logger.info(f"成功保存了 {len(saved_news)} 条新雪球新闻")
+                # 提交成功后再推送
+                news_broker.publish_news(saved_news)
                 
-            return saved_count
+            return len(saved_news)
         except Exception as e:
             logger.error(f"获取雪球新闻时出错: {str(e)}")
             if db:
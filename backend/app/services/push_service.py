@@ -0,0 +1,129 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.db.news import News
+
+
+class Subscription:
+    """推送订阅，每个订阅者拥有一个有界缓冲队列"""
+    
+    def __init__(self, broker: "NewsBroker", buffer_size: int):
+        self._broker = broker
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size + 1)
+        self._buffer_size = buffer_size
+        self.dropped = False
+    
+    def _offer(self, event: Dict[str, Any]) -> bool:
+        """放入一条消息，缓冲区已满时返回False"""
+        if self._queue.qsize() >= self._buffer_size:
+            return False
+        self._queue.put_nowait(event)
+        return True
+    
+    def _close(self) -> None:
+        """标记订阅已被丢弃，清空缓冲并放入结束标记唤醒消费者"""
+        self.dropped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        # 队列容量比缓冲区大1，结束标记总能放入
+        self._queue.put_nowait(None)
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        等待下一条消息
+        
+        Args:
+            timeout: 超时时间（秒），超时抛出asyncio.TimeoutError
+            
+        Returns:
+            消息内容，订阅已被丢弃时返回None
+        """
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+    
+    def close(self) -> None:
+        """取消订阅"""
+        self._broker.unsubscribe(self)
+
+
+class NewsBroker:
+    """进程内发布/订阅，将新入库的新闻通知扇出给所有订阅者"""
+    
+    def __init__(self, buffer_size: int = None):
+        """初始化消息代理"""
+        self.buffer_size = buffer_size or settings.PUSH_BUFFER_SIZE
+        self._subscribers: Set[Subscription] = set()
+        self.published_count = 0
+        self.dropped_count = 0
+    
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        return len(self._subscribers)
+    
+    def subscribe(self) -> Subscription:
+        """新建订阅"""
+        subscription = Subscription(self, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """取消订阅"""
+        self._subscribers.discard(subscription)
+    
+    def publish(self, event: Dict[str, Any]) -> int:
+        """
+        向所有订阅者发布消息，必须在事件循环线程中调用
+        
+        缓冲区已满的慢订阅者会被丢弃，客户端重连后可通过 /api/sync 补齐遗漏的内容。
+        
+        Args:
+            event: 消息内容
+            
+        Returns:
+            成功投递的订阅者数量
+        """
+        delivered = 0
+        for subscription in list(self._subscribers):
+            if subscription._offer(event):
+                delivered += 1
+            else:
+                self._subscribers.discard(subscription)
+                subscription._close()
+                self.dropped_count += 1
+                logger.warning("推送订阅者消费过慢，已断开连接")
+        self.published_count += 1
+        return delivered
+    
+    def publish_news(self, items: Iterable[News]) -> None:
+        """发布新入库新闻的通知，应在事务提交之后调用"""
+        for item in items:
+            self.publish(news_event(item))
+
+
+def news_event(item: News) -> Dict[str, Any]:
+    """构造精简的新闻通知，客户端按需再请求详情"""
+    return {
+        "type": "news",
+        "id": item.id,
+        "title": item.title,
+        "category": item.category,
+        "source": item.source,
+        "publishDate": item.publish_date.isoformat() if item.publish_date else None,
+    }
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """将消息格式化为Server-Sent Events文本，None表示心跳"""
+    if event is None:
+        return ": ping\n\n"
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+# 创建单例
+news_broker = NewsBroker()
@@ -1,15 +1,36 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.models.questions import QuestionBase, QuestionItem, QuestionList
 from app.services.data_service import DataService
 from app.core.logging import logger
 
 
+def _adapt_question(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """把JSON文件中的问题字段转换为模型字段"""
+    categories = raw.get("categories")
+    if categories is None:
+        categories = [raw["category"]] if raw.get("category") else []
+    return {
+        **raw,
+        "answer": raw.get("answer", raw.get("fullAnswer", "")),
+        "difficulty": raw.get("difficulty", ""),
+        "categories": categories,
+        "tags": raw.get("tags") or [],
+        "viewCount": raw.get("viewCount", 0),
+    }
+
+
 class QuestionsService:
     """问答服务，提供问答相关操作"""
     
     def __init__(self):
         """初始化问答服务"""
-        self.data_service = DataService("questions_data.json", QuestionItem)
+        self.data_service = DataService(
+            "questions_data.json",
+            QuestionItem,
+            adapter=_adapt_question,
+            index_fields=("categories", "difficulty"),
+            snapshot_section="questions",
+        )
     
     def get_all_questions(self) -> QuestionList:
         """
@@ -43,14 +64,12 @@ class QuestionsService:
         Returns:
             符合条件的问题列表
         """
-        items = self.data_service.get_all()
-        
         if category == "all":
-            filtered_items = items
+            items = self.data_service.get_all()
         else:
-            filtered_items = [item for item in items if item.category == category]
+            items = self.data_service.filter_by("categories", category)
         
-        return QuestionList(items=filtered_items, total=len(filtered_items))
+        return QuestionList(items=items, total=len(items))
     
     def search_questions(self, keyword: str) -> QuestionList:
         """
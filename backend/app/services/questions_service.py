@@ -1,91 +1,115 @@
 from typing import List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, desc
+from sqlalchemy.orm import defer
 from fastapi import HTTPException
 
-from app.models.questions import QuestionItem, QuestionList
+from app.models.questions import Question, QuestionItem, QuestionList
 from app.core.logging import logger
-from app.models.db.questions import Question
+from app.core.compression import plain_text
+from app.services.tag_service import tag_service
 
 
 class QuestionsService:
     """问题服务"""
     
-    async def get_all(self, db: AsyncSession, category: Optional[str] = None) -> QuestionList:
-        """获取所有问题"""
+    @staticmethod
+    def _select():
+        """问题查询，接口只返回 answer，不读取（也就不解压）压缩存储的 content 列"""
+        return select(Question).options(defer(Question.content, raiseload=True))
+    
+    @staticmethod
+    def _to_item(item: Question) -> QuestionItem:
+        """将数据库模型转换为Pydantic模型"""
+        # 使用Property Getter获取列表
+        categories = item.categories_list or ([item.category] if item.category else [])
+        
+        return QuestionItem(
+            id=item.id,
+            question=item.question or item.title,
+            answer=item.answer or "",
+            difficulty=item.difficulty or "",
+            categories=categories,
+            tags=item.tags_list,
+            viewCount=item.view_count or 0,
+            createdAt=item.created_at.isoformat() if item.created_at else None,
+            updatedAt=item.updated_at.isoformat() if item.updated_at else None,
+            relatedQuestions=item.related_questions_list
+        )
+    
+    async def get_all(
+        self, db: AsyncSession, category: Optional[str] = None, tags: Optional[List[str]] = None,
+    ) -> QuestionList:
+        """获取所有问题，可按分类和标签筛选，同时返回筛选结果的标签统计"""
         try:
-            query = select(Question)
+            query = self._select()
+            tagged = tag_service.tagged_ids("questions", tags or [])
             if category:
                 query = query.where(Question.category == category)
+            if tagged is not None:
+                query = query.where(Question.id.in_(tagged))
             
             result = await db.execute(query)
             items = result.scalars().all()
             
             # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                related_questions = item.related_questions_list
-                
-                pydantic_items.append(QuestionItem(
-                    id=item.id,
-                    title=item.title,
-                    content=item.content,
-                    answer=item.answer,
-                    answerCount=item.answer_count,
-                    viewCount=item.view_count,
-                    category=item.category,
-                    tags=tags,
-                    createdAt=item.created_at,
-                    updatedAt=item.updated_at,
-                    relatedQuestions=related_questions
-                ))
+            pydantic_items = [self._to_item(item) for item in items]
             
-            return QuestionList(items=pydantic_items, total=len(pydantic_items))
+            # 只按标签筛选时统计完全在标签索引上完成
+            ids = query.with_only_columns(Question.id) if category else tagged
+            facets = await tag_service.facets(db, "questions", ids)
+            
+            return QuestionList(items=pydantic_items, total=len(pydantic_items), facets=facets)
         except Exception as e:
             logger.error(f"获取问题列表失败: {e}")
             raise HTTPException(status_code=500, detail=f"获取问题列表失败: {str(e)}")
     
+    async def get_popular(self, db: AsyncSession, limit: int) -> List[QuestionItem]:
+        """获取浏览量最高的若干个问题"""
+        try:
+            query = self._select().order_by(desc(Question.view_count)).limit(limit)
+            result = await db.execute(query)
+            return [self._to_item(item) for item in result.scalars().all()]
+        except Exception as e:
+            logger.error(f"获取热门问题失败: {e}")
+            raise HTTPException(status_code=500, detail=f"获取热门问题失败: {str(e)}")
+    
     async def get_by_id(self, question_id: str, db: AsyncSession) -> Optional[QuestionItem]:
         """根据ID获取问题详情"""
         try:
-            query = select(Question).where(Question.id == question_id)
+            query = self._select().where(Question.id == question_id)
             result = await db.execute(query)
             item = result.scalar_one_or_none()
             
             if not item:
                 return None
             
-            # 使用Property Getter获取列表
-            tags = item.tags_list
-            related_questions = item.related_questions_list
-            
-            return QuestionItem(
-                id=item.id,
-                title=item.title,
-                content=item.content,
-                answer=item.answer,
-                answerCount=item.answer_count,
-                viewCount=item.view_count,
-                category=item.category,
-                tags=tags,
-                createdAt=item.created_at,
-                updatedAt=item.updated_at,
-                relatedQuestions=related_questions
-            )
+            return self._to_item(item)
         except Exception as e:
             logger.error(f"获取问题ID={question_id}失败: {e}")
             raise HTTPException(status_code=500, detail=f"获取问题详情失败: {str(e)}")
     
+    async def get_by_ids(self, question_ids: List[str], db: AsyncSession) -> List[QuestionItem]:
+        """根据ID列表批量获取问题，结果保持传入的顺序"""
+        try:
+            if not question_ids:
+                return []
+            query = self._select().where(Question.id.in_(question_ids))
+            result = await db.execute(query)
+            items = {item.id: item for item in result.scalars().all()}
+            return [self._to_item(items[question_id]) for question_id in question_ids if question_id in items]
+        except Exception as e:
+            logger.error(f"批量获取问题失败: {e}")
+            raise HTTPException(status_code=500, detail=f"批量获取问题失败: {str(e)}")
+    
     async def search(self, keyword: str, db: AsyncSession) -> QuestionList:
         """搜索问题"""
         try:
-            query = select(Question).where(
+            query = self._select().where(
                 or_(
                     Question.title.ilike(f"%{keyword}%"),
-                    Question.content.ilike(f"%{keyword}%"),
-                    Question.answer.ilike(f"%{keyword}%")
+                    plain_text(Question.content).ilike(f"%{keyword}%"),
+                    plain_text(Question.answer).ilike(f"%{keyword}%")
                 )
             )
             
@@ -93,25 +117,7 @@ class QuestionsService:
             items = result.scalars().all()
             
             # 转换为Pydantic模型
-            pydantic_items = []
-            for item in items:
-                # 使用Property Getter获取列表
-                tags = item.tags_list
-                related_questions = item.related_questions_list
-                
-                pydantic_items.append(QuestionItem(
-                    id=item.id,
-                    title=item.title,
-                    content=item.content,
-                    answer=item.answer,
-                    answerCount=item.answer_count,
-                    viewCount=item.view_count,
-                    category=item.category,
-                    tags=tags,
-                    createdAt=item.created_at,
-                    updatedAt=item.updated_at,
-                    relatedQuestions=related_questions
-                ))
+            pydantic_items = [self._to_item(item) for item in items]
             
             return QuestionList(items=pydantic_items, total=len(pydantic_items))
         except Exception as e:
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 
 from app.models.search import SearchRequest, SearchResults, SearchResult
+from app.core.compression import plain_text
 from app.models.db.learning import Learning
 from app.models.db.news import News
 from app.models.db.questions import Question
@@ -53,13 +54,7 @@ class SearchService:
     
     async def _search_learning(self, keyword: str, db: AsyncSession) -> List[SearchResult]:
         """搜索学习内容"""
-        query = select(Learning).where(
-            or_(
-                Learning.title.ilike(f"%{keyword}%"),
-                Learning.short_description.ilike(f"%{keyword}%"),
-                Learning.content.ilike(f"%{keyword}%")
-            )
-        )
+        query = select(Learning).where(self._keyword_condition("learning", keyword))
         
         result = await db.execute(query)
         items = result.scalars().all()
@@ -84,13 +79,7 @@ class SearchService:
     
     async def _search_news(self, keyword: str, db: AsyncSession) -> List[SearchResult]:
         """搜索新闻"""
-        query = select(News).where(
-            or_(
-                News.title.ilike(f"%{keyword}%"),
-                News.content.ilike(f"%{keyword}%"),
-                News.summary.ilike(f"%{keyword}%")
-            )
-        )
+        query = select(News).where(self._keyword_condition("news", keyword))
         
         result = await db.execute(query)
         items = result.scalars().all()
@@ -115,13 +104,7 @@ class SearchService:
     
     async def _search_questions(self, keyword: str, db: AsyncSession) -> List[SearchResult]:
         """搜索问题"""
-        query = select(Question).where(
-            or_(
-                Question.title.ilike(f"%{keyword}%"),
-                Question.content.ilike(f"%{keyword}%"),
-                Question.answer.ilike(f"%{keyword}%")
-            )
-        )
+        query = select(Question).where(self._keyword_condition("questions", keyword))
         
         result = await db.execute(query)
         items = result.scalars().all()
@@ -144,6 +127,34 @@ class SearchService:
         
         return search_results
     
+    @staticmethod
+    def _keyword_condition(entity_type: str, keyword: str):
+        """各类内容的关键词匹配条件，压缩存储的大文本列解压后再匹配"""
+        pattern = f"%{keyword}%"
+        if entity_type == "learning":
+            return or_(Learning.title.ilike(pattern), Learning.short_description.ilike(pattern), plain_text(Learning.content).ilike(pattern))
+        if entity_type == "news":
+            return or_(News.title.ilike(pattern), plain_text(News.content).ilike(pattern), News.summary.ilike(pattern))
+        return or_(
+            Question.title.ilike(pattern), plain_text(Question.content).ilike(pattern), plain_text(Question.answer).ilike(pattern)
+        )
+    
+    async def matching_ids(self, entity_type: str, keyword: str, db: AsyncSession) -> List[str]:
+        """
+        只查询匹配关键词的内容ID
+        
+        Args:
+            entity_type: 实体类型（learning、news、questions）
+            keyword: 关键词
+            db: 数据库会话
+            
+        Returns:
+            内容ID列表
+        """
+        model = {"learning": Learning, "news": News, "questions": Question}[entity_type]
+        result = await db.execute(select(model.id).where(self._keyword_condition(entity_type, keyword.strip())))
+        return list(result.scalars())
+    
     def _calculate_relevance(self, keyword: str, title: str, content: str) -> float:
         """计算相关性分数（简单实现）"""
         # 标题中出现关键词的权重更高
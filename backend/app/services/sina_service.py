@@ -1,5 +1,3 @@
-import aiohttp
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 from datetime import datetime
 import re
@@ -25,6 +23,9 @@ class SinaService:
         """
         列出新浪财经首页所有模块（栏目）的标题和链接
         """
+        # aiohttp 和 BeautifulSoup 导入较慢，首次抓取时再导入，不影响服务启动
+        import aiohttp
+        from bs4 import BeautifulSoup
         async with aiohttp.ClientSession() as session:
             async with session.get(self.base_url, headers=self.headers) as response:
                 if response.status != 200:
@@ -45,6 +46,8 @@ class SinaService:
         """
         获取新浪财经新闻内容
         """
+        import aiohttp
+        from bs4 import BeautifulSoup
         async with aiohttp.ClientSession() as session:
             async with session.get(self.news_url, headers=self.headers) as response:
                 if response.status != 200:
@@ -134,10 +137,19 @@ class SinaService:
                 await asyncio.sleep(60)  # 发生错误时等待1分钟后重试
 
     def start_scheduled_task(self):
+        """启动定时抓取任务，需要在事件循环中调用"""
         if self.task is None:
-            loop = asyncio.get_event_loop()
-            self.task = loop.create_task(self.schedule_news_fetch())
+            self.task = asyncio.get_running_loop().create_task(self.schedule_news_fetch())
 
-# 启动定时任务
+    async def stop_scheduled_task(self):
+        """停止定时抓取任务"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+# 创建单例，定时任务在应用启动时按配置启动
 sina_service = SinaService()
-sina_service.start_scheduled_task() 
\ No newline at end of file
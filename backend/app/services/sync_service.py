@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from fastapi import HTTPException
+
+from app.core.logging import logger
+from app.models.db.change_log import ChangeLog, OP_DELETE
+from app.models.db.news import News
+from app.models.learning import Learning
+from app.models.questions import Question
+from app.models.sync import SyncDeletes, SyncResponse, SyncUpserts
+from app.services.learning_service import learning_service
+from app.services.news_service import news_service
+from app.services.questions_service import questions_service
+
+# 实体类型对应的数据库模型和转换函数
+ENTITY_TYPES = {
+    "news": (News, news_service._to_item),
+    "learning": (Learning, learning_service._to_item),
+    "questions": (Question, questions_service._to_item),
+}
+
+
+class SyncService:
+    """增量同步服务，基于变更日志向离线客户端返回自某个游标以来的变更"""
+    
+    @staticmethod
+    def _parse_token(token: Optional[str]) -> int:
+        """解析同步游标，未提供时从头开始同步"""
+        if not token:
+            return 0
+        try:
+            cursor = int(token)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"无效的同步游标: {token}")
+        if cursor < 0:
+            raise HTTPException(status_code=400, detail=f"无效的同步游标: {token}")
+        return cursor
+    
+    async def get_changes(self, db: AsyncSession, since: Optional[str], limit: int) -> SyncResponse:
+        """
+        获取自游标以来的变更
+        
+        Args:
+            db: 数据库会话
+            since: 上次同步返回的nextToken
+            limit: 本次最多处理的变更日志条数
+            
+        Returns:
+            按类型分组的新增/更新内容和已删除ID
+        """
+        cursor = self._parse_token(since)
+        try:
+            # 多取一条用于判断是否还有后续变更
+            query = (
+                select(ChangeLog)
+                .where(ChangeLog.seq > cursor)
+                .order_by(ChangeLog.seq)
+                .limit(limit + 1)
+            )
+            result = await db.execute(query)
+            rows = result.scalars().all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            # 同一内容在本页内多次变更时只保留最后一次
+            latest: Dict[Tuple[str, str], str] = {}
+            for row in rows:
+                latest[(row.entity_type, row.entity_id)] = row.op
+            
+            upsert_ids: Dict[str, List[str]] = {entity_type: [] for entity_type in ENTITY_TYPES}
+            deletes = SyncDeletes()
+            for (entity_type, entity_id), op in latest.items():
+                if entity_type not in ENTITY_TYPES:
+                    continue
+                if op == OP_DELETE:
+                    getattr(deletes, entity_type).append(entity_id)
+                else:
+                    upsert_ids[entity_type].append(entity_id)
+            
+            upserts = SyncUpserts()
+            for entity_type, ids in upsert_ids.items():
+                if ids:
+                    setattr(upserts, entity_type, await self._load_items(db, entity_type, ids))
+            
+            next_token = str(rows[-1].seq) if rows else str(cursor)
+            return SyncResponse(upserts=upserts, deletes=deletes, nextToken=next_token, hasMore=has_more)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"获取同步数据失败, since={since}: {e}")
+            raise HTTPException(status_code=500, detail=f"获取同步数据失败: {str(e)}")
+    
+    async def _load_items(self, db: AsyncSession, entity_type: str, ids: List[str]) -> list:
+        """一次查询加载同一类型的所有变更内容"""
+        model, to_item = ENTITY_TYPES[entity_type]
+        result = await db.execute(select(model).where(model.id.in_(ids)))
+        # 之后已被删除的内容查不到，其删除记录会出现在后续页中
+        return [to_item(item) for item in result.scalars().all()]
+
+
+# 创建服务实例
+sync_service = SyncService()
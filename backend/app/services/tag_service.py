@@ -0,0 +1,79 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Select, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.db.tags import ItemTag, Tag, normalize_tags
+from app.models.tags import TagCount
+
+
+class TagService:
+    """
+    标签索引查询服务
+
+    按标签筛选和标签统计只查询 tags / item_tags 两张索引表，
+    不需要读取和解析内容表中的JSON标签列。
+    """
+
+    @staticmethod
+    def tagged_ids(entity_type: str, tags: Iterable[str]) -> Optional[Select]:
+        """
+        同时带有全部给定标签的内容ID子查询
+
+        Args:
+            entity_type: 实体类型（表名）
+            tags: 标签名列表
+
+        Returns:
+            内容ID子查询，标签列表为空时返回None
+        """
+        names = normalize_tags(tags)
+        if not names:
+            return None
+        item_tags = ItemTag.__table__
+        tags_table = Tag.__table__
+        query = (
+            select(item_tags.c.item_id)
+            .join(tags_table, tags_table.c.id == item_tags.c.tag_id)
+            .where(item_tags.c.entity_type == entity_type, tags_table.c.name.in_(names))
+        )
+        if len(names) > 1:
+            query = query.group_by(item_tags.c.item_id).having(func.count() == len(names))
+        return query
+
+    async def facets(
+        self, db: AsyncSession, entity_type: str, ids: Optional[Select] = None, limit: int = None,
+    ) -> List[TagCount]:
+        """
+        统计各标签的内容数
+
+        Args:
+            db: 数据库会话
+            entity_type: 实体类型（表名）
+            ids: 只统计这些内容ID，为None时统计全部内容
+            limit: 最多返回的标签数，默认使用 TAG_FACET_LIMIT
+
+        Returns:
+            标签统计，按数量降序、标签名升序
+        """
+        item_tags = ItemTag.__table__
+        tags_table = Tag.__table__
+        count = func.count().label("count")
+        query = (
+            select(tags_table.c.name, count)
+            .select_from(item_tags)
+            .join(tags_table, tags_table.c.id == item_tags.c.tag_id)
+            .where(item_tags.c.entity_type == entity_type)
+            .group_by(tags_table.c.name)
+            .order_by(desc(count), tags_table.c.name)
+            .limit(limit or settings.TAG_FACET_LIMIT)
+        )
+        if ids is not None:
+            query = query.where(item_tags.c.item_id.in_(ids))
+        result = await db.execute(query)
+        return [TagCount(name=name, count=total) for name, total in result.all()]
+
+
+# 创建服务实例
+tag_service = TagService()
@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, update
+
+from app.core.cache import table_versions
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.questions import Question
+
+# 单条UPDATE语句中最多包含的ID数量，每个ID占用三个绑定参数（SQLite上限999）
+FLUSH_BATCH_SIZE = 300
+
+
+class _Shard:
+    """计数分片，持有独立的锁以减少线程间竞争"""
+
+    __slots__ = ("lock", "pending", "totals")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[str, int] = {}  # 尚未写入数据库的增量
+        self.totals: Dict[str, int] = {}  # 本进程启动以来的累计浏览量
+
+
+class ViewCounter:
+    """
+    问题浏览量写后缓冲计数器
+
+    读取问题时只在内存中累加浏览量，后台任务定期把累计的增量合并成批量
+    UPDATE ... CASE 语句写入数据库，避免每次读取都产生一次写事务。
+    计数按ID哈希分片加锁，同步路由（线程池）和异步路由都可以安全调用。
+    """
+
+    def __init__(self, shards: int = None, flush_interval: float = None):
+        """初始化计数器"""
+        self._shards = [_Shard() for _ in range(shards or settings.VIEW_COUNTER_SHARDS)]
+        self.flush_interval = flush_interval or settings.VIEW_COUNTER_FLUSH_INTERVAL
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def _shard(self, item_id: str) -> _Shard:
+        return self._shards[zlib.crc32(item_id.encode("utf-8")) % len(self._shards)]
+
+    def increment(self, item_id: str, count: int = 1) -> None:
+        """记录浏览"""
+        shard = self._shard(item_id)
+        with shard.lock:
+            shard.pending[item_id] = shard.pending.get(item_id, 0) + count
+            shard.totals[item_id] = shard.totals.get(item_id, 0) + count
+
+    def pending(self, item_id: str) -> int:
+        """获取尚未写入数据库的浏览量，用于在响应中补足最新计数"""
+        shard = self._shard(item_id)
+        with shard.lock:
+            return shard.pending.get(item_id, 0)
+
+    def most_viewed(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        根据内存中的累计浏览量获取浏览最多的问题，不查询数据库
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            (问题ID, 浏览量) 列表，按浏览量降序
+        """
+        candidates: List[Tuple[str, int]] = []
+        for shard in self._shards:
+            with shard.lock:
+                candidates.extend(heapq.nlargest(limit, shard.totals.items(), key=lambda kv: kv[1]))
+        return heapq.nlargest(limit, candidates, key=lambda kv: kv[1])
+
+    def _drain(self) -> Dict[str, int]:
+        """取出所有待写入的增量"""
+        drained: Dict[str, int] = {}
+        for shard in self._shards:
+            with shard.lock:
+                pending, shard.pending = shard.pending, {}
+            drained.update(pending)
+        return drained
+
+    def _restore(self, counts: Dict[str, int]) -> None:
+        """写入失败时把增量放回，等待下次重试"""
+        for item_id, count in counts.items():
+            shard = self._shard(item_id)
+            with shard.lock:
+                shard.pending[item_id] = shard.pending.get(item_id, 0) + count
+
+    @staticmethod
+    def _batches(counts: Dict[str, int]):
+        items = list(counts.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            yield dict(items[start:start + FLUSH_BATCH_SIZE])
+
+    @staticmethod
+    def _build_update(counts: Dict[str, int]):
+        """构造 UPDATE questions SET view_count = view_count + CASE id WHEN ... END 语句"""
+        table = Question.__table__
+        return (
+            update(table)
+            .where(table.c.id.in_(list(counts)))
+            .values(
+                view_count=table.c.view_count + case(counts, value=table.c.id, else_=0),
+                # 浏览量变化不算内容更新，保持updated_at不变
+                updated_at=table.c.updated_at,
+            )
+        )
+
+    async def flush(self, session_factory: Callable) -> int:
+        """
+        将缓冲的浏览量批量写入数据库
+
+        Args:
+            session_factory: 异步会话工厂
+
+        Returns:
+            本次写入的问题数量
+        """
+        async with self._flush_lock:
+            counts = self._drain()
+            if not counts:
+                return 0
+            try:
+                async with session_factory() as session:
+                    for batch in self._batches(counts):
+                        await session.execute(self._build_update(batch))
+                    await session.commit()
+            except Exception as e:
+                self._restore(counts)
+                logger.error(f"写入问题浏览量失败，将在下次重试: {e}")
+                return 0
+            table_versions.bump(Question.__tablename__)
+            return len(counts)
+
+    def start(self, session_factory: Callable) -> None:
+        """启动定期写入任务"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._periodic_flush(session_factory))
+
+    async def stop(self, session_factory: Callable) -> None:
+        """停止定期写入任务，并写入剩余的浏览量"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        flushed = await self.flush(session_factory)
+        logger.info(f"已停止浏览量写入任务，最后写入 {flushed} 个问题的浏览量")
+
+    async def _periodic_flush(self, session_factory: Callable) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush(session_factory)
+
+
+# 创建单例
+view_counter = ViewCounter()
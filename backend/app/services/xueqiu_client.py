@@ -1,4 +1,3 @@
-import aiohttp
 import json
 import logging
 import asyncio
@@ -41,6 +40,8 @@ class XueqiuClient:
             logger.error("雪球API Cookie未设置，无法请求")
             return None
             
+        # aiohttp 导入较慢，首次请求时再导入，不影响服务启动
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params, headers=self.headers) as response:
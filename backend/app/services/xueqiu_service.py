@@ -1,5 +1,7 @@
 import asyncio
+import functools
 import json
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,10 +9,20 @@ from sqlalchemy.future import select
 from sqlalchemy import or_, desc
 
 from app.core.config import settings
-from app.core.database import get_async_db
+from app.core.database import write_queue
 from app.models.db.news import News
 from app.services.xueqiu_client import xueqiu_client
+from app.services.push_service import news_broker
 from app.core.logging import logger
+from app.core.metrics import metrics
+
+# 雪球新闻采集指标
+fetch_runs = metrics.counter("xueqiu_fetch_runs", "雪球新闻采集次数", ("result",))
+fetch_duration = metrics.histogram("xueqiu_fetch_duration_seconds", "一次雪球新闻采集的耗时（秒）")
+news_fetched = metrics.counter("xueqiu_news_fetched", "从雪球获取的新闻条数", ("category",))
+news_saved = metrics.counter("xueqiu_news_saved", "新保存到数据库的雪球新闻条数", ("category",))
+news_duplicates = metrics.counter("xueqiu_news_duplicates", "已存在而跳过的雪球新闻条数", ("category",))
+last_success = metrics.gauge("xueqiu_last_success_timestamp_seconds", "最近一次采集成功的时间（Unix时间戳）")
 
 
 class XueqiuNewsService:
@@ -76,70 +88,78 @@ class XueqiuNewsService:
         if not categories:
             categories = ["全部"]
             
-        # 获取数据库会话
-        db_generator = get_async_db()
-        db = await anext(db_generator)
-        
         saved_count = 0
+        started = time.perf_counter()
         try:
-            # 获取每个分类的新闻并保存
+            # 获取每个分类的新闻并保存，网络请求期间不占用数据库连接
             for category in categories:
                 news_items = await xueqiu_client.get_hot_news(category=category)
                 logger.info(f"从雪球获取了 {len(news_items)} 条[{category}]分类新闻")
+                news_fetched.inc(category, amount=len(news_items))
+                if not news_items:
+                    continue
                 
-                # 保存新闻到数据库
-                for item in news_items:
-                    # 检查是否已存在
-                    existing = await self._check_news_exists(item["id"], db)
-                    if existing:
-                        continue
-                        
-                    # 创建新闻对象
-                    news = News(
-                        id=item["id"],
-                        title=item["title"],
-                        summary=item["summary"],
-                        content=item["content"],
-                        source=item["source"],
-                        url=item.get("url", ""),
-                        publish_date=datetime.strptime(item["date"], "%Y-%m-%d"),
-                        image_url=item.get("imageUrl", "")
-                    )
-                    
-                    # 设置标签和分类
-                    news.categories_list = [item["category"]] if item.get("category") else []
-                    news.tags_list = item.get("tags", [])
-                    
-                    db.add(news)
-                    saved_count += 1
-                
-                # 提交事务
-                if saved_count > 0:
-                    await db.commit()
+                # 保存新闻到数据库，经由写入队列与其他写操作串行执行
+                category_news = await write_queue.submit(
+                    functools.partial(self._save_news, news_items=news_items, category=category)
+                )
+                if category_news:
+                    saved_count += len(category_news)
+                    news_saved.inc(category, amount=len(category_news))
                     logger.info(f"成功保存了 {saved_count} 条新雪球新闻")
+                    # 提交成功后再推送，避免客户端收到未入库的新闻
+                    news_broker.publish_news(category_news)
         except Exception as e:
-            await db.rollback()
+            fetch_runs.inc("error")
             logger.error(f"保存雪球新闻时出错: {str(e)}")
             raise
         finally:
-            await db.close()
-            
+            fetch_duration.observe(time.perf_counter() - started)
+        
+        fetch_runs.inc("success")
+        last_success.set(time.time())
         return saved_count
     
-    async def _check_news_exists(self, news_id: str, db: AsyncSession) -> bool:
+    async def _save_news(self, db: AsyncSession, news_items: List[Dict], category: str) -> List[News]:
         """
-        检查新闻是否已存在
+        在一个事务中保存尚未入库的新闻，由写入队列提交
         
         Args:
-            news_id: 新闻ID
             db: 数据库会话
+            news_items: 雪球新闻数据
+            category: 新闻分类，用于统计重复数
             
         Returns:
-            是否存在
+            新保存的新闻
         """
-        query = select(News).where(News.id == news_id)
-        result = await db.execute(query)
-        return result.scalar_one_or_none() is not None
+        ids = [item["id"] for item in news_items]
+        existing = set((await db.execute(select(News.id).where(News.id.in_(ids)))).scalars())
+        category_news = []
+        for item in news_items:
+            if item["id"] in existing:
+                news_duplicates.inc(category)
+                continue
+            existing.add(item["id"])
+            
+            # 创建新闻对象
+            news = News(
+                id=item["id"],
+                title=item["title"],
+                summary=item["summary"],
+                content=item["content"],
+                source=item["source"],
+                url=item.get("url", ""),
+                publish_date=datetime.strptime(item["date"], "%Y-%m-%d"),
+                image_url=item.get("imageUrl", "")
+            )
+            
+            # 设置标签和分类
+            news.categories_list = [item["category"]] if item.get("category") else []
+            news.tags_list = item.get("tags", [])
+            
+            db.add(news)
+            category_news.append(news)
+        return category_news
 
 
 # 创建单例
@@ -0,0 +1,338 @@
+"""
+批量数据导入
+
+流式读取JSON数组或JSONL文件，按块与数据库中已有的ID比对后批量插入，
+每块一个事务，内存占用只与块大小有关。PostgreSQL（psycopg2）上使用 COPY，
+其他数据库使用 executemany。导入的数据同时写入变更日志和标签索引，并更新分面计数、使相关缓存失效。
+已存在的ID会被跳过，中断后重新运行即可从断点继续。
+
+用法:
+    python -m app.utils.bulk_import news data/news_data.json
+    python -m app.utils.bulk_import questions /tmp/questions.jsonl --chunk-size 10000
+"""
+import argparse
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Table, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import table_versions
+from app.models.db import ChangeLog, News
+from app.models.db.change_log import OP_UPSERT
+from app.models.db.tags import decode_tags, index_item_tags
+from app.models.learning import Learning
+from app.models.questions import Question
+from app.services.facet_service import facet_service
+from app.utils.json_store import iter_json_array
+
+# 每个事务导入的记录数
+DEFAULT_CHUNK_SIZE = 5000
+
+# 查询已有ID时每条语句包含的ID数量，低于旧版SQLite的999个绑定参数上限
+ID_QUERY_BATCH = 900
+
+
+def _json_list(value: Any) -> str:
+    return json.dumps(value or [], ensure_ascii=False)
+
+
+def _parse_datetime(value: Any, default: datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def news_row(item: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """把新闻数据（JSON文件或API格式）转换为数据库行"""
+    categories = item.get("categories") or ([item["category"]] if item.get("category") else [])
+    return {
+        "id": item.get("id") or str(uuid.uuid4()),
+        "title": item["title"],
+        "summary": item.get("summary"),
+        "content": item.get("content") or "",
+        "source": item.get("source"),
+        "url": item.get("url"),
+        "publish_date": _parse_datetime(item.get("publishDate", item.get("date")), now),
+        "category": categories[0] if categories else None,
+        "image_url": item.get("imageUrl"),
+        # 与 News.tags_list 的写法保持一致，存储为JSON字符串
+        "tags": _json_list(item.get("tags")),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def learning_row(item: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """把学习内容数据（JSON文件或API格式）转换为数据库行"""
+    return {
+        "id": item.get("id") or str(uuid.uuid4()),
+        "title": item["title"],
+        "short_description": item.get("shortDescription") or "",
+        "content": item.get("content", item.get("fullContent")) or "",
+        "difficulty": item.get("difficulty") or "beginner",
+        "tags": _json_list(item.get("tags")),
+        "related_items": _json_list(item.get("relatedItems", item.get("nextSteps"))),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def question_row(item: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """把问题数据（JSON文件或API格式）转换为数据库行"""
+    categories = item.get("categories") or ([item["category"]] if item.get("category") else [])
+    answer = item.get("answer", item.get("fullAnswer", item.get("previewAnswer"))) or ""
+    return {
+        "id": item.get("id") or str(uuid.uuid4()),
+        "question": item["question"],
+        "answer": answer,
+        "difficulty": item.get("difficulty") or "基础",
+        "categories": _json_list(categories),
+        "tags": _json_list(item.get("tags")),
+        "related_questions": _json_list(item.get("relatedQuestions")),
+        "view_count": item.get("viewCount") or 0,
+        # questions 表上还保留着旧模型的非空列
+        "title": item["question"],
+        "content": answer,
+        "category": categories[0] if categories else None,
+        "answer_count": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# 实体类型 -> (表, 行转换函数)
+ENTITY_TABLES: Dict[str, tuple] = {
+    "news": (News.__table__, news_row),
+    "learning": (Learning.__table__, learning_row),
+    "questions": (Question.__table__, question_row),
+}
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取数据文件，.jsonl 按行读取，其他按JSON数组读取
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        每条记录
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f)
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ImportStats:
+    """导入统计"""
+
+    __slots__ = ("entity_type", "read", "inserted", "skipped", "invalid", "started")
+
+    def __init__(self, entity_type: str):
+        self.entity_type = entity_type
+        self.read = 0  # 读取的记录数
+        self.inserted = 0  # 新插入的记录数
+        self.skipped = 0  # 已存在而跳过的记录数
+        self.invalid = 0  # 缺少必需字段的记录数
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "entity_type": self.entity_type,
+            "read": self.read,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "seconds": round(self.elapsed, 3),
+        }
+
+    def __str__(self) -> str:
+        rate = self.read / self.elapsed if self.elapsed > 0 else 0
+        return (
+            f"{self.entity_type}: 已读取 {self.read} 条，插入 {self.inserted}，跳过 {self.skipped}，"
+            f"无效 {self.invalid}，{rate:.0f} 条/秒"
+        )
+
+
+class BulkImporter:
+    """批量导入器"""
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_copy: bool = True,
+        progress: Optional[Callable[[ImportStats], None]] = None,
+    ):
+        """
+        Args:
+            db: 同步数据库会话，每导入一块提交一次
+            chunk_size: 每个事务导入的记录数
+            use_copy: PostgreSQL（psycopg2）上是否使用 COPY
+            progress: 每导入一块后调用的进度回调
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+        self.progress = progress
+
+    def _existing_ids(self, table: Table, ids: List[str]) -> set:
+        """查询已存在的ID"""
+        existing = set()
+        for start in range(0, len(ids), ID_QUERY_BATCH):
+            batch = ids[start:start + ID_QUERY_BATCH]
+            existing.update(self.db.execute(select(table.c.id).where(table.c.id.in_(batch))).scalars())
+        return existing
+
+    def _copy_rows(self, table: Table, rows: List[Dict[str, Any]]) -> bool:
+        """使用 COPY 写入，驱动不支持时返回False"""
+        cursor = self.db.connection().connection.cursor()
+        try:
+            if not hasattr(cursor, "copy_expert"):
+                return False
+            columns = list(rows[0])
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                # 用 \N 表示NULL，使空字符串仍按空字符串导入
+                writer.writerow(["\\N" if row[column] is None else row[column] for column in columns])
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+            return True
+        finally:
+            cursor.close()
+
+    def _insert_rows(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        if self.use_copy and self.db.bind.dialect.name == "postgresql" and self._copy_rows(table, rows):
+            return
+        self.db.execute(table.insert(), rows)
+
+    def import_records(self, entity_type: str, records: Iterable[Dict[str, Any]]) -> ImportStats:
+        """
+        导入记录
+
+        Args:
+            entity_type: 实体类型（news、learning、questions）
+            records: 记录迭代器，字段可以是JSON文件格式或API格式
+
+        Returns:
+            导入统计
+        """
+        table, mapper = ENTITY_TABLES[entity_type]
+        change_log = ChangeLog.__table__
+        stats = ImportStats(entity_type)
+
+        for chunk in _chunks(records, self.chunk_size):
+            now = datetime.now()
+            stats.read += len(chunk)
+            rows: Dict[str, Dict[str, Any]] = {}
+            invalid = 0
+            for record in chunk:
+                try:
+                    row = mapper(record, now)
+                except (KeyError, TypeError, AttributeError):
+                    invalid += 1
+                    continue
+                # 同一块中重复的ID只保留最后一条
+                rows[row["id"]] = row
+
+            existing = self._existing_ids(table, list(rows))
+            new_rows = [row for row_id, row in rows.items() if row_id not in existing]
+            stats.invalid += invalid
+            stats.skipped += len(chunk) - invalid - len(new_rows)
+            if new_rows:
+                try:
+                    self._insert_rows(table, new_rows)
+                    # 核心层插入不会触发ORM事件，变更日志和标签索引需要单独写入
+                    self.db.execute(change_log.insert(), [
+                        {"entity_type": entity_type, "entity_id": row["id"], "op": OP_UPSERT, "changed_at": now}
+                        for row in new_rows
+                    ])
+                    index_item_tags(
+                        self.db.connection(), entity_type,
+                        {row["id"]: decode_tags(row["tags"]) for row in new_rows}, replace=False,
+                    )
+                    self.db.commit()
+                except Exception:
+                    self.db.rollback()
+                    raise
+                stats.inserted += len(new_rows)
+                facet_service.apply(entity_type, [(row["id"], row) for row in new_rows])
+            if self.progress:
+                self.progress(stats)
+
+        if stats.inserted:
+            table_versions.bump(entity_type)
+        return stats
+
+    def import_file(self, entity_type: str, path: Path) -> ImportStats:
+        """
+        从JSON数组或JSONL文件导入
+
+        Args:
+            entity_type: 实体类型
+            path: 文件路径
+
+        Returns:
+            导入统计
+        """
+        return self.import_records(entity_type, iter_records(path))
+
+
+def main(argv: Iterable[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="批量导入JSON/JSONL数据到数据库")
+    parser.add_argument("entity_type", choices=sorted(ENTITY_TABLES))
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--no-copy", action="store_true", help="PostgreSQL上不使用COPY")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal, engine, Base
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        importer = BulkImporter(
+            db,
+            chunk_size=args.chunk_size,
+            use_copy=not args.no_copy,
+            progress=lambda stats: print(f"\r{stats}", end="", flush=True),
+        )
+        stats = importer.import_file(args.entity_type, args.path)
+    print()
+    print(json.dumps(stats.as_dict(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
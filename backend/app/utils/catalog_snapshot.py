@@ -0,0 +1,362 @@
+"""
+内容目录二进制快照
+
+把学习内容、新闻和问题编译成一个只读的二进制文件，通过 mmap 加载：
+直接使用 CatalogSnapshot 时，多个进程打开同一个文件通过操作系统页缓存共享内存，
+字段只在访问时才解码。
+
+由JSON数据文件生成的快照（--source json）在目录中记录各数据文件的修改时间和大小，
+数据服务（app.services.data_service）启动时在数据文件未变化的情况下从快照构造数据项，
+跳过JSON解析和模型校验；数据项仍复制到各进程的内存中，读取后即关闭快照。
+由数据库生成的快照不会被数据服务使用。
+
+文件格式（小端序）:
+    文件头: 魔数 b"CZDCAT01" + u32 目录长度 + 目录JSON，按8字节对齐
+    每个分区:
+        记录表: count * len(fields) 个 (u32 偏移, u32 长度)，偏移相对于数据区起点，
+                长度为 0xFFFFFFFF 表示 None
+        ID索引: count 个 u32 记录序号，按ID的UTF-8字节序排列，用于二分查找
+        数据区: 所有字段值的UTF-8编码，字符串字段直接存放，其他类型存放JSON文本
+
+用法:
+    python -m app.utils.catalog_snapshot build --source json
+    python -m app.utils.catalog_snapshot build --source db --output /tmp/catalog.snap
+    python -m app.utils.catalog_snapshot info
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+MAGIC = b"CZDCAT01"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sI")
+_SLOT = struct.Struct("<II")
+_INDEX = struct.Struct("<I")
+_NULL = 0xFFFFFFFF
+
+# 字段类型：s 为字符串，j 为JSON编码的其他类型
+KIND_STR = "s"
+KIND_JSON = "j"
+
+
+def default_snapshot_path() -> Path:
+    """默认的快照文件路径"""
+    return settings.DATA_DIR / settings.CATALOG_SNAPSHOT_FILE
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class SnapshotRecord:
+    """快照中的一条记录，字段在访问时才从映射内存中解码"""
+
+    __slots__ = ("_section", "_index")
+
+    def __init__(self, section: "SnapshotSection", index: int):
+        self._section = section
+        self._index = index
+
+    def __getitem__(self, field: str) -> Any:
+        return self._section._value(self._index, self._section._field_index(field))
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """获取字段值，字段不存在时返回默认值"""
+        if field not in self._section.field_positions:
+            return default
+        return self[field]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """解码全部字段"""
+        return {
+            field: self._section._value(self._index, position)
+            for position, field in enumerate(self._section.fields)
+        }
+
+    def __repr__(self) -> str:
+        return f"SnapshotRecord({self._section.name}, id={self['id']!r})"
+
+
+class SnapshotSection:
+    """快照中的一类内容"""
+
+    def __init__(self, snapshot: "CatalogSnapshot", name: str, meta: Dict[str, Any]):
+        self.name = name
+        self.count: int = meta["count"]
+        self.fields: List[str] = meta["fields"]
+        self.kinds: List[str] = meta["kinds"]
+        self.field_positions = {field: position for position, field in enumerate(self.fields)}
+        self._buf = snapshot._buf
+        self._records = meta["records"]
+        self._ids = meta["ids"]
+        self._blob = meta["blob"]
+        self._id_position = self.field_positions["id"]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[SnapshotRecord]:
+        for index in range(self.count):
+            yield SnapshotRecord(self, index)
+
+    def __getitem__(self, index: int) -> SnapshotRecord:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return SnapshotRecord(self, index)
+
+    def _field_index(self, field: str) -> int:
+        try:
+            return self.field_positions[field]
+        except KeyError:
+            raise KeyError(f"{self.name} 没有字段 {field}") from None
+
+    def _raw(self, index: int, position: int) -> Optional[memoryview]:
+        """获取字段的原始字节，不复制数据"""
+        offset, length = _SLOT.unpack_from(self._buf, self._records + (index * len(self.fields) + position) * _SLOT.size)
+        if length == _NULL:
+            return None
+        start = self._blob + offset
+        return self._buf[start:start + length]
+
+    def _value(self, index: int, position: int) -> Any:
+        raw = self._raw(index, position)
+        if raw is None:
+            return None
+        text = str(raw, "utf-8")
+        return text if self.kinds[position] == KIND_STR else json.loads(text)
+
+    def get_by_id(self, item_id: str) -> Optional[SnapshotRecord]:
+        """按ID二分查找记录"""
+        target = item_id.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            index = _INDEX.unpack_from(self._buf, self._ids + middle * _INDEX.size)[0]
+            current = bytes(self._raw(index, self._id_position))
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle
+            else:
+                return SnapshotRecord(self, index)
+        return None
+
+
+class CatalogSnapshot:
+    """
+    以只读内存映射方式打开的内容目录快照
+
+    Example:
+        with CatalogSnapshot.open() as catalog:
+            item = catalog["news"].get_by_id("news-001")
+            title = item["title"]
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        magic, directory_size = _HEADER.unpack_from(self._buf, 0) if len(self._buf) >= _HEADER.size else (b"", 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} 不是内容目录快照文件")
+        self.directory = json.loads(str(self._buf[_HEADER.size:_HEADER.size + directory_size], "utf-8"))
+        if self.directory.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的快照版本: {self.directory.get('version')}")
+        self.sections = {
+            name: SnapshotSection(self, name, meta)
+            for name, meta in self.directory["sections"].items()
+        }
+
+    @classmethod
+    def open(cls, path: Path = None) -> "CatalogSnapshot":
+        """打开快照文件，默认使用配置中的路径"""
+        return cls(path or default_snapshot_path())
+
+    def __getitem__(self, name: str) -> SnapshotSection:
+        return self.sections[name]
+
+    def close(self) -> None:
+        """释放内存映射，之前取得的记录不能再访问"""
+        self.sections = {}
+        self._buf.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "CatalogSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _encode_section(items: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """把一类内容编码为记录表、ID索引和数据区"""
+    fields: List[str] = ["id"]
+    for item in items:
+        for field in item:
+            if field not in fields:
+                fields.append(field)
+    kinds = [
+        KIND_STR if all(isinstance(item.get(field), (str, type(None))) for item in items) else KIND_JSON
+        for field in fields
+    ]
+
+    records = bytearray()
+    blob = bytearray()
+    for item in items:
+        for field, kind in zip(fields, kinds):
+            value = item.get(field)
+            if value is None:
+                records += _SLOT.pack(0, _NULL)
+                continue
+            data = (value if kind == KIND_STR else json.dumps(value, ensure_ascii=False)).encode("utf-8")
+            if len(blob) + len(data) >= _NULL:
+                raise ValueError("单个分区的数据超过4GB，无法写入快照")
+            records += _SLOT.pack(len(blob), len(data))
+            blob += data
+
+    order = sorted(range(len(items)), key=lambda index: str(items[index]["id"]).encode("utf-8"))
+    ids = b"".join(_INDEX.pack(index) for index in order)
+    return {"count": len(items), "fields": fields, "kinds": kinds, "_parts": (bytes(records), ids, bytes(blob))}
+
+
+def write_snapshot(
+    path: Path,
+    sections: Dict[str, Sequence[Dict[str, Any]]],
+    source: str = "",
+    files: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    编译内容目录快照
+
+    Args:
+        path: 输出文件路径
+        sections: 分区名 -> 数据项字典列表，每个数据项必须包含字符串类型的 id
+        source: 数据来源说明，写入目录信息
+        files: 分区名 -> 生成快照时数据文件的 {"name", "mtime_ns", "size"}，数据服务据此判断快照是否可用
+
+    Returns:
+        快照的目录信息
+    """
+    encoded = {name: _encode_section(items) for name, items in sections.items()}
+    directory: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "source": source,
+        "builtAt": datetime.now().isoformat(),
+        "files": files or {},
+        "sections": {},
+    }
+
+    # 目录中包含各部分的绝对偏移，偏移又取决于目录长度，因此先用占位值估算目录长度
+    def layout(directory_size: int) -> int:
+        offset = _align(_HEADER.size + directory_size)
+        for name, section in encoded.items():
+            records, ids, blob = section["_parts"]
+            meta = {key: value for key, value in section.items() if key != "_parts"}
+            meta["records"] = offset
+            offset = _align(offset + len(records))
+            meta["ids"] = offset
+            offset = _align(offset + len(ids))
+            meta["blob"] = offset
+            offset = _align(offset + len(blob))
+            directory["sections"][name] = meta
+        return offset
+
+    directory_size = 0
+    while True:
+        layout(directory_size)
+        data = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+        if len(data) <= directory_size:
+            break
+        directory_size = len(data) + 64
+    data = data.ljust(directory_size)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, directory_size))
+            f.write(data)
+            for name, section in encoded.items():
+                meta = directory["sections"][name]
+                for part, start in zip(section["_parts"], (meta["records"], meta["ids"], meta["blob"])):
+                    f.write(b"\0" * (start - f.tell()))
+                    f.write(part)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return directory
+
+
+def load_from_json() -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """
+    从JSON数据文件读取内容目录
+
+    Returns:
+        (分区名 -> 数据项字典列表, 分区名 -> 加载时数据文件的 {"name", "mtime_ns", "size"})
+    """
+    from app.services.learning import learning_service
+    from app.services.news import news_service
+    from app.services.questions import questions_service
+
+    services = {"learning": learning_service, "news": news_service, "questions": questions_service}
+    sections = {name: [item.model_dump() for item in service.data_service.get_all()] for name, service in services.items()}
+    files = {name: service.data_service.data_file_info() for name, service in services.items()}
+    return sections, {name: info for name, info in files.items() if info is not None}
+
+
+def load_from_db() -> Dict[str, List[Dict[str, Any]]]:
+    """从数据库读取内容目录，字段与API响应一致"""
+    from sqlalchemy import select
+
+    from app.core.database import SessionLocal
+    from app.services.sync_service import ENTITY_TYPES
+
+    with SessionLocal() as session:
+        return {
+            name: [to_item(row).model_dump() for row in session.execute(select(model)).scalars()]
+            for name, (model, to_item) in ENTITY_TYPES.items()
+        }
+
+
+def main(argv: Iterable[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="内容目录二进制快照")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="编译快照")
+    build.add_argument("--source", choices=["json", "db"], default="json")
+    build.add_argument("--output", type=Path, default=None)
+    info = commands.add_parser("info", help="查看快照信息")
+    info.add_argument("path", type=Path, nargs="?", default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        output = args.output or default_snapshot_path()
+        sections, files = load_from_json() if args.source == "json" else (load_from_db(), None)
+        write_snapshot(output, sections, source=args.source, files=files)
+        counts = ", ".join(f"{name} {len(items)}" for name, items in sections.items())
+        print(f"已生成 {output} ({os.path.getsize(output)} 字节): {counts}")
+    else:
+        with CatalogSnapshot.open(args.path) as catalog:
+            print(json.dumps(catalog.directory, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,123 +1,79 @@
-import json
 import os
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.models.learning import Learning
-from app.models.news import News
-from app.models.questions import Question
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.core.logging import logger
-
-def load_json_data(filename):
-    """从JSON文件加载数据"""
-    file_path = os.path.join(settings.DATA_DIR, filename)
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"加载{file_path}时出错: {e}")
-        return None
+from app.utils.bulk_import import BulkImporter
 
 def init_db():
     """初始化数据库，创建表"""
     Base.metadata.create_all(bind=engine)
     logger.info("数据库表已创建")
 
-def migrate_learning_data(db: Session):
-    """迁移学习内容数据"""
-    data = load_json_data('learning_data.json')
-    if not data:
+def _migrate_file(db: Session, entity_type: str, filename: str):
+    """流式读取JSON数据文件，批量导入数据库中尚不存在的记录"""
+    file_path = os.path.join(settings.DATA_DIR, filename)
+    if not os.path.exists(file_path):
+        logger.error(f"加载{file_path}时出错: 文件不存在")
         return
     
-    count = 0
-    for item in data:
-        # 检查记录是否已存在
-        existing = db.query(Learning).filter(Learning.id == item.get('id')).first()
-        if existing:
-            continue
-        
-        learning = Learning(
-            id=item.get('id'),
-            title=item.get('title'),
-            short_description=item.get('shortDescription'),
-            content=item.get('fullContent', ''),
-            difficulty=item.get('difficulty'),
-            tags=json.dumps(item.get('tags', [])),
-            related_items=json.dumps(item.get('nextSteps', []))
-        )
-        db.add(learning)
-        count += 1
-    
-    db.commit()
-    logger.info(f"成功迁移了 {count} 条学习内容数据")
+    importer = BulkImporter(db, progress=lambda stats: logger.debug(str(stats)))
+    stats = importer.import_file(entity_type, file_path)
+    logger.info(f"成功迁移了 {stats.inserted} 条{entity_type}数据，跳过已存在的 {stats.skipped} 条")
+
+def migrate_learning_data(db: Session):
+    """迁移学习内容数据"""
+    _migrate_file(db, "learning", "learning_data.json")
 
 def migrate_news_data(db: Session):
     """迁移新闻数据"""
-    data = load_json_data('news_data.json')
-    if not data:
-        return
-    
-    count = 0
-    for item in data:
-        # 检查记录是否已存在
-        existing = db.query(News).filter(News.id == item.get('id')).first()
-        if existing:
-            continue
-        
-        # 日期处理
-        date_str = item.get('date')
-        try:
-            date = datetime.fromisoformat(date_str)
-        except (ValueError, TypeError):
-            date = datetime.now()
-        
-        news = News(
-            id=item.get('id'),
-            title=item.get('title'),
-            summary=item.get('summary'),
-            content=item.get('content', ''),
-            source=item.get('source'),
-            date=date,
-            category=item.get('category'),
-            image_url=item.get('imageUrl'),
-            tags=json.dumps(item.get('tags', [])),
-            ai_explanation=item.get('aiInterpretation', '')
-        )
-        db.add(news)
-        count += 1
-    
-    db.commit()
-    logger.info(f"成功迁移了 {count} 条新闻数据")
+    _migrate_file(db, "news", "news_data.json")
 
 def migrate_questions_data(db: Session):
     """迁移问题数据"""
-    data = load_json_data('questions_data.json')
-    if not data:
-        return
+    _migrate_file(db, "questions", "questions_data.json")
+
+def backfill_change_log(db: Session):
+    """为尚无变更日志的已有数据补写upsert记录，使增量同步能覆盖历史数据"""
+    from sqlalchemy import literal, select
+    from app.models.db.change_log import ChangeLog, OP_UPSERT, SYNC_TABLES
     
-    count = 0
-    for item in data:
-        # 检查记录是否已存在
-        existing = db.query(Question).filter(Question.id == item.get('id')).first()
-        if existing:
-            continue
-        
-        question = Question(
-            id=item.get('id'),
-            question=item.get('question'),
-            preview_answer=item.get('previewAnswer'),
-            full_answer=item.get('fullAnswer', ''),
-            category=item.get('category'),
-            tags=json.dumps(item.get('tags', [])),
-            related_questions=json.dumps(item.get('relatedQuestions', []))
+    change_log = ChangeLog.__table__
+    for table_name in SYNC_TABLES:
+        table = Base.metadata.tables[table_name]
+        logged_ids = select(change_log.c.entity_id).where(change_log.c.entity_type == table_name)
+        source = select(
+            literal(table_name),
+            table.c.id,
+            literal(OP_UPSERT),
+            literal(datetime.now()),
+        ).where(table.c.id.not_in(logged_ids))
+        result = db.execute(
+            change_log.insert().from_select(
+                ["entity_type", "entity_id", "op", "changed_at"], source
+            )
         )
-        db.add(question)
-        count += 1
+        logger.info(f"为 {table_name} 补写了 {result.rowcount} 条变更日志")
+    db.commit()
+
+def backfill_tag_index(db: Session, batch_size: int = 1000):
+    """为尚未建立标签索引的已有数据补写索引，已建立的内容会被跳过"""
+    from sqlalchemy import select
+    from app.models.db.tags import ItemTag, TAGGED_TABLES, decode_tags, index_item_tags
     
+    item_tags = ItemTag.__table__
+    for table_name in TAGGED_TABLES:
+        table = Base.metadata.tables[table_name]
+        indexed_ids = select(item_tags.c.item_id).where(item_tags.c.entity_type == table_name)
+        rows = db.execute(select(table.c.id, table.c.tags).where(table.c.id.not_in(indexed_ids))).all()
+        indexed = 0
+        for start in range(0, len(rows), batch_size):
+            batch = {item_id: decode_tags(tags) for item_id, tags in rows[start:start + batch_size]}
+            indexed += index_item_tags(db.connection(), table_name, batch, replace=False)
+        logger.info(f"为 {table_name} 补写了 {indexed} 条标签索引")
     db.commit()
-    logger.info(f"成功迁移了 {count} 条问题数据")
 
 def run_migration():
     """运行所有迁移"""
@@ -133,6 +89,8 @@ def run_migration():
         migrate_learning_data(db)
         migrate_news_data(db)
         migrate_questions_data(db)
+        backfill_change_log(db)
+        backfill_tag_index(db)
         logger.info("所有数据迁移完成")
     finally:
         db.close()
@@ -0,0 +1,177 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, TextIO
+
+from app.core.logging import logger
+
+# 流式解析时每次读取的字符数
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+# 数组元素之后允许出现的字符
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐个解析JSON数组中的元素
+
+    按块读取文件，每次只解码一个元素，内存占用与单个元素大小相当，
+    而不是与整个文件大小相当。
+
+    Args:
+        f: 以文本模式打开的文件
+        chunk_size: 每次读取的字符数
+
+    Yields:
+        数组中的元素
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        """读取下一块数据，丢弃已解析的部分；没有更多数据时返回False"""
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char(skip: str) -> str:
+        """跳过指定字符，返回下一个字符，文件结束时返回空字符串"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in skip:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    if next_char(_WHITESPACE) != "[":
+        raise ValueError("数据文件顶层必须是JSON数组")
+    pos += 1
+
+    expect_value = True
+    empty = True
+    while True:
+        char = next_char(_WHITESPACE)
+        if char == "]":
+            if expect_value and not empty:
+                raise ValueError(f"数组末尾多余的逗号，位置 {pos}")
+            return
+        if char == "":
+            raise ValueError("JSON数组未结束")
+        if char == ",":
+            if expect_value:
+                raise ValueError(f"意外的逗号，位置 {pos}")
+            pos += 1
+            expect_value = True
+            continue
+        if not expect_value:
+            raise ValueError(f"数组元素之间缺少逗号，位置 {pos}")
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 元素跨越了块边界，读取更多数据后重试
+                if fill():
+                    continue
+                raise
+            # 数字可能在块末尾被截断（如"2."），确认元素之后是分隔符
+            if (end == len(buffer) or buffer[end] not in _DELIMITERS) and fill():
+                continue
+            break
+        pos = end
+        expect_value = False
+        empty = False
+        yield value
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取JSONL文件
+
+    最后一行不完整时（写入过程中进程退出）忽略该行。
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        每一行的JSON对象
+    """
+    if not path.exists():
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"忽略 {path} 第 {line_no} 行不完整的记录")
+
+
+def append_jsonl(path: Path, record: Dict[str, Any]) -> None:
+    """
+    追加一条记录到JSONL文件并刷新到磁盘
+
+    Args:
+        path: 文件路径
+        record: 要写入的记录
+    """
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write_json(
+    path: Path, items: Iterable[Any], indent: int = 2, replace: Callable[[str, Path], None] = os.replace,
+) -> None:
+    """
+    原子地写入JSON数组文件
+
+    先写入同目录下的临时文件并刷新到磁盘，再通过rename替换目标文件，
+    写入过程中进程退出不会损坏原文件。
+
+    Args:
+        path: 目标文件路径
+        items: 数组元素
+        indent: 缩进空格数
+        replace: 用临时文件替换目标文件的函数，调用方可以在其中加锁或放弃替换（抛出异常）
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # 逐个元素写入，避免先在内存中拼接整个文件
+            f.write("[")
+            for i, item in enumerate(items):
+                f.write(",\n" if i else "\n")
+                text = json.dumps(item, ensure_ascii=False, indent=indent)
+                # JSON字符串中不会出现原始换行符，可以安全地按行缩进
+                f.write("\n".join(" " * indent + line for line in text.split("\n")))
+            f.write("\n]\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # 临时文件默认只有所有者可读写，保留原文件的权限
+        if path.exists():
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
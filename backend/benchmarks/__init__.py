@@ -0,0 +1 @@
+"""性能测试与基准测试脚本"""
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+内容目录冷启动基准测试
+
+同时启动多个工作进程（模拟多个 uvicorn worker），分别通过以下方式加载
+学习内容、新闻和问题，比较加载耗时和内存占用:
+
+    json      DataService 解析JSON文件并校验为模型实例
+    db        从配置的数据库查询全部内容并转换为响应模型
+    snapshot  DataService 从二进制快照（app.utils.catalog_snapshot）构造模型实例，即服务实际使用的方式
+    mmap      直接通过 mmap 打开二进制快照并读取每条记录的ID，数据不复制到进程内存，作为对照
+
+RSS 包含与其他进程共享的页，PSS 按共享进程数分摊共享页，
+多个进程的 PSS 之和才是它们实际占用的内存。
+
+用法:
+    python -m benchmarks.catalog_startup --workers 4 --scale 2000
+    python -m benchmarks.catalog_startup --modes json snapshot --output result.json
+
+--scale 把 data 目录中的示例数据复制为指定倍数（写入临时目录），json、snapshot 和
+mmap 使用同一份数据；db 模式使用当前配置的数据库。json 模式通过把 CATALOG_SNAPSHOT_FILE
+指向不存在的文件使数据服务不使用快照。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# 工作进程的日志也输出到标准输出，结果行加上前缀以便区分
+MESSAGE_PREFIX = "@@catalog_startup "
+DATA_FILES = {
+    "learning": "learning_data.json",
+    "news": "news_data.json",
+    "questions": "questions_data.json",
+}
+MODES = ("json", "db", "snapshot", "mmap")
+
+
+def _memory_kb() -> Dict[str, int]:
+    """读取当前进程的 RSS 和 PSS（KB），仅支持Linux"""
+    result = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                result["rss_kb"] = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    result["pss_kb"] = int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return result
+
+
+def _load(mode: str, snapshot_path: str) -> Tuple[int, List[str]]:
+    """按指定方式加载内容目录并访问每条记录，返回记录数和数据服务的数据来源"""
+    if mode in ("json", "snapshot"):
+        from app.services.learning import learning_service
+        from app.services.news import news_service
+        from app.services.questions import questions_service
+        services = [service.data_service for service in (learning_service, news_service, questions_service)]
+        count = sum(len([item.id for item in service.get_all()]) for service in services)
+        return count, sorted({service.source for service in services})
+    if mode == "db":
+        from app.utils.catalog_snapshot import load_from_db
+        sections = load_from_db()
+        return sum(len([item["id"] for item in items]) for items in sections.values()), []
+
+    from app.utils.catalog_snapshot import CatalogSnapshot
+    catalog = CatalogSnapshot.open(Path(snapshot_path))
+    # 保持快照打开，避免被回收后映射被释放
+    globals()["_catalog"] = catalog
+    return sum(len([record["id"] for record in section]) for section in catalog.sections.values()), []
+
+
+def worker(mode: str, snapshot_path: str) -> None:
+    """工作进程：加载完成后报告耗时，等待主进程通知后再报告内存，使所有进程同时驻留"""
+    import app.core.config  # noqa: F401  配置和日志的导入开销不计入加载时间
+    before = _memory_kb()
+    started = time.perf_counter()
+    count, sources = _load(mode, snapshot_path)
+    elapsed = time.perf_counter() - started
+    print(MESSAGE_PREFIX + json.dumps({"ready": True}), flush=True)
+    sys.stdin.readline()
+    print(MESSAGE_PREFIX + json.dumps({
+        "items": count,
+        "sources": sources,
+        "load_ms": round(elapsed * 1000, 2),
+        "rss_before_kb": before.get("rss_kb"),
+        **_memory_kb(),
+    }), flush=True)
+
+
+def _write_scaled_data(target: Path, scale: int) -> None:
+    """把示例数据复制为 scale 倍，ID 加序号后缀"""
+    from app.core.config import settings
+    for name, file_name in DATA_FILES.items():
+        with open(settings.DATA_DIR / file_name, encoding="utf-8") as f:
+            items = json.load(f)
+        scaled = [
+            {**item, "id": f"{item['id']}-{copy}", "title": f"{item.get('title', '')} #{copy}"}
+            for copy in range(scale)
+            for item in items
+        ]
+        with open(target / file_name, "w", encoding="utf-8") as f:
+            json.dump(scaled, f, ensure_ascii=False)
+
+
+def _read_message(process: subprocess.Popen) -> Dict[str, object]:
+    """读取工作进程的下一条结果，跳过日志输出"""
+    for line in process.stdout:
+        if line.startswith(MESSAGE_PREFIX):
+            return json.loads(line[len(MESSAGE_PREFIX):])
+    raise RuntimeError(f"工作进程异常退出，返回码 {process.wait()}")
+
+
+def _run_mode(mode: str, workers: int, env: Dict[str, str], snapshot_path: str) -> Dict[str, object]:
+    """启动一组工作进程并汇总结果"""
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.catalog_startup", "--worker", mode, "--snapshot", snapshot_path],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        _read_message(process)
+    wall = time.perf_counter() - started
+
+    reports: List[Dict[str, int]] = []
+    for process in processes:
+        process.stdin.write("report\n")
+        process.stdin.flush()
+    for process in processes:
+        reports.append(_read_message(process))
+        process.wait()
+
+    def mean(key: str) -> float:
+        values = [report[key] for report in reports if report.get(key) is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "items": reports[0]["items"],
+        "sources": reports[0]["sources"],
+        "wall_ms": round(wall * 1000, 2),
+        "load_ms_mean": mean("load_ms"),
+        "rss_mb_mean": round(mean("rss_kb") / 1024, 2),
+        "rss_growth_mb_mean": round((mean("rss_kb") - mean("rss_before_kb")) / 1024, 2),
+        "pss_mb_total": round(sum(report.get("pss_kb", 0) for report in reports) / 1024, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="内容目录冷启动基准测试")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=1000, help="示例数据复制倍数")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", type=str, default=None, help="将结果写入JSON文件")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", type=str, default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.snapshot)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        _write_scaled_data(data_dir, args.scale)
+        env = {**os.environ, "DATA_DIR": str(data_dir), "DATA_RELOAD_INTERVAL": "0"}
+
+        snapshot_path = str(data_dir / "catalog.snap")
+        build = subprocess.run(
+            [sys.executable, "-m", "app.utils.catalog_snapshot", "build", "--source", "json", "--output", snapshot_path],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        print(build.stdout.strip().splitlines()[-1])
+
+        results = []
+        for mode in args.modes:
+            mode_env = {**env, "CATALOG_SNAPSHOT_FILE": "missing.snap"} if mode == "json" else env
+            result = _run_mode(mode, args.workers, mode_env, snapshot_path)
+            results.append(result)
+            print(json.dumps(result, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""
+合成数据生成器
+
+按固定随机种子生成大规模的学习内容、新闻和问题数据，用于在接近生产规模的
+数据量下测试性能。相同的种子和数量总是生成完全相同的数据；三类数据使用
+各自独立的随机序列，调整其中一类的数量不会影响另外两类。
+
+生成的字段与 data 目录中的JSON文件格式一致（date、fullContent、fullAnswer 等），
+可以直接被 DataService、批量导入工具和快照构建工具读取。
+
+用法:
+    python -m benchmarks.datagen --scale 100k --format jsonl --output /tmp/corpus
+    python -m benchmarks.datagen --scale 10k --format json --output /tmp/data   # 可作为 DATA_DIR
+    python -m benchmarks.datagen --scale 1M --format db                         # 写入配置的数据库
+
+--scale 指定新闻数量，学习内容和问题的数量默认分别为其 1/10 和 1/2，
+也可以通过 --news/--learning/--questions 单独指定。
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+# 生成日期的基准时间，固定取值以保证结果可重复
+BASE_DATE = datetime(2024, 6, 30, 15, 0, 0)
+DATE_SPAN_DAYS = 730
+
+# 相关问题图中每个主题簇包含的问题数
+QUESTION_CLUSTER_SIZE = 40
+
+# 雪球新闻分类，与 XueqiuClient.get_hot_news 支持的分类一致
+XUEQIU_CATEGORIES = ["股市", "美股", "宏观", "外汇", "商品", "基金", "私募", "房产"]
+NEWS_CATEGORIES = XUEQIU_CATEGORIES + ["宏观经济", "科技股", "债券", "银行", "保险"]
+NEWS_SOURCES = ["财联社", "经济日报", "证券时报", "第一财经", "21世纪经济报道", "华尔街日报", "中国证券报"]
+
+STOCKS = [
+    ("贵州茅台", "SH600519"), ("宁德时代", "SZ300750"), ("招商银行", "SH600036"),
+    ("比亚迪", "SZ002594"), ("中国平安", "SH601318"), ("腾讯控股", "00700"),
+    ("美的集团", "SZ000333"), ("隆基绿能", "SH601012"), ("英伟达", "NVDA"), ("苹果", "AAPL"),
+]
+INSTITUTIONS = ["央行", "证监会", "国家统计局", "财政部", "美联储", "银保监会", "外汇局"]
+INDICATORS = ["CPI", "PPI", "PMI", "GDP", "社融", "M2", "LPR", "MLF利率", "存款准备金率", "十年期国债收益率"]
+DIRECTIONS = [("上涨", "下跌"), ("上调", "下调"), ("扩大", "收窄"), ("回升", "回落")]
+THEMES = ["AI算力", "新能源车", "光伏", "半导体", "消费复苏", "高股息", "中特估", "创新药", "低空经济", "出海"]
+
+LEARNING_TOPICS = [
+    ("基金", ["指数基金", "债券基金", "货币基金", "FOF", "ETF联接基金"]),
+    ("股票", ["市盈率", "市净率", "股息率", "ROE", "自由现金流"]),
+    ("债券", ["久期", "信用利差", "可转债", "国债逆回购", "收益率曲线"]),
+    ("理财规划", ["应急资金", "资产配置", "定投", "再平衡", "复利"]),
+    ("宏观经济", ["通货膨胀", "货币政策", "财政政策", "汇率", "经济周期"]),
+]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+QUESTION_CATEGORIES = ["投资基础", "股票分析", "基金投资", "债券知识", "宏观经济", "理财规划", "风险管理"]
+QUESTION_DIFFICULTIES = ["基础", "进阶", "高级"]
+
+
+def parse_scale(value: str) -> int:
+    """解析 10k、100k、1M 这样的数量"""
+    text = value.strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1_000_000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def _rng(seed: int, kind: str) -> random.Random:
+    return random.Random(f"{seed}-{kind}")
+
+
+def _date(rng: random.Random) -> datetime:
+    return BASE_DATE - timedelta(seconds=rng.randrange(DATE_SPAN_DAYS * 86400))
+
+
+def _stock_tag(rng: random.Random) -> str:
+    name, code = rng.choice(STOCKS)
+    return f"${name}({code})$"
+
+
+def _paragraph(rng: random.Random, subject: str, sentences: int) -> str:
+    templates = [
+        "{s}是投资者经常关注的话题，理解它有助于做出更理性的决策。",
+        "从历史数据来看，{s}与{i}之间存在一定的相关性，但并非一成不变。",
+        "分析{s}时，需要结合{t}等行业因素综合判断。",
+        "市场对{s}的预期往往会提前反映在价格中。",
+        "对于普通投资者而言，关注{s}的长期趋势比短期波动更重要。",
+        "{n}的案例说明，{s}在不同市场环境下的表现差异明显。",
+    ]
+    return "".join(
+        rng.choice(templates).format(
+            s=subject,
+            i=rng.choice(INDICATORS),
+            t=rng.choice(THEMES),
+            n=rng.choice(STOCKS)[0],
+        )
+        for _ in range(sentences)
+    )
+
+
+def generate_news(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """生成新闻，约三分之一为雪球来源，带有股票代码话题标签"""
+    rng = _rng(seed, "news")
+    for index in range(count):
+        publish_date = _date(rng)
+        is_xueqiu = rng.random() < 0.35
+        category = rng.choice(XUEQIU_CATEGORIES if is_xueqiu else NEWS_CATEGORIES)
+        up, down = rng.choice(DIRECTIONS)
+        kind = rng.randrange(3)
+        if kind == 0:
+            subject = rng.choice(INDICATORS)
+            title = f"{rng.choice(INSTITUTIONS)}：{publish_date.month}月{subject}同比{rng.choice([up, down])}{rng.randint(1, 30) / 10}%"
+        elif kind == 1:
+            subject = rng.choice(STOCKS)[0]
+            title = f"{subject}{rng.choice(['一季报', '半年报', '年报'])}出炉，净利润{rng.choice([up, down])}{rng.randint(1, 80)}%"
+        else:
+            subject = rng.choice(THEMES)
+            title = f"{subject}板块{rng.choice([up, down])}，资金净流入{rng.randint(1, 200)}亿元"
+
+        tags = rng.sample(THEMES, rng.randint(1, 3))
+        if is_xueqiu:
+            tags.append(_stock_tag(rng))
+        summary = _paragraph(rng, subject, 2)
+        item = {
+            "id": f"xueqiu-{10_000_000 + index}" if is_xueqiu else f"news-{index:07d}",
+            "title": title,
+            "summary": summary,
+            "content": summary + "\n\n" + "\n\n".join(_paragraph(rng, subject, 4) for _ in range(rng.randint(2, 6))),
+            "aiInterpretation": "" if is_xueqiu else f"简单来说，这条新闻说明{subject}出现了{rng.choice([up, down])}的变化。",
+            "date": publish_date.strftime("%Y-%m-%d"),
+            "source": "雪球" if is_xueqiu else rng.choice(NEWS_SOURCES),
+            "imageUrl": f"https://example.com/news/{index}.jpg",
+            "category": category,
+            "tags": tags,
+        }
+        if is_xueqiu:
+            item["url"] = f"https://xueqiu.com/{rng.randint(1_000_000, 9_999_999)}/{rng.randint(100_000_000, 999_999_999)}"
+        yield item
+
+
+def generate_learning(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """生成学习文章，同一主题按难度组成学习路径，nextSteps 指向路径中的后续文章"""
+    rng = _rng(seed, "learning")
+    for index in range(count):
+        topic, subjects = LEARNING_TOPICS[index % len(LEARNING_TOPICS)]
+        subject = rng.choice(subjects)
+        difficulty = DIFFICULTIES[(index // len(LEARNING_TOPICS)) % len(DIFFICULTIES)]
+        sections = "\n\n".join(
+            f"## {heading}\n\n{_paragraph(rng, subject, rng.randint(3, 6))}"
+            for heading in rng.sample(["什么是" + subject, "核心原理", "常见误区", "实战案例", "如何应用", "小结"], 4)
+        )
+        # 同一主题的下一篇文章相隔 len(LEARNING_TOPICS) 个序号
+        next_steps = [
+            f"learn-{next_index:07d}"
+            for next_index in (index + len(LEARNING_TOPICS), index + 2 * len(LEARNING_TOPICS))
+            if next_index < count
+        ]
+        yield {
+            "id": f"learn-{index:07d}",
+            "title": f"{topic}{['入门', '进阶', '精讲'][DIFFICULTIES.index(difficulty)]}：读懂{subject}",
+            "shortDescription": _paragraph(rng, subject, 1),
+            "fullContent": f"# 读懂{subject}\n\n{sections}",
+            "difficulty": difficulty,
+            "tags": [topic, subject] + rng.sample(THEMES, 1),
+            "nextSteps": next_steps,
+        }
+
+
+def generate_questions(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    生成问题，相关问题构成图：问题按主题簇分组，大多数相关问题指向同一簇，
+    少数指向其他簇
+    """
+    rng = _rng(seed, "questions")
+    for index in range(count):
+        cluster = index // QUESTION_CLUSTER_SIZE
+        cluster_rng = _rng(seed, f"questions-cluster-{cluster}")
+        category = cluster_rng.choice(QUESTION_CATEGORIES)
+        topic, subjects = cluster_rng.choice(LEARNING_TOPICS)
+        subject = rng.choice(subjects)
+
+        start = cluster * QUESTION_CLUSTER_SIZE
+        members = [member for member in range(start, min(start + QUESTION_CLUSTER_SIZE, count)) if member != index]
+        related = rng.sample(members, min(len(members), rng.randint(1, 4)))
+        if count > QUESTION_CLUSTER_SIZE and rng.random() < 0.3:
+            related.append(rng.randrange(count))
+        related_ids = list(dict.fromkeys(f"q{member:07d}" for member in related if member != index))
+
+        answer = _paragraph(rng, subject, rng.randint(3, 8))
+        yield {
+            "id": f"q{index:07d}",
+            "question": rng.choice([
+                f"什么是{subject}？",
+                f"如何判断{subject}的高低？",
+                f"{subject}对投资收益有什么影响？",
+                f"新手应该怎样理解{subject}？",
+                f"{subject}和{rng.choice(subjects)}有什么区别？",
+            ]),
+            "previewAnswer": answer[:40] + "...",
+            "fullAnswer": answer,
+            "category": category,
+            "difficulty": rng.choice(QUESTION_DIFFICULTIES),
+            "tags": [topic, subject],
+            "relatedQuestions": related_ids,
+            "viewCount": int(rng.paretovariate(1.2) * 10),
+        }
+
+
+# 实体类型 -> (生成函数, 数据文件名)
+GENERATORS: Dict[str, tuple] = {
+    "learning": (generate_learning, "learning_data"),
+    "news": (generate_news, "news_data"),
+    "questions": (generate_questions, "questions_data"),
+}
+
+
+def write_json(path: Path, items: Iterator[Dict[str, Any]]) -> int:
+    """逐条写入JSON数组文件"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for item in items:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(item, ensure_ascii=False))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def write_jsonl(path: Path, items: Iterator[Dict[str, Any]]) -> int:
+    """逐行写入JSONL文件"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_db(entity_type: str, items: Iterator[Dict[str, Any]]) -> int:
+    """通过批量导入工具写入配置的数据库"""
+    from app.core.database import Base, SessionLocal, engine
+    from app.utils.bulk_import import BulkImporter
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        stats = BulkImporter(db, progress=lambda stats: print(f"\r{stats}", end="", flush=True)).import_records(entity_type, items)
+    print()
+    return stats.inserted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="合成数据生成器")
+    parser.add_argument("--scale", type=parse_scale, default=parse_scale("10k"), help="新闻数量，如 10k、100k、1M")
+    parser.add_argument("--news", type=parse_scale, default=None)
+    parser.add_argument("--learning", type=parse_scale, default=None)
+    parser.add_argument("--questions", type=parse_scale, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["json", "jsonl", "db"], default="jsonl")
+    parser.add_argument("--output", type=Path, default=Path("synthetic_data"), help="json/jsonl格式的输出目录")
+    args = parser.parse_args()
+
+    counts = {
+        "news": args.news if args.news is not None else args.scale,
+        "learning": args.learning if args.learning is not None else max(1, args.scale // 10),
+        "questions": args.questions if args.questions is not None else max(1, args.scale // 2),
+    }
+    if args.format != "db":
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    writers: Dict[str, Callable[[Path, Iterator[Dict[str, Any]]], int]] = {"json": write_json, "jsonl": write_jsonl}
+    for entity_type, (generate, file_stem) in GENERATORS.items():
+        started = time.perf_counter()
+        items = generate(counts[entity_type], args.seed)
+        if args.format == "db":
+            written = write_db(entity_type, items)
+            target = "数据库"
+        else:
+            target = args.output / f"{file_stem}.{args.format}"
+            written = writers[args.format](target, items)
+        print(f"{entity_type}: {written} 条 -> {target}，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+"""
+API负载测试
+
+以指定并发数持续发送混合请求（列表、详情、搜索、聊天等），按路由统计吞吐量、
+p50/p95/p99 延迟和错误率，输出JSON和Markdown报告，并可与保存的基线结果比较。
+
+用法:
+    python -m benchmarks.loadtest --concurrency 50 --duration 30
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000 --duration 60 --output result
+    python -m benchmarks.loadtest --spawn --baseline baseline.json --max-regression 20
+
+目标:
+    默认在进程内通过 ASGI 直接调用 app.main:app（不经过网络，测量应用本身的开销）；
+    --target 指向已启动的服务；--spawn 在本机启动一个 uvicorn 进程后再测试。
+
+--scenarios 可以只运行部分场景，--include-external 会加入依赖外部网络的雪球抓取场景。
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.stats import summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 场景: 名称 -> 请求定义
+#   weight: 在混合负载中的权重
+#   slo_p95_ms: p95 延迟目标
+#   ids: 路径中 {id} 取值的来源（由预热阶段从列表接口收集）
+#   expected: 视为成功的状态码
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "news.list": {"method": "GET", "path": "/api/news", "weight": 20, "slo_p95_ms": 100},
+    "news.detail": {"method": "GET", "path": "/api/news/{id}", "ids": "news", "weight": 15, "slo_p95_ms": 50},
+    "news.search": {"method": "GET", "path": "/api/news/search/{keyword}", "weight": 5, "slo_p95_ms": 200},
+    "learning.list": {"method": "GET", "path": "/api/learning", "weight": 10, "slo_p95_ms": 100},
+    "learning.detail": {"method": "GET", "path": "/api/learning/{id}", "ids": "learning", "weight": 10, "slo_p95_ms": 50},
+    "questions.list": {"method": "GET", "path": "/api/questions", "weight": 10, "slo_p95_ms": 100},
+    "questions.detail": {"method": "GET", "path": "/api/questions/{id}", "ids": "questions", "weight": 10, "slo_p95_ms": 50},
+    "questions.most_viewed": {"method": "GET", "path": "/api/questions/most-viewed", "weight": 3, "slo_p95_ms": 50},
+    "home": {"method": "GET", "path": "/api/home", "weight": 5, "slo_p95_ms": 100},
+    "search": {
+        "method": "POST", "path": "/api/search", "weight": 5, "slo_p95_ms": 300,
+        "json": {"query": "{keyword}", "categories": ["all"]},
+    },
+    "chat": {
+        "method": "POST", "path": "/api/chat", "weight": 2, "slo_p95_ms": 2000,
+        "json": {"message": "什么是{keyword}？", "history": []},
+    },
+    "xueqiu.fetch": {
+        "method": "POST", "path": "/api/news/xueqiu/fetch", "weight": 1, "slo_p95_ms": 5000,
+        "external": True, "expected": [200, 403],
+    },
+}
+
+KEYWORDS = ["基金", "股票", "利率", "ETF", "债券", "央行", "市盈率", "通胀"]
+
+
+class RouteStats:
+    """单个场景的统计"""
+
+    __slots__ = ("latencies", "errors", "statuses")
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, status: str, latency: float, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def _render(template: Any, values: Dict[str, str]) -> Any:
+    """替换请求路径和请求体中的占位符"""
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {key: _render(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_render(value, values) for value in template]
+    return template
+
+
+async def _discover_ids(client: httpx.AsyncClient) -> Dict[str, List[str]]:
+    """从列表接口收集详情场景使用的ID"""
+    ids: Dict[str, List[str]] = {}
+    for name in ("news", "learning", "questions"):
+        try:
+            response = await client.get(f"/api/{name}")
+            ids[name] = [item["id"] for item in response.json().get("items", [])]
+        except Exception:
+            ids[name] = []
+    return ids
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    scenarios: Dict[str, Dict[str, Any]],
+    ids: Dict[str, List[str]],
+    stats: Dict[str, RouteStats],
+    deadline: float,
+    remaining: List[int],
+    rng: random.Random,
+) -> None:
+    names = list(scenarios)
+    weights = [scenarios[name]["weight"] for name in names]
+    while time.perf_counter() < deadline and remaining[0] != 0:
+        remaining[0] -= 1
+        name = rng.choices(names, weights)[0]
+        scenario = scenarios[name]
+        values = {"keyword": rng.choice(KEYWORDS)}
+        if scenario.get("ids"):
+            values["id"] = rng.choice(ids[scenario["ids"]])
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                scenario["method"],
+                _render(scenario["path"], values),
+                json=_render(scenario.get("json"), values),
+            )
+            status = str(response.status_code)
+            ok = response.status_code in scenario.get("expected", (200,))
+        except Exception as e:
+            status, ok = type(e).__name__, False
+        stats[name].record(status, time.perf_counter() - started, ok)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: Dict[str, Dict[str, Any]],
+    concurrency: int,
+    duration: float,
+    requests: Optional[int] = None,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    运行负载测试
+
+    Args:
+        client: 指向被测服务的客户端
+        scenarios: 参与的场景
+        concurrency: 并发请求数
+        duration: 持续时间（秒）
+        requests: 总请求数上限，达到后提前结束
+        seed: 场景选择的随机种子
+
+    Returns:
+        测试报告
+    """
+    ids = await _discover_ids(client)
+    # 没有可用ID的详情场景无法运行
+    scenarios = {
+        name: scenario for name, scenario in scenarios.items()
+        if not scenario.get("ids") or ids.get(scenario["ids"])
+    }
+    stats = {name: RouteStats() for name in scenarios}
+    remaining = [requests if requests else -1]
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _worker(client, scenarios, ids, stats, deadline, remaining, random.Random(seed + index))
+        for index in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for name, route in stats.items():
+        count = len(route.latencies)
+        if not count:
+            continue
+        summary = summarize(route.latencies)
+        slo = scenarios[name].get("slo_p95_ms")
+        routes[name] = {
+            **summary,
+            "throughput_rps": round(count / elapsed, 2),
+            "errors": route.errors,
+            "error_rate": round(route.errors / count, 4),
+            "statuses": route.statuses,
+            "slo_p95_ms": slo,
+            "slo_met": slo is None or summary["p95_ms"] <= slo,
+        }
+    all_latencies = [latency for route in stats.values() for latency in route.latencies]
+    total_errors = sum(route.errors for route in stats.values())
+    return {
+        "meta": {
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 3),
+            "seed": seed,
+            "scenarios": list(scenarios),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "total": {
+            **summarize(all_latencies),
+            "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0,
+            "errors": total_errors,
+            "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0,
+        },
+        "routes": routes,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    与基线比较，返回每个路由 p95 延迟和吞吐量的变化百分比
+
+    Returns:
+        路由名 -> {"p95_change_pct": ..., "throughput_change_pct": ..., "error_rate_change": ...}
+    """
+    def change(current: float, previous: float) -> Optional[float]:
+        if not previous:
+            return None
+        return round((current - previous) / previous * 100, 1)
+
+    result = {}
+    for name, route in report["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if not previous:
+            continue
+        result[name] = {
+            "p95_change_pct": change(route["p95_ms"], previous["p95_ms"]),
+            "throughput_change_pct": change(route["throughput_rps"], previous["throughput_rps"]),
+            "error_rate_change": round(route["error_rate"] - previous["error_rate"], 4),
+        }
+    return result
+
+
+def find_regressions(comparison: Dict[str, Dict[str, Optional[float]]], max_regression_pct: float) -> List[str]:
+    """找出 p95 延迟增加超过阈值或错误率上升的路由"""
+    return [
+        name for name, change in comparison.items()
+        if (change["p95_change_pct"] or 0) > max_regression_pct or change["error_rate_change"] > 0
+    ]
+
+
+def to_markdown(report: Dict[str, Any], comparison: Optional[Dict[str, Dict[str, Optional[float]]]] = None) -> str:
+    """生成Markdown格式的报告"""
+    meta, total = report["meta"], report["total"]
+    lines = [
+        "# API负载测试报告",
+        "",
+        f"- 时间: {meta['started_at']}",
+        f"- 并发: {meta['concurrency']}，持续 {meta['duration_s']} 秒",
+        f"- 总请求: {total.get('count', 0)}，吞吐量 {total['throughput_rps']} req/s，错误率 {total['error_rate']:.2%}",
+        "",
+    ]
+    header = "| 路由 | 请求数 | req/s | p50 ms | p95 ms | p99 ms | 错误率 | SLO(p95) |"
+    divider = "|---|---:|---:|---:|---:|---:|---:|---|"
+    if comparison is not None:
+        header += " p95变化 | 吞吐量变化 |"
+        divider += "---:|---:|"
+    lines += [header, divider]
+
+    def pct(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:+.1f}%"
+
+    for name, route in sorted(report["routes"].items()):
+        slo = "-" if route["slo_p95_ms"] is None else f"{'✅' if route['slo_met'] else '❌'} {route['slo_p95_ms']}ms"
+        row = (
+            f"| {name} | {route['count']} | {route['throughput_rps']} | {route['p50_ms']} | {route['p95_ms']} "
+            f"| {route['p99_ms']} | {route['error_rate']:.2%} | {slo} |"
+        )
+        if comparison is not None:
+            change = comparison.get(name, {})
+            row += f" {pct(change.get('p95_change_pct'))} | {pct(change.get('throughput_change_pct'))} |"
+        lines.append(row)
+    return "\n".join(lines) + "\n"
+
+
+async def _wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while True:
+            try:
+                if (await client.get("/api/status")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"服务 {url} 未在 {timeout} 秒内启动")
+            await asyncio.sleep(0.2)
+
+
+async def _run(args: argparse.Namespace, scenarios: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.target or args.spawn:
+        url = args.target or f"http://127.0.0.1:{args.port}"
+        server = None
+        if args.spawn:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+                cwd=BACKEND_DIR,
+            )
+        try:
+            await _wait_until_ready(url)
+            async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+                return await run_load(client, scenarios, args.concurrency, args.duration, args.requests, args.seed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    from app.main import app
+    # ASGITransport不会触发生命周期事件，手动执行启动和关闭
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            return await run_load(client, scenarios, args.concurrency, args.duration, args.requests, args.seed)
+    finally:
+        await app.router.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API负载测试")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="持续时间（秒）")
+    parser.add_argument("--requests", type=int, default=None, help="总请求数上限")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=None)
+    parser.add_argument("--include-external", action="store_true", help="包含依赖外部网络的场景")
+    parser.add_argument("--target", type=str, default=None, help="已启动服务的地址，如 http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="启动本地 uvicorn 进程进行测试")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0, help="单个请求超时（秒）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="报告文件前缀，生成 .json 和 .md")
+    parser.add_argument("--baseline", type=Path, default=None, help="基线报告（JSON）")
+    parser.add_argument("--max-regression", type=float, default=None, help="p95延迟允许的最大增幅（%%），超过时返回非零退出码")
+    args = parser.parse_args()
+
+    names = args.scenarios or [
+        name for name, scenario in SCENARIOS.items()
+        if args.include_external or not scenario.get("external")
+    ]
+    scenarios = {name: SCENARIOS[name] for name in names}
+
+    report = asyncio.run(_run(args, scenarios))
+    comparison = None
+    if args.baseline:
+        comparison = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+        report["comparison"] = comparison
+
+    markdown = to_markdown(report, comparison)
+    print(markdown)
+    if args.output:
+        args.output.with_suffix(".json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        args.output.with_suffix(".md").write_text(markdown, encoding="utf-8")
+
+    if comparison is not None and args.max_regression is not None:
+        regressions = find_regressions(comparison, args.max_regression)
+        if regressions:
+            print(f"性能回退: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+"""
+服务层热点函数的微基准测试
+
+覆盖CPU分析中占比最高的函数：搜索服务的相关性计算和摘要生成、新闻和学习内容
+列表接口中逐条构造Pydantic模型的循环、ORM模型上解码JSON字段的属性，
+以及 DataService 的内存搜索。输入数据由 benchmarks.datagen 按固定种子生成。
+
+计时方式与 timeit 相同：先自动确定循环次数使每轮耗时不少于 --min-time，
+再重复 --repeat 轮，报告每次调用的中位数、均值、标准差和95%置信区间。
+内存分配在计时之后单独用 tracemalloc 测量一次调用，避免跟踪开销影响计时。
+
+用法:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter search --size 5000 --output baseline.json
+    python -m benchmarks.micro --baseline baseline.json --max-regression 10
+"""
+import argparse
+import gc
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.datagen import generate_learning, generate_news
+from benchmarks.stats import describe
+
+# 基准测试名 -> (说明, 构造函数)；构造函数接收数据规模，返回 (被测函数, 每次调用处理的数据项数)
+BENCHMARKS: Dict[str, tuple] = {}
+
+KEYWORD = "央行"
+
+
+def benchmark(name: str, description: str):
+    """注册基准测试"""
+    def decorator(factory: Callable[[int], tuple]):
+        BENCHMARKS[name] = (description, factory)
+        return factory
+    return decorator
+
+
+def _news_rows(size: int) -> List[Dict[str, Any]]:
+    from app.utils.bulk_import import news_row
+    now = datetime.now()
+    return [news_row(item, now) for item in generate_news(size)]
+
+
+def _learning_rows(size: int) -> List[Dict[str, Any]]:
+    from app.utils.bulk_import import learning_row
+    now = datetime.now()
+    return [learning_row(item, now) for item in generate_learning(size)]
+
+
+@benchmark("search.calculate_relevance", "SearchService._calculate_relevance")
+def _calculate_relevance(size: int):
+    from app.services.search_service import search_service
+    pairs = [(row["title"], row["content"]) for row in _news_rows(size)]
+    calculate = search_service._calculate_relevance
+
+    def run():
+        for title, content in pairs:
+            calculate(KEYWORD, title, content)
+    return run, len(pairs)
+
+
+@benchmark("search.generate_snippet", "SearchService._generate_snippet")
+def _generate_snippet(size: int):
+    from app.services.search_service import search_service
+    contents = [row["content"] for row in _news_rows(size)]
+    generate = search_service._generate_snippet
+
+    def run():
+        for content in contents:
+            generate(KEYWORD, content)
+    return run, len(contents)
+
+
+@benchmark("news.to_items", "NewsService.get_all 中构造 NewsItem 的循环")
+def _news_to_items(size: int):
+    from app.models.db.news import News
+    from app.services.news_service import news_service
+    items = [News(**row) for row in _news_rows(size)]
+
+    def run():
+        [news_service._to_item(item) for item in items]
+    return run, len(items)
+
+
+@benchmark("learning.to_items", "LearningService.get_all 中构造 LearningItem 的循环")
+def _learning_to_items(size: int):
+    from app.models.learning import Learning
+    from app.services.learning_service import learning_service
+    items = [Learning(**row) for row in _learning_rows(size)]
+
+    def run():
+        [learning_service._to_item(item) for item in items]
+    return run, len(items)
+
+
+@benchmark("models.news_tags_list", "News.tags_list 解码")
+def _news_tags_list(size: int):
+    from app.models.db.news import News
+    items = [News(**row) for row in _news_rows(size)]
+
+    def run():
+        for item in items:
+            item.tags_list
+    return run, len(items)
+
+
+@benchmark("models.learning_lists", "Learning.tags_list 和 related_items_list 解码")
+def _learning_lists(size: int):
+    from app.models.learning import Learning
+    items = [Learning(**row) for row in _learning_rows(size)]
+
+    def run():
+        for item in items:
+            item.tags_list
+            item.related_items_list
+    return run, len(items)
+
+
+@benchmark("data_service.search", "DataService.search 关键词搜索")
+def _data_service_search(size: int):
+    from app.core.config import settings
+    from app.models.news import NewsItem
+    from app.services.data_service import DataService
+    from app.services.news import _adapt_news
+    from benchmarks.datagen import write_json
+
+    directory = tempfile.mkdtemp(prefix="micro-")
+    write_json(Path(directory) / "news_data.json", generate_news(size))
+    data_dir = settings.DATA_DIR
+    settings.DATA_DIR = Path(directory)
+    try:
+        service = DataService("news_data.json", NewsItem, adapter=_adapt_news, index_fields=("category",))
+    finally:
+        settings.DATA_DIR = data_dir
+        # 数据已加载到内存，临时文件不再需要
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def run():
+        service.search(KEYWORD)
+    return run, len(service)
+
+
+def time_function(function: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    统计计时
+
+    Args:
+        function: 被测函数
+        repeat: 重复轮数
+        min_time: 每轮最短耗时（秒）
+
+    Returns:
+        每次调用耗时（微秒）的统计
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    # 与 timeit.Timer.autorange 相同的做法，但以 min_time 为目标
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed * 1.1)) if elapsed > 0 else number * 10
+    samples = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat, number)]
+    return {"loops": number, "samples_us": samples, **{f"{key}_us": value for key, value in describe(samples).items()}}
+
+
+def measure_memory(function: Callable[[], Any]) -> Dict[str, int]:
+    """
+    用 tracemalloc 测量一次调用的内存分配
+
+    Returns:
+        调用期间的分配峰值和调用结束后仍保留的字节数
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - before, "retained_bytes": max(0, after - before)}
+
+
+def run_benchmarks(
+    names: List[str],
+    size: int = 1000,
+    repeat: int = 7,
+    min_time: float = 0.2,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    运行基准测试
+
+    Args:
+        names: 基准测试名
+        size: 输入数据项数
+        repeat: 重复轮数
+        min_time: 每轮最短耗时（秒）
+        memory: 是否测量内存分配
+
+    Returns:
+        测试报告
+    """
+    results = {}
+    for name in names:
+        function, items = BENCHMARKS[name][1](size)
+        function()  # 预热
+        result = time_function(function, repeat, min_time)
+        result["items"] = items
+        result["per_item_us"] = result["median_us"] / items if items else None
+        if memory:
+            result.update(measure_memory(function))
+        results[name] = result
+    return {
+        "meta": {
+            "size": size,
+            "repeat": repeat,
+            "min_time": min_time,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float = 5.0) -> Dict[str, Dict[str, Any]]:
+    """
+    与基线比较中位数
+
+    变化幅度超过阈值且超出两次测量的置信区间之和时才认为有显著差异。
+
+    Returns:
+        基准测试名 -> {"change_pct": ..., "status": "faster" | "slower" | "same"}
+    """
+    result = {}
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        delta = current["median_us"] - previous["median_us"]
+        change = delta / previous["median_us"] * 100
+        noise = current["ci95_us"] + previous["ci95_us"]
+        status = "same"
+        if abs(change) > threshold_pct and abs(delta) > noise:
+            status = "slower" if delta > 0 else "faster"
+        result[name] = {"change_pct": round(change, 1), "status": status}
+        if "peak_bytes" in current and "peak_bytes" in previous:
+            result[name]["peak_bytes_change"] = current["peak_bytes"] - previous["peak_bytes"]
+    return result
+
+
+def _format_time(us: float) -> str:
+    if us >= 1e6:
+        return f"{us / 1e6:.3f} s"
+    if us >= 1e3:
+        return f"{us / 1e3:.3f} ms"
+    return f"{us:.3f} µs"
+
+
+def _format_bytes(value: int) -> str:
+    return f"{value / 1024:.1f} KiB" if value < 1024 * 1024 else f"{value / 1024 / 1024:.2f} MiB"
+
+
+def to_text(report: Dict[str, Any], comparison: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """生成文本报告"""
+    lines = [f"数据规模 {report['meta']['size']}，每项 {report['meta']['repeat']} 轮"]
+    for name, result in report["results"].items():
+        line = (
+            f"{name:<30} {_format_time(result['median_us']):>12} ± {_format_time(result['ci95_us']):<11}"
+            f" 每项 {_format_time(result['per_item_us'] or 0):>11}"
+        )
+        if "peak_bytes" in result:
+            line += f"  峰值 {_format_bytes(result['peak_bytes']):>10}"
+        if comparison and name in comparison:
+            change = comparison[name]
+            line += f"  {change['change_pct']:+.1f}% ({change['status']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="服务层热点函数的微基准测试")
+    parser.add_argument("--filter", type=str, default=None, help="只运行名称包含该字符串的基准测试")
+    parser.add_argument("--list", action="store_true", help="列出所有基准测试")
+    parser.add_argument("--size", type=int, default=1000, help="输入数据项数")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮最短耗时（秒）")
+    parser.add_argument("--no-memory", action="store_true", help="不测量内存分配")
+    parser.add_argument("--output", type=Path, default=None, help="保存报告（JSON），可作为以后的基线")
+    parser.add_argument("--baseline", type=Path, default=None, help="基线报告（JSON）")
+    parser.add_argument("--max-regression", type=float, default=None, help="允许的最大变慢幅度（%%），超过时返回非零退出码")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (description, _) in BENCHMARKS.items():
+            print(f"{name:<30} {description}")
+        return
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    report = run_benchmarks(names, args.size, args.repeat, args.min_time, memory=not args.no_memory)
+
+    comparison = None
+    if args.baseline:
+        threshold = args.max_regression if args.max_regression is not None else 5.0
+        comparison = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), threshold)
+        report["comparison"] = comparison
+
+    print(to_text(report, comparison))
+    if args.output:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if comparison is not None and args.max_regression is not None:
+        slower = [name for name, change in comparison.items() if change["status"] == "slower"]
+        if slower:
+            print(f"性能回退: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+推送扇出负载测试
+
+保持大量空闲订阅连接，然后发布新闻通知，统计从发布到每个订阅者收到消息的延迟。
+
+用法:
+    python -m benchmarks.push_fanout --mode inproc --connections 10000
+    python -m benchmarks.push_fanout --mode sse --connections 10000 --messages 5
+
+inproc 模式直接订阅进程内消息代理，只测量代理本身的扇出开销；
+sse 模式在本机启动 uvicorn，通过真实的TCP连接订阅 /api/push/news/sse，
+服务端与客户端运行在同一事件循环中，延迟中包含客户端解析的开销。
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+from typing import List
+
+from app.services.push_service import news_broker
+from benchmarks.stats import summarize
+
+
+def _raise_fd_limit(needed: int) -> None:
+    """尽量提高文件描述符上限，sse模式下每个连接占用两个描述符"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(hard, max(soft, needed))
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    if target < needed:
+        print(f"警告: 文件描述符上限 {target} 小于所需的 {needed}，连接可能失败")
+
+
+def _event(index: int) -> dict:
+    return {
+        "type": "news",
+        "id": f"bench-{index}",
+        "title": "基准测试新闻",
+        "category": None,
+        "source": None,
+        "publishDate": None,
+        "sentAt": time.perf_counter(),
+    }
+
+
+async def _inproc_subscriber(results: List[float], messages: int) -> None:
+    subscription = news_broker.subscribe()
+    try:
+        for _ in range(messages):
+            event = await subscription.get()
+            if event is None:
+                return
+            results.append(time.perf_counter() - event["sentAt"])
+    finally:
+        subscription.close()
+
+
+async def _sse_subscriber(port: int, results: List[float], messages: int, connected: List[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 16)
+    writer.write(
+        b"GET /api/push/news/sse HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n"
+    )
+    await writer.drain()
+    try:
+        # 跳过响应头和首个retry指令
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        connected[0] += 1
+        received = 0
+        while received < messages:
+            line = await reader.readline()
+            if not line:
+                return
+            # 分块编码时数据行前后夹有长度行，只关心data行
+            if line.startswith(b"data: "):
+                event = json.loads(line[len(b"data: "):])
+                if "sentAt" in event:
+                    results.append(time.perf_counter() - event["sentAt"])
+                    received += 1
+    finally:
+        writer.close()
+
+
+async def _wait_for_subscribers(count: int, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while news_broker.subscriber_count < count:
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"仅建立了 {news_broker.subscriber_count}/{count} 个订阅")
+        await asyncio.sleep(0.05)
+
+
+async def run(mode: str, connections: int, messages: int, interval: float, port: int) -> dict:
+    """执行负载测试并返回统计结果"""
+    news_broker.buffer_size = max(news_broker.buffer_size, messages + 1)
+    per_message: List[List[float]] = [[] for _ in range(messages)]
+    results: List[float] = []
+    server = None
+    server_task = None
+
+    start = time.perf_counter()
+    if mode == "inproc":
+        tasks = [asyncio.create_task(_inproc_subscriber(results, messages)) for _ in range(connections)]
+    else:
+        import uvicorn
+        from fastapi import FastAPI
+        from app.api.push import router as push_router
+
+        app = FastAPI()
+        app.include_router(push_router, prefix="/api/push")
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        connected = [0]
+        tasks = []
+        # 分批建立连接，避免瞬间占满监听队列
+        for offset in range(0, connections, 500):
+            for _ in range(min(500, connections - offset)):
+                tasks.append(asyncio.create_task(_sse_subscriber(port, results, messages, connected)))
+            await asyncio.sleep(0.05)
+    await _wait_for_subscribers(connections, timeout=120)
+    connect_seconds = time.perf_counter() - start
+
+    fanout_seconds = []
+    for index in range(messages):
+        before = len(results)
+        publish_start = time.perf_counter()
+        news_broker.publish(_event(index))
+        # 等待本条消息送达所有订阅者
+        while len(results) - before < connections and news_broker.subscriber_count:
+            await asyncio.sleep(0.001)
+            if time.perf_counter() - publish_start > 60:
+                break
+        fanout_seconds.append(time.perf_counter() - publish_start)
+        per_message[index] = results[before:]
+        await asyncio.sleep(interval)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if server is not None:
+        server.should_exit = True
+        await server_task
+
+    return {
+        "mode": mode,
+        "connections": connections,
+        "messages": messages,
+        "connect_seconds": round(connect_seconds, 3),
+        "dropped_subscribers": news_broker.dropped_count,
+        "fanout_complete_ms": [round(value * 1000, 3) for value in fanout_seconds],
+        "delivery_latency": summarize(results),
+        "per_message": [summarize(values) for values in per_message],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="推送扇出负载测试")
+    parser.add_argument("--mode", choices=["inproc", "sse"], default="inproc")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.5, help="两条消息之间的间隔（秒）")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    if args.mode == "sse":
+        _raise_fd_limit(args.connections * 2 + 256)
+
+    result = asyncio.run(run(args.mode, args.connections, args.messages, args.interval, args.port))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+SQLite 读写并发基准测试
+
+在临时数据库中预先写入新闻，然后同时运行:
+
+    读取者  反复查询最新新闻列表和按ID查询详情（列表、详情接口的查询）
+    写入者  持续分批插入新闻并提交（模拟雪球新闻采集）
+
+比较两种配置下的读吞吐量、读延迟和写入量:
+
+    default  默认日志模式和 PRAGMA，读写共用 aiosqlite 默认的连接方式（每次检出新建连接）
+    tuned    app.core.database 的配置：WAL 和 PRAGMA、只读连接池、单写入者队列
+
+用法:
+    python -m benchmarks.sqlite_concurrency --duration 10 --readers 16
+    python -m benchmarks.sqlite_concurrency --profiles tuned --writers 2 --output result.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base, WriteQueue, apply_sqlite_pragmas, pool_options, sqlite_pragmas
+from app.models.db.news import News
+from app.utils.bulk_import import BulkImporter
+from benchmarks.datagen import generate_news
+from benchmarks.stats import summarize
+
+PROFILES = ("default", "tuned")
+
+
+def _prepare(path: Path, rows: int) -> List[str]:
+    """创建数据库并写入示例新闻，返回新闻ID"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        BulkImporter(db).import_records("news", generate_news(rows))
+        ids = list(db.execute(select(News.id)).scalars())
+    engine.dispose()
+    return ids
+
+
+def _engines(profile: str, url: str, readers: int):
+    """按配置创建读引擎和写队列"""
+    if profile == "default":
+        engine = create_async_engine(url)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        return [engine], factory, WriteQueue(factory, serialize=False)
+
+    read_engine = create_async_engine(url, **pool_options(url, readers, 0))
+    apply_sqlite_pragmas(read_engine.sync_engine, sqlite_pragmas(read_only=True))
+    write_engine = create_async_engine(url, **pool_options(url, 1, 0))
+    apply_sqlite_pragmas(write_engine.sync_engine, sqlite_pragmas())
+    read_factory = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    write_factory = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    return [read_engine, write_engine], read_factory, WriteQueue(write_factory, serialize=True)
+
+
+async def _run_profile(
+    profile: str, path: Path, ids: List[str], duration: float, readers: int, writers: int, batch: int,
+) -> Dict[str, Any]:
+    url = f"sqlite+aiosqlite:///{path}"
+    engines, read_factory, write_queue = _engines(profile, url, readers)
+    # 写入第一批，使 WAL 模式等持久设置在计时前生效
+    await write_queue.submit(lambda db: _insert(db, f"{profile}-warmup", batch))
+
+    read_latencies: List[float] = []
+    read_errors: List[str] = []
+    written = [0]
+    write_errors: List[str] = []
+    deadline = time.perf_counter() + duration
+
+    async def reader(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with read_factory() as db:
+                    if rng.random() < 0.5:
+                        query = select(News).order_by(desc(News.publish_date)).limit(20)
+                        (await db.execute(query)).scalars().all()
+                    else:
+                        (await db.execute(select(News).where(News.id == rng.choice(ids)))).scalar_one_or_none()
+            except Exception as e:
+                read_errors.append(type(e).__name__)
+                continue
+            read_latencies.append(time.perf_counter() - started)
+
+    async def writer(index: int):
+        sequence = 0
+        while time.perf_counter() < deadline:
+            sequence += 1
+            prefix = f"{profile}-{index}-{sequence}"
+            try:
+                written[0] += await write_queue.submit(lambda db: _insert(db, prefix, batch))
+            except Exception as e:
+                write_errors.append(type(e).__name__)
+            # 采集任务在两批之间还要请求外部接口，这里留出间隔
+            await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader(i) for i in range(readers)), *(writer(i) for i in range(writers)))
+    elapsed = time.perf_counter() - started
+    await write_queue.stop()
+    for engine in engines:
+        await engine.dispose()
+
+    return {
+        "profile": profile,
+        "readers": readers,
+        "writers": writers,
+        "reads": len(read_latencies),
+        "reads_per_second": round(len(read_latencies) / elapsed, 1),
+        "read_latency": summarize(read_latencies),
+        "read_errors": len(read_errors),
+        "rows_written": written[0],
+        "rows_per_second": round(written[0] / elapsed, 1),
+        "write_errors": len(write_errors),
+        "errors": sorted(set(read_errors + write_errors)),
+    }
+
+
+async def _insert(db: AsyncSession, prefix: str, batch: int) -> int:
+    for index in range(batch):
+        db.add(News(id=f"{prefix}-{index}", title=f"采集新闻 {prefix}-{index}", content="内容", source="雪球"))
+    return batch
+
+
+def run(
+    profiles=PROFILES, duration: float = 10, readers: int = 16, writers: int = 1, batch: int = 20, rows: int = 2000,
+) -> List[Dict[str, Any]]:
+    """依次运行各配置，每种配置使用一个新的数据库"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sqlite-bench-") as directory:
+        for profile in profiles:
+            path = Path(directory) / f"{profile}.db"
+            ids = _prepare(path, rows)
+            results.append(asyncio.run(_run_profile(profile, path, ids, duration, readers, writers, batch)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite 读写并发基准测试")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--duration", type=float, default=10.0, help="每种配置的运行时间（秒）")
+    parser.add_argument("--readers", type=int, default=16, help="并发读取者数")
+    parser.add_argument("--writers", type=int, default=1, help="并发写入者数")
+    parser.add_argument("--batch", type=int, default=20, help="每次提交写入的新闻数")
+    parser.add_argument("--rows", type=int, default=2000, help="预先写入的新闻数")
+    parser.add_argument("--output", type=str, default=None, help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    results = run(args.profiles, args.duration, args.readers, args.writers, args.batch, args.rows)
+    for result in results:
+        latency = result["read_latency"]
+        print(
+            f"{result['profile']:<8} 读 {result['reads_per_second']:>8.1f}/s  "
+            f"p50 {latency.get('p50_ms', 0):>7.2f}ms  p95 {latency.get('p95_ms', 0):>7.2f}ms  "
+            f"读错误 {result['read_errors']}  写入 {result['rows_per_second']:>7.1f} 行/s  写错误 {result['write_errors']}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+服务启动基准测试
+
+每次在新的 Python 进程中测量（模拟一个新的 uvicorn worker 冷启动）:
+
+    import_ms         导入 app.main 的耗时
+    startup_ms        执行应用启动事件的耗时
+    first_request_ms  第一个请求的耗时（包括首次请求时才导入的模块）
+    total_ms          三者之和，即进程开始到能够响应请求的时间
+
+重复多次后输出中位数和置信区间，并列出自身导入耗时最长的模块。
+可与保存的基线结果比较，或设定总耗时上限；超出时返回非零退出码，可直接用于CI。
+
+用法:
+    python -m benchmarks.startup --repeat 5
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --baseline startup.json --max-regression 20 --max-total-ms 5000
+
+工作进程使用临时的 SQLite 数据库，并关闭数据文件热加载和外部抓取任务。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stats import describe
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# 工作进程的日志也输出到标准输出，结果行加上前缀以便区分
+MESSAGE_PREFIX = "@@startup "
+METRICS = ("import_ms", "startup_ms", "first_request_ms", "total_ms")
+
+
+def worker(path: str) -> None:
+    """工作进程：导入应用、执行启动事件并发送第一个请求，报告各阶段耗时"""
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    import asyncio
+    import httpx
+
+    async def run() -> Dict[str, Any]:
+        await app.router.startup()
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(app=app, base_url="http://startup") as client:
+            response = await client.get(path)
+        done = time.perf_counter()
+        await app.router.shutdown()
+        return {
+            "import_ms": (imported - started) * 1000,
+            "startup_ms": (ready - imported) * 1000,
+            "first_request_ms": (done - ready) * 1000,
+            "total_ms": (done - started) * 1000,
+            "status": response.status_code,
+            "modules": len(sys.modules),
+        }
+
+    print(MESSAGE_PREFIX + json.dumps(asyncio.run(run())), flush=True)
+
+
+def _worker_env(directory: str) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "SQLITE_DB": str(Path(directory) / "startup.db"),
+        "DEBUG": "false",
+        "LOG_LEVEL": "WARNING",
+        "DATA_RELOAD_INTERVAL": "0",
+        "XUEQIU_API_ENABLED": "False",
+        "SINA_FETCH_ENABLED": "false",
+    }
+
+
+def measure_once(path: str, env: Dict[str, str]) -> Dict[str, Any]:
+    """在新进程中测量一次启动"""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--worker", "--path", path],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(MESSAGE_PREFIX):
+            return json.loads(line[len(MESSAGE_PREFIX):])
+    raise RuntimeError(f"工作进程异常退出，返回码 {result.returncode}:\n{result.stderr[-2000:]}")
+
+
+def slowest_imports(env: Dict[str, str], limit: int = 15) -> List[Dict[str, Any]]:
+    """用 -X importtime 导入 app.main，返回自身耗时最长的模块"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue  # 表头
+        modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    modules.sort(key=lambda module: module["self_ms"], reverse=True)
+    return modules[:limit]
+
+
+def run_benchmark(repeat: int = 5, path: str = "/api/status", imports: bool = True) -> Dict[str, Any]:
+    """
+    重复测量启动耗时
+
+    Args:
+        repeat: 测量次数，每次一个新进程
+        path: 第一个请求的路径
+        imports: 是否列出导入耗时最长的模块
+
+    Returns:
+        各次测量结果和每项指标的统计
+    """
+    with tempfile.TemporaryDirectory(prefix="startup-") as directory:
+        env = _worker_env(directory)
+        # 第一次运行会编译字节码，不计入结果
+        measure_once(path, env)
+        runs = [measure_once(path, env) for _ in range(repeat)]
+        report: Dict[str, Any] = {
+            "python": sys.version.split()[0],
+            "repeat": repeat,
+            "path": path,
+            "runs": runs,
+            "metrics": {
+                metric: {key: round(value, 2) for key, value in describe([run[metric] for run in runs]).items()}
+                for metric in METRICS
+            },
+        }
+        if imports:
+            report["slowest_imports"] = slowest_imports(env)
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """与基线比较各项指标的中位数，返回超过允许增幅的指标说明"""
+    regressions = []
+    for metric in METRICS:
+        current = report["metrics"][metric]["median"]
+        previous = baseline.get("metrics", {}).get(metric, {}).get("median")
+        if not previous:
+            continue
+        change = (current - previous) * 100 / previous
+        report["metrics"][metric]["change_pct"] = round(change, 1)
+        if change > max_regression:
+            regressions.append(f"{metric} 中位数 {previous:.1f}ms -> {current:.1f}ms (+{change:.1f}%)")
+    return regressions
+
+
+def to_text(report: Dict[str, Any]) -> str:
+    """输出文本报告"""
+    lines = [f"启动耗时（{report['repeat']} 次，第一个请求 {report['path']}）"]
+    for metric in METRICS:
+        stats = report["metrics"][metric]
+        change = f"  {stats['change_pct']:+.1f}%" if "change_pct" in stats else ""
+        lines.append(
+            f"  {metric:<18} 中位数 {stats['median']:>8.1f}ms  最小 {stats['min']:>8.1f}ms  ±{stats['ci95']:.1f}ms{change}"
+        )
+    if report.get("slowest_imports"):
+        lines.append("自身导入耗时最长的模块:")
+        for module in report["slowest_imports"]:
+            lines.append(f"  {module['self_ms']:>8.1f}ms  {module['module']}")
+    return "\n".join(lines)
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description="服务启动基准测试")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--path", type=str, default="/api/status", help="第一个请求的路径")
+    parser.add_argument("--output", type=str, default=None, help="将结果写入JSON文件")
+    parser.add_argument("--baseline", type=str, default=None, help="与之前保存的结果比较")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="与基线相比允许的中位数增幅（%%）")
+    parser.add_argument("--max-total-ms", type=float, default=None, help="total_ms 中位数上限")
+    parser.add_argument("--no-imports", action="store_true", help="不列出导入耗时最长的模块")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.path)
+        return None
+
+    report = run_benchmark(args.repeat, args.path, imports=not args.no_imports)
+    failures = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += compare(report, json.load(f), args.max_regression)
+    total = report["metrics"]["total_ms"]["median"]
+    if args.max_total_ms is not None and total > args.max_total_ms:
+        failures.append(f"total_ms 中位数 {total:.1f}ms 超过上限 {args.max_total_ms:.0f}ms")
+
+    print(to_text(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    for failure in failures:
+        print(f"启动耗时回退: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
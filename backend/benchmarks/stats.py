@@ -0,0 +1,49 @@
+"""基准测试共用的统计函数"""
+import math
+import statistics
+from typing import Dict, List
+
+# 双侧95%置信区间的 t 分布临界值，按自由度索引，超出范围时使用正态近似
+_T_95 = [0, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """汇总延迟分布，输入单位为秒，输出单位为毫秒"""
+    if not latencies:
+        return {"count": 0}
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.mean(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def describe(samples: List[float]) -> Dict[str, float]:
+    """
+    描述重复测量的样本，单位与输入相同
+
+    Returns:
+        均值、中位数、最小值、标准差和均值的95%置信区间半宽
+    """
+    n = len(samples)
+    stdev = statistics.stdev(samples) if n > 1 else 0.0
+    t = _T_95[n - 1] if 1 < n <= len(_T_95) else 1.96
+    return {
+        "mean": statistics.mean(samples),
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stdev": stdev,
+        "ci95": t * stdev / math.sqrt(n) if n > 1 else 0.0,
+    }
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+大文本列压缩基准测试
+
+为每种配置新建一个SQLite数据库，导入同一批生成的新闻、学习文章和问题后 VACUUM，
+比较数据库大小，然后在固定大小的SQLite页缓存下运行相同的读取负载:
+
+    列表  最新新闻分页（每页20条，包含正文）
+    详情  按ID随机读取新闻、学习文章和问题
+
+配置:
+
+    plain    不压缩
+    zlib     zlib 压缩，不使用字典
+    dict     zlib + 随代码发布的字典（app/core/dictionaries/text-1.zdict）
+    trained  zlib + 用另一批生成数据训练的字典，对应在自己的语料上重新训练字典的效果
+
+页缓存命中率 = 1 - 缺页数 / 页访问数。Python 的 sqlite3 模块取不到SQLite的缓存统计，
+缺页数按负载期间本进程从文件读取的字节数（/proc/self/io 的 rchar）除以页大小估算，
+页访问数用只有最小页缓存时运行同一负载的缺页数近似。不支持 /proc/self/io 的平台上为 None。
+
+用法:
+    python -m benchmarks.text_compression --scale 5000 --cache-kib 2048
+    python -m benchmarks.text_compression --profiles plain dict --output result.json
+"""
+import argparse
+import contextlib
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import LargeBinary, cast, create_engine, desc, event, func, select
+from sqlalchemy.orm import Session
+
+from app.core import compression
+from app.core.config import settings
+from app.core.database import Base
+from app.models.db.learning import Learning
+from app.models.db.news import News
+from app.models.db.questions import Question
+from app.utils.bulk_import import BulkImporter
+from benchmarks.datagen import generate_learning, generate_news, generate_questions
+from benchmarks.stats import summarize
+
+PROFILES = ("plain", "zlib", "dict", "trained")
+
+# trained 配置的字典在运行时注册，使用发布的字典不会用到的编号
+TRAINED_DICTIONARY_ID = 255
+
+# 最小页缓存（页），用于估算页访问数
+MIN_CACHE_PAGES = 10
+
+# 详情读取在三类内容间的分配
+DETAIL_MODELS = (News, Learning, Question)
+
+
+def _read_bytes() -> Optional[int]:
+    """本进程通过系统调用读取的字节数"""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+@contextlib.contextmanager
+def _profile_settings(profile: str) -> Iterator[None]:
+    """临时切换压缩配置"""
+    saved = settings.TEXT_COMPRESSION_ENABLED, settings.TEXT_COMPRESSION_DICTIONARY
+    settings.TEXT_COMPRESSION_ENABLED = profile != "plain"
+    settings.TEXT_COMPRESSION_DICTIONARY = {"zlib": 0, "dict": 1, "trained": TRAINED_DICTIONARY_ID}.get(profile, 0)
+    try:
+        yield
+    finally:
+        settings.TEXT_COMPRESSION_ENABLED, settings.TEXT_COMPRESSION_DICTIONARY = saved
+
+
+def _train(scale: int, seed: int) -> int:
+    """用与测试数据不同种子生成的语料训练字典，返回字典大小"""
+    samples = [item["content"] for item in generate_news(scale, seed)]
+    samples += [item["fullContent"] for item in generate_learning(max(1, scale // 5), seed)]
+    samples += [item["fullAnswer"] for item in generate_questions(max(1, scale // 2), seed)]
+    dictionary = compression.train_dictionary(samples)
+    compression.register_dictionary(TRAINED_DICTIONARY_ID, dictionary)
+    return len(dictionary)
+
+
+def _prepare(path: Path, profile: str, scale: int, seed: int) -> Dict[str, Any]:
+    """创建数据库、导入数据并 VACUUM，返回存储统计"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with _profile_settings(profile), Session(engine) as db:
+        importer = BulkImporter(db)
+        importer.import_records("news", generate_news(scale, seed))
+        importer.import_records("learning", generate_learning(max(1, scale // 5), seed))
+        importer.import_records("questions", generate_questions(max(1, scale // 2), seed))
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        pages = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        stored = 0
+        compressed = 0
+        for table_name, columns in compression.COMPRESSED_COLUMNS.items():
+            table = Base.metadata.tables[table_name]
+            for name in columns:
+                # length() 对 TEXT 返回字符数，转换为 BLOB 后统一按字节计
+                stored += conn.execute(select(func.coalesce(func.sum(func.length(cast(table.c[name], LargeBinary))), 0))).scalar()
+                compressed += conn.execute(select(func.count()).where(func.typeof(table.c[name]) == "blob")).scalar()
+    engine.dispose()
+    return {
+        "file_bytes": path.stat().st_size,
+        "page_size": page_size,
+        "pages": pages,
+        "text_bytes": stored,
+        "compressed_values": compressed,
+    }
+
+
+def _workload(path: Path, cache_pages: int, requests: int, seed: int) -> Dict[str, Any]:
+    """在指定页缓存大小下运行读取负载，返回延迟和读取的字节数"""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # 关闭 mmap，使所有页都经过SQLite页缓存和 read 系统调用
+        cursor.execute("PRAGMA mmap_size=0")
+        cursor.execute(f"PRAGMA cache_size={cache_pages}")
+        cursor.close()
+
+    rng = random.Random(seed)
+    latencies: Dict[str, List[float]] = {"list": [], "detail": []}
+    with Session(engine) as db:
+        ids = {model: list(db.execute(select(model.id)).scalars()) for model in DETAIL_MODELS}
+        db.expunge_all()
+        before = _read_bytes()
+        for _ in range(requests):
+            started = time.perf_counter()
+            if rng.random() < 0.3:
+                kind = "list"
+                offset = 20 * min(int(rng.expovariate(0.5)), len(ids[News]) // 20)
+                db.execute(select(News).order_by(desc(News.publish_date)).offset(offset).limit(20)).scalars().all()
+            else:
+                kind = "detail"
+                model = rng.choice(DETAIL_MODELS)
+                db.execute(select(model).where(model.id == rng.choice(ids[model]))).scalar_one()
+            latencies[kind].append(time.perf_counter() - started)
+            # 每次请求使用新的对象，与接口每个请求一个会话一致
+            db.expunge_all()
+        after = _read_bytes()
+    engine.dispose()
+    return {
+        "latency": {kind: summarize(values) for kind, values in latencies.items()},
+        "read_bytes": None if before is None or after is None else after - before,
+    }
+
+
+def run(
+    profiles=PROFILES, scale: int = 2000, requests: int = 2000, cache_kib: int = 2048, seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """依次运行各配置，每种配置使用一个新的数据库"""
+    results = []
+    dictionary_bytes = _train(scale, seed + 1) if "trained" in profiles else None
+    with tempfile.TemporaryDirectory(prefix="compression-bench-") as directory:
+        for profile in profiles:
+            path = Path(directory) / f"{profile}.db"
+            storage = _prepare(path, profile, scale, seed)
+            cache_pages = max(MIN_CACHE_PAGES, cache_kib * 1024 // storage["page_size"])
+            measured = _workload(path, cache_pages, requests, seed)
+            baseline = _workload(path, MIN_CACHE_PAGES, requests, seed)
+
+            hit_rate = None
+            if measured["read_bytes"] is not None and baseline["read_bytes"]:
+                hit_rate = round(max(0.0, 1 - measured["read_bytes"] / baseline["read_bytes"]), 4)
+            result = {
+                "profile": profile,
+                **storage,
+                "cache_pages": cache_pages,
+                "pages_read": None if measured["read_bytes"] is None else measured["read_bytes"] // storage["page_size"],
+                "page_cache_hit_rate": hit_rate,
+                "latency": measured["latency"],
+            }
+            if profile == "trained":
+                result["dictionary_bytes"] = dictionary_bytes
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="大文本列压缩基准测试")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--scale", type=int, default=2000, help="新闻数，学习文章和问题分别为其1/5和1/2")
+    parser.add_argument("--requests", type=int, default=2000, help="读取负载的请求数")
+    parser.add_argument("--cache-kib", type=int, default=2048, help="SQLite页缓存大小（KiB）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None, help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    results = run(args.profiles, args.scale, args.requests, args.cache_kib, args.seed)
+    for result in results:
+        hit_rate = result["page_cache_hit_rate"]
+        detail = result["latency"]["detail"]
+        print(
+            f"{result['profile']:<8} 文件 {result['file_bytes'] / 1024:>9.1f}KiB  页 {result['pages']:>6}  "
+            f"文本 {result['text_bytes'] / 1024:>9.1f}KiB  "
+            f"缓存命中率 {'-' if hit_rate is None else f'{hit_rate:.1%}':>6}  "
+            f"详情 p50 {detail.get('p50_ms', 0):>6.3f}ms  p95 {detail.get('p95_ms', 0):>6.3f}ms  "
+            f"列表 p50 {result['latency']['list'].get('p50_ms', 0):>6.3f}ms"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,31 @@
 #!/usr/bin/env python
 """
 数据库迁移脚本
-用法: python migrate.py
+用法:
+    python migrate.py                创建缺少的表并导入数据文件
+    python migrate.py --schema-only  只创建缺少的表（部署时在启动服务前执行）
 """
 import sys
 import time
-from app.utils.db_migration import run_migration
+from app.utils.db_migration import init_db, run_migration
 from app.core.logging import logger
 
 if __name__ == "__main__":
+    schema_only = "--schema-only" in sys.argv[1:]
     try:
-        logger.info("开始数据迁移...")
+        logger.info("开始创建表结构..." if schema_only else "开始数据迁移...")
         start_time = time.time()
-        
+
         # 执行数据迁移
-        run_migration()
-        
+        if schema_only:
+            init_db()
+        else:
+            run_migration()
+
         elapsed = time.time() - start_time
         logger.info(f"数据迁移完成，耗时 {elapsed:.2f} 秒")
     except Exception as e:
         logger.error(f"数据迁移失败: {e}")
         sys.exit(1)
-    
-    sys.exit(0) 
\ No newline at end of file
+
+    sys.exit(0)
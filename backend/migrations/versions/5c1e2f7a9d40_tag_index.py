@@ -0,0 +1,62 @@
+"""tag index
+
+Revision ID: 5c1e2f7a9d40
+Revises: bb97a79e1756
+Create Date: 2026-10-19 10:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.db.tags import TAGGED_TABLES, decode_tags, index_item_tags
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2f7a9d40'
+down_revision: Union[str, None] = 'bb97a79e1756'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 回填时每次写入的内容数
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    # 用 create_all 建表（migrate.py --schema-only）的数据库已经有这两张表
+    if 'tags' not in existing:
+        op.create_table(
+            'tags',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.UniqueConstraint('name'),
+            sqlite_autoincrement=True,
+        )
+    if 'item_tags' not in existing:
+        op.create_table(
+            'item_tags',
+            sa.Column('tag_id', sa.Integer(), sa.ForeignKey('tags.id'), nullable=False),
+            sa.Column('entity_type', sa.String(length=20), nullable=False),
+            sa.Column('item_id', sa.String(length=36), nullable=False),
+            sa.PrimaryKeyConstraint('tag_id', 'entity_type', 'item_id'),
+        )
+        op.create_index('ix_item_tags_item', 'item_tags', ['entity_type', 'item_id'])
+
+    # 从内容表的JSON标签列回填索引，已有的索引表中可能已经有部分内容的记录，先删除再写入
+    for table_name in TAGGED_TABLES:
+        if table_name not in existing:
+            continue
+        table = sa.table(table_name, sa.column('id', sa.String), sa.column('tags', sa.Text))
+        rows = bind.execute(sa.select(table.c.id, table.c.tags)).all()
+        for start in range(0, len(rows), BACKFILL_BATCH):
+            batch = {item_id: decode_tags(tags) for item_id, tags in rows[start:start + BACKFILL_BATCH]}
+            index_item_tags(bind, table_name, batch, replace='item_tags' in existing)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_tags_item', table_name='item_tags')
+    op.drop_table('item_tags')
+    op.drop_table('tags')
@@ -0,0 +1,68 @@
+"""list query indexes
+
+Revision ID: 8d3b6a41f0c2
+Revises: 5c1e2f7a9d40
+Create Date: 2026-10-19 14:40:05.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6a41f0c2'
+down_revision: Union[str, None] = '5c1e2f7a9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 表名 -> [(索引名, 列)]，与 app/models/db 中模型的 __table_args__ 一致
+INDEXES = {
+    'news': [
+        ('ix_news_category_publish_date', ['category', 'publish_date', 'id']),
+        ('ix_news_publish_date', ['publish_date']),
+    ],
+    'learning': [
+        ('ix_learning_difficulty_id', ['difficulty', 'id']),
+        ('ix_learning_updated_at', ['updated_at']),
+    ],
+    'questions': [
+        ('ix_questions_category_id', ['category', 'id']),
+        ('ix_questions_view_count', ['view_count']),
+    ],
+}
+
+
+def _existing_indexes(table_name: str) -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for table_name, indexes in INDEXES.items():
+        if table_name not in tables:
+            continue
+        # 通过 create_all 建表的数据库上索引可能已经存在
+        existing = _existing_indexes(table_name)
+        for name, columns in indexes:
+            if name not in existing:
+                op.create_index(name, table_name, columns)
+
+    # 标签关联索引加上 tag_id，使按实体类型统计标签时不必回表
+    op.drop_index('ix_item_tags_item', table_name='item_tags')
+    op.create_index('ix_item_tags_item', 'item_tags', ['entity_type', 'item_id', 'tag_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_tags_item', table_name='item_tags')
+    op.create_index('ix_item_tags_item', 'item_tags', ['entity_type', 'item_id'])
+
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for table_name, indexes in INDEXES.items():
+        if table_name not in tables:
+            continue
+        existing = _existing_indexes(table_name)
+        for name, _ in indexes:
+            if name in existing:
+                op.drop_index(name, table_name=table_name)
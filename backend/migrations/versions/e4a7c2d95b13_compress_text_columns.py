@@ -0,0 +1,44 @@
+"""compress text columns
+
+Revision ID: e4a7c2d95b13
+Revises: 8d3b6a41f0c2
+Create Date: 2026-10-19 16:22:48.310574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.compression import COMPRESSED_COLUMNS, convert_rows
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d95b13'
+down_revision: Union[str, None] = '8d3b6a41f0c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _convert(compress: bool) -> None:
+    bind = op.get_bind()
+    # 只有SQLite上压缩存储，列的声明类型不变，无需修改表结构
+    if bind.dialect.name != 'sqlite':
+        return
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    for table_name, columns in COMPRESSED_COLUMNS.items():
+        if table_name not in existing:
+            continue
+        table_columns = {column['name'] for column in inspector.get_columns(table_name)}
+        convert_rows(bind, table_name, [name for name in columns if name in table_columns], compress=compress)
+
+
+def upgrade() -> None:
+    # 不随 TEXT_COMPRESSION_ENABLED 变化：关闭压缩只影响新写入的值，已压缩的值照常解压读取。
+    # 已有数据转换后需要执行 VACUUM 才能缩小数据库文件
+    _convert(compress=True)
+
+
+def downgrade() -> None:
+    _convert(compress=False)
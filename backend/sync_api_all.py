@@ -12,12 +12,14 @@ import json
 import datetime
 from typing import List, Optional
 
+from app.core.compression import decompress_text
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.core.logging import logger
 from app.models.learning import LearningItem, LearningList
 from app.models.news import NewsItem, NewsList
 from app.models.questions import QuestionItem, QuestionList
+from app.services.view_counter import view_counter
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -35,6 +37,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup_event():
+    """启动问题浏览量定期写入任务"""
+    view_counter.start(AsyncSessionLocal)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭前写入缓冲中剩余的问题浏览量"""
+    await view_counter.stop(AsyncSessionLocal)
+
 # API状态端点
 @app.get("/api/status")
 def check_api_status():
@@ -92,7 +104,7 @@ def get_learning_item(item_id: str, db: Session = Depends(get_db)):
             id=row[0],
             title=row[1],
             shortDescription=row[2],
-            content=row[3],
+            content=decompress_text(row[3]),
             difficulty=row[4],
             tags=json.loads(row[5]) if row[5] else [],
             relatedItems=json.loads(row[6]) if row[6] else []
@@ -121,7 +133,7 @@ def get_news_items(db: Session = Depends(get_db)):
                 summary=row[2],
                 source=row[3],
                 publishDate=str(row[4]),
-                content=row[5],
+                content=decompress_text(row[5]),
                 imageUrl=row[6],
                 categories=json.loads(row[7]) if row[7] else [],
                 url=row[8] if row[8] else ""
@@ -152,7 +164,7 @@ def get_news_item(item_id: str, db: Session = Depends(get_db)):
             summary=row[2],
             source=row[3],
             publishDate=str(row[4]),
-            content=row[5],
+            content=decompress_text(row[5]),
             imageUrl=row[6],
             categories=json.loads(row[7]) if row[7] else [],
             url=row[8] if row[8] else ""
@@ -178,7 +190,7 @@ def get_questions(db: Session = Depends(get_db)):
             item = QuestionItem(
                 id=row[0],
                 question=row[1],
-                answer=row[2],
+                answer=decompress_text(row[2]),
                 difficulty=row[3],
                 categories=json.loads(row[4]) if row[4] else [],
                 tags=json.loads(row[5]) if row[5] else [],
@@ -200,10 +212,6 @@ def get_question(item_id: str, db: Session = Depends(get_db)):
     获取特定问题
     """
     try:
-        # 更新浏览次数
-        db.execute(text("UPDATE questions SET view_count = view_count + 1 WHERE id = :id"), {"id": item_id})
-        db.commit()
-        
         # 获取问题
         result = db.execute(text("SELECT id, question, answer, difficulty, categories, tags, related_questions, view_count, created_at, updated_at FROM questions WHERE id = :id"), 
                             {"id": item_id})
@@ -212,15 +220,18 @@ def get_question(item_id: str, db: Session = Depends(get_db)):
         if not row:
             raise HTTPException(status_code=404, detail=f"找不到ID为{item_id}的问题")
         
+        # 浏览次数先在内存中累加，由后台任务批量写入数据库
+        view_counter.increment(item_id)
+        
         return QuestionItem(
             id=row[0],
             question=row[1],
-            answer=row[2],
+            answer=decompress_text(row[2]),
             difficulty=row[3],
             categories=json.loads(row[4]) if row[4] else [],
             tags=json.loads(row[5]) if row[5] else [],
             relatedQuestions=json.loads(row[6]) if row[6] else [],
-            viewCount=row[7],
+            viewCount=row[7] + view_counter.pending(item_id),
             createdAt=str(row[8]) if row[8] else None,
             updatedAt=str(row[9]) if row[9] else None
         )
@@ -5,7 +5,9 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.core.database import Base, get_async_db
+from app.core.database import (
+    Base, get_async_db, get_async_read_db, get_async_session_factory, get_async_read_session_factory,
+)
 from sqlalchemy.pool import StaticPool
 
 # Create a test-specific in-memory database
@@ -33,6 +35,9 @@ async def override_get_async_db():
 
 # Override the dependency for tests
 app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
+app.dependency_overrides[get_async_session_factory] = lambda: TestAsyncSessionLocal
+app.dependency_overrides[get_async_read_session_factory] = lambda: TestAsyncSessionLocal
 
 # Setup test database
 @pytest_asyncio.fixture(scope="function")
@@ -51,4 +56,9 @@ async def async_client():
     
     # Clean up database after tests
     async with test_async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all) 
\ No newline at end of file
+        await conn.run_sync(Base.metadata.drop_all) 
+
+# Session factory bound to the test database, for tests that seed data directly
+@pytest.fixture
+def session_factory():
+    return TestAsyncSessionLocal
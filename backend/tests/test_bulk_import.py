@@ -0,0 +1,71 @@
+import json
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import table_versions
+from app.core.database import Base
+from app.models.db import ChangeLog, News
+from app.models.questions import Question
+from app.services.news_service import news_service
+from app.services.questions_service import questions_service
+from app.utils.bulk_import import BulkImporter
+
+@pytest.fixture
+def sync_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+def _write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(record, ensure_ascii=False) for record in records), encoding="utf-8")
+
+# Test records are inserted in chunks and existing ids are skipped
+def test_import_news_in_chunks(sync_session, tmp_path):
+    path = tmp_path / "news.jsonl"
+    _write_jsonl(path, [
+        {"id": f"n{i}", "title": f"新闻{i}", "summary": "摘要", "content": "内容", "source": "来源",
+         "date": "2024-01-02", "category": "宏观经济", "tags": ["利率"]}
+        for i in range(25)
+    ] + [{"id": "bad", "summary": "缺少标题"}])
+    
+    progress = []
+    version = table_versions.get("news")
+    importer = BulkImporter(sync_session, chunk_size=10, progress=lambda stats: progress.append(stats.read))
+    stats = importer.import_file("news", path)
+    assert (stats.read, stats.inserted, stats.skipped, stats.invalid) == (26, 25, 0, 1)
+    assert progress == [10, 20, 26]
+    assert table_versions.get("news") > version
+    
+    news = sync_session.get(News, "n3")
+    item = news_service._to_item(news)
+    assert item.title == "新闻3"
+    assert item.category == "宏观经济"
+    assert item.tags == ["利率"]
+    assert item.publishDate.startswith("2024-01-02")
+    
+    # 每条新记录都写入了变更日志
+    logged = sync_session.scalar(select(func.count()).select_from(ChangeLog).where(ChangeLog.entity_type == "news"))
+    assert logged == 25
+    
+    # 再次导入时全部跳过
+    stats = importer.import_file("news", path)
+    assert (stats.inserted, stats.skipped) == (0, 25)
+
+# Test the JSON data file format is mapped to the questions table
+def test_import_questions_json(sync_session, tmp_path):
+    path = tmp_path / "questions.json"
+    path.write_text(json.dumps([
+        {"id": "q1", "question": "什么是股票？", "fullAnswer": "股票代表所有权", "category": "投资基础",
+         "tags": ["股票"], "relatedQuestions": ["q2"]},
+        {"id": "q1", "question": "重复的ID", "fullAnswer": "只保留最后一条"},
+    ], ensure_ascii=False), encoding="utf-8")
+    
+    stats = BulkImporter(sync_session).import_file("questions", path)
+    assert (stats.inserted, stats.skipped) == (1, 1)
+    
+    item = questions_service._to_item(sync_session.get(Question, "q1"))
+    assert item.question == "重复的ID"
+    assert item.answer == "只保留最后一条"
@@ -0,0 +1,52 @@
+import pytest
+
+from app.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+
+SECTIONS = {
+    "news": [
+        {"id": "news-2", "title": "央行下调利率", "tags": ["央行", "利率"], "imageUrl": None},
+        {"id": "news-1", "title": "ETF规模创新高", "tags": [], "imageUrl": "https://example.com/1.jpg"},
+    ],
+    "questions": [
+        {"id": f"q{i:03d}", "question": f"问题{i}", "viewCount": i, "categories": ["基础"]}
+        for i in range(50)
+    ],
+    "learning": [],
+}
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "catalog.snap"
+    write_snapshot(path, SECTIONS, source="test")
+    return path
+
+# Test records decode back to the original values
+def test_round_trip(snapshot_path):
+    with CatalogSnapshot.open(snapshot_path) as catalog:
+        assert catalog.directory["source"] == "test"
+        for name, items in SECTIONS.items():
+            assert [record.to_dict() for record in catalog[name]] == items
+        assert len(catalog["learning"]) == 0
+
+# Test lookups by id use the sorted index
+def test_get_by_id(snapshot_path):
+    with CatalogSnapshot.open(snapshot_path) as catalog:
+        news = catalog["news"].get_by_id("news-2")
+        assert news["title"] == "央行下调利率"
+        assert news["tags"] == ["央行", "利率"]
+        assert news["imageUrl"] is None
+        assert news.get("missing", "default") == "default"
+        with pytest.raises(KeyError):
+            news["missing"]
+        
+        for i in range(50):
+            assert catalog["questions"].get_by_id(f"q{i:03d}")["viewCount"] == i
+        assert catalog["questions"].get_by_id("q999") is None
+        assert catalog["learning"].get_by_id("learn-001") is None
+
+# Test other files are rejected
+def test_invalid_file(tmp_path):
+    path = tmp_path / "catalog.snap"
+    path.write_bytes(b"not a snapshot file")
+    with pytest.raises(ValueError):
+        CatalogSnapshot.open(path)
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from sqlalchemy.orm import Session
+
+from app.core.coalescing import SingleFlight, CoalescingMiddleware, coalesce, coalescing_stats
+from app.services.news_service import news_service
+
+# Test concurrent identical calls share one execution
+@pytest.mark.asyncio
+async def test_single_flight_shares_result():
+    flight = SingleFlight("test-shared")
+    executions = 0
+    
+    async def compute():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+    
+    results = await asyncio.gather(*[flight.do("key", compute) for _ in range(10)])
+    assert executions == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["coalesced"] == 9
+    assert flight.stats()["inflight"] == 0
+    
+    # 计算结束后的调用重新执行
+    await flight.do("key", compute)
+    assert executions == 2
+
+# Test errors are shared by all waiting callers
+@pytest.mark.asyncio
+async def test_single_flight_shares_error():
+    flight = SingleFlight("test-error")
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+# Test followers recompute when the leading call is cancelled
+@pytest.mark.asyncio
+async def test_single_flight_leader_cancelled():
+    flight = SingleFlight("test-cancel")
+    
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+    
+    leader = asyncio.create_task(flight.do("key", compute))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "done"
+
+# Test the decorator ignores session arguments when building keys
+@pytest.mark.asyncio
+async def test_coalesce_decorator():
+    calls = []
+    
+    class Service:
+        @coalesce(name="test-decorator")
+        async def get(self, item_id, db=None):
+            calls.append(item_id)
+            await asyncio.sleep(0.02)
+            return item_id
+    
+    service = Service()
+    # 不同请求的会话对象不同，但不影响合并
+    results = await asyncio.gather(service.get("a", db=Session()), service.get("a", db=Session()), service.get("b"))
+    assert results == ["a", "a", "b"]
+    assert sorted(calls) == ["a", "b"]
+    assert "test-decorator" in coalescing_stats()
+    assert hasattr(news_service.get_all, "single_flight")
+
+# Test middleware replays one response to concurrent identical GET requests
+@pytest.mark.asyncio
+async def test_coalescing_middleware():
+    executions = 0
+    
+    async def app(scope, receive, send):
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"ok": true}'})
+    
+    middleware = CoalescingMiddleware(app, paths=["/api/news"])
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        responses = await asyncio.gather(*[client.get("/api/news") for _ in range(5)])
+        assert all(response.json() == {"ok": True} for response in responses)
+        assert executions == 1
+        assert middleware.flight.stats()["coalesced"] == 4
+        
+        # 查询参数不同的请求不合并，未配置的路径直接透传
+        await asyncio.gather(client.get("/api/news?category=a"), client.get("/api/news?category=b"))
+        assert executions == 3
+        await asyncio.gather(client.get("/api/learning"), client.get("/api/learning"))
+        assert executions == 5
+        # 前缀只按路径段匹配
+        await asyncio.gather(client.get("/api/newsletter"), client.get("/api/newsletter"))
+        assert executions == 7
+        await asyncio.gather(client.get("/api/news/n1"), client.get("/api/news/n1"))
+        assert executions == 8
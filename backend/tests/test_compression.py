@@ -0,0 +1,89 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.core.compression import compress_text, decompress_text, register_dictionary, train_dictionary
+from app.core.config import settings
+from app.core.database import Base
+from benchmarks.datagen import generate_learning, generate_questions
+from benchmarks.startup import BACKEND_DIR
+from benchmarks.text_compression import run
+
+LONG_CONTENT = "## 市盈率\n\n市盈率是股价除以每股收益，用来衡量估值高低。" * 20 + "独特关键词在压缩内容末尾"
+
+# Test values round-trip, short values stay plain and a trained dictionary compresses better
+def test_compress_round_trip_and_dictionary():
+    assert compress_text("短文本") == "短文本"
+    assert decompress_text("短文本") == "短文本" and decompress_text(None) is None
+
+    samples = [item["fullContent"] for item in generate_learning(100, seed=1)]
+    register_dictionary(200, train_dictionary(samples))
+    document = next(generate_learning(1, seed=2))["fullContent"]
+    plain = compress_text(document, dictionary_id=0)
+    trained = compress_text(document, dictionary_id=200)
+    assert isinstance(trained, bytes) and len(trained) < len(plain) < len(document.encode("utf-8"))
+    assert decompress_text(plain) == decompress_text(trained) == document
+
+# Test the API stores long content compressed and still serves and searches it as text
+@pytest.mark.asyncio
+async def test_api_reads_and_searches_compressed_content(async_client: AsyncClient, session_factory):
+    response = await async_client.post("/api/learning", json={
+        "title": "估值指标", "shortDescription": "摘要", "content": LONG_CONTENT, "difficulty": "入门", "tags": [],
+    })
+    assert response.status_code == 201
+    item_id = response.json()["id"]
+
+    async with session_factory() as db:
+        stored = (await db.execute(text("SELECT typeof(content) FROM learning WHERE id = :id"), {"id": item_id})).scalar()
+    assert stored == "blob"
+
+    assert (await async_client.get(f"/api/learning/{item_id}")).json()["content"] == LONG_CONTENT
+    data = (await async_client.get("/api/learning/search/独特关键词")).json()
+    assert [item["id"] for item in data["items"]] == [item_id]
+    assert data["items"][0]["content"] is None
+
+# Test the migration compresses existing plain rows whatever the setting and the downgrade restores them
+@pytest.mark.parametrize("enabled", [True, False])
+def test_compression_migration(tmp_path, monkeypatch, enabled):
+    monkeypatch.setattr(settings, "TEXT_COMPRESSION_ENABLED", enabled)
+    path = tmp_path / "compress.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    answers = {item["id"]: item["fullAnswer"] for item in generate_questions(20)}
+    with engine.begin() as conn:
+        # 模拟压缩之前写入的明文数据
+        for item_id, answer in answers.items():
+            conn.execute(
+                text(
+                    "INSERT INTO questions (id, title, question, content, answer, difficulty, categories, tags, view_count,"
+                    " answer_count, created_at, updated_at) VALUES (:id, '问题', '问题', :a, :a, '基础', '[]', '[]', 0, 0,"
+                    " CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+                ),
+                {"id": item_id, "a": answer},
+            )
+
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.stamp(config, "8d3b6a41f0c2")
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        types = conn.execute(text("SELECT DISTINCT typeof(answer) FROM questions WHERE length(CAST(answer AS BLOB)) >= 256")).scalars().all()
+    assert types == ["blob"]
+
+    command.downgrade(config, "8d3b6a41f0c2")
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT id, answer FROM questions")).all())
+    assert rows == answers
+    engine.dispose()
+
+# Test the benchmark reports storage and page-cache figures for each profile
+def test_compression_benchmark():
+    results = run(profiles=("plain", "dict"), scale=100, requests=50, cache_kib=64)
+    plain, compressed = results
+    assert plain["compressed_values"] == 0 and compressed["compressed_values"] > 0
+    assert compressed["text_bytes"] < plain["text_bytes"]
+    assert compressed["pages"] <= plain["pages"]
+    assert compressed["latency"]["detail"]["count"] + compressed["latency"]["list"]["count"] == 50
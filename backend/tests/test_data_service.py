@@ -0,0 +1,270 @@
+import io
+import json
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.questions import QuestionItem
+from app.services.data_service import DataService, DataWatcher
+from app.services.questions import _adapt_question
+from app.utils.catalog_snapshot import default_snapshot_path, write_snapshot
+from app.utils.json_store import iter_json_array
+
+RAW_QUESTIONS = [
+    {"id": "q1", "question": "什么是股票？", "fullAnswer": "股票代表公司所有权", "category": "投资基础", "tags": ["股票"]},
+    {"id": "q2", "question": "如何分析ETF", "fullAnswer": "ETF跟踪指数", "category": "基金", "tags": [], "difficulty": "advanced"},
+    {"id": "q3", "question": "缺少答案字段的问题", "category": "基金", "tags": None},
+    {"id": "bad", "question": None},
+]
+
+@pytest.fixture
+def question_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    (tmp_path / "questions.json").write_text(json.dumps(RAW_QUESTIONS, ensure_ascii=False), encoding="utf-8")
+    return DataService(
+        "questions.json",
+        QuestionItem,
+        adapter=_adapt_question,
+        index_fields=("categories", "difficulty"),
+        sort_key=lambda item: item.id,
+        reverse=True,
+    )
+
+# Test items are validated once and indexed by id
+def test_load_and_get_by_id(question_store):
+    # 无效的数据项在加载时被跳过
+    assert len(question_store) == 3
+    assert [item.id for item in question_store.get_all()] == ["q3", "q2", "q1"]
+    
+    item = question_store.get_by_id("q1")
+    assert isinstance(item, QuestionItem)
+    assert item.answer == "股票代表公司所有权"
+    assert item.categories == ["投资基础"]
+    # 重复读取返回同一个实例，而不是重新构造
+    assert question_store.get_by_id("q1") is item
+    assert question_store.get_by_id("missing") is None
+
+# Test shared items cannot be modified
+def test_items_are_immutable(question_store):
+    with pytest.raises(ValidationError):
+        question_store.get_by_id("q1").answer = "changed"
+
+# Test secondary indexes keep the stored order
+def test_filter_by(question_store):
+    assert [item.id for item in question_store.filter_by("categories", "基金")] == ["q3", "q2"]
+    assert [item.id for item in question_store.filter_by("difficulty", "advanced")] == ["q2"]
+    assert question_store.filter_by("categories", "不存在") == []
+    with pytest.raises(KeyError):
+        question_store.filter_by("tags", "股票")
+
+# Test search matches string fields case-insensitively
+def test_search(question_store):
+    assert [item.id for item in question_store.search("etf")] == ["q2"]
+    assert [item.id for item in question_store.search("股票")] == ["q1"]
+    assert question_store.search("不存在的关键词") == []
+
+# Test saving rebuilds the indexes
+def test_save_data(question_store):
+    items = question_store.get_all()
+    updated = items[0].model_copy(update={"question": "新的问题"})
+    assert question_store.save_data([updated] + items[1:])
+    assert question_store.get_by_id("q3").question == "新的问题"
+    assert [item.id for item in question_store.search("新的问题")] == ["q3"]
+    
+    reloaded = DataService("questions.json", QuestionItem, adapter=_adapt_question)
+    assert reloaded.get_by_id("q3").question == "新的问题"
+
+# Test changed files are reloaded and swapped in atomically
+@pytest.mark.asyncio
+async def test_reload(question_store, tmp_path):
+    previous = question_store.get_all()
+    assert not await question_store.reload()
+    
+    data_file = tmp_path / "questions.json"
+    data_file.write_text(json.dumps(RAW_QUESTIONS[:1], ensure_ascii=False), encoding="utf-8")
+    assert await question_store.reload()
+    assert [item.id for item in question_store.get_all()] == ["q1"]
+    assert question_store.get_by_id("q2") is None
+    assert question_store.stats()["reloads"] == 1
+    # 之前取得的结果不受影响
+    assert len(previous) == 3
+    
+    # 写入损坏的文件时保留旧数据
+    data_file.write_text("[{\"id\": ", encoding="utf-8")
+    assert not await question_store.reload()
+    assert [item.id for item in question_store.get_all()] == ["q1"]
+
+# Test the watcher reloads every changed data service
+@pytest.mark.asyncio
+async def test_data_watcher_check(question_store, tmp_path):
+    watcher = DataWatcher(interval=0)
+    assert await watcher.check() == 0
+    (tmp_path / "questions.json").write_text(json.dumps(RAW_QUESTIONS[1:2], ensure_ascii=False), encoding="utf-8")
+    assert await watcher.check() == 1
+    assert [item.id for item in question_store.get_all()] == ["q2"]
+
+def _reopen():
+    return DataService("questions.json", QuestionItem, adapter=_adapt_question, index_fields=("categories",))
+
+# Test single-item writes only append to the change log
+def test_save_and_delete_item(question_store, tmp_path):
+    data_file = tmp_path / "questions.json"
+    original = data_file.read_text(encoding="utf-8")
+    
+    item = question_store.get_by_id("q1").model_copy(update={"question": "更新后的问题", "categories": ["基金"]})
+    assert question_store.save_item(item)
+    new_item = item.model_copy(update={"id": "q9", "question": "新增的问题"})
+    assert question_store.save_item(new_item)
+    assert question_store.delete_item("q2")
+    assert not question_store.delete_item("q2")
+    
+    # JSON文件保持不变，变更只写入日志
+    assert data_file.read_text(encoding="utf-8") == original
+    assert len((tmp_path / "questions.log.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+    
+    assert [entry.id for entry in question_store.get_all()] == ["q9", "q3", "q1"]
+    assert [entry.id for entry in question_store.filter_by("categories", "基金")] == ["q9", "q3", "q1"]
+    assert [entry.id for entry in question_store.search("更新后")] == ["q1"]
+    
+    # 重新加载时在JSON文件的基础上重放日志
+    reloaded = _reopen()
+    assert reloaded.get_by_id("q1").question == "更新后的问题"
+    assert reloaded.get_by_id("q9").question == "新增的问题"
+    assert reloaded.get_by_id("q2") is None
+
+# Test a partially written log line is ignored on load
+def test_truncated_log_line(question_store, tmp_path):
+    item = question_store.get_by_id("q1").model_copy(update={"question": "已写入"})
+    assert question_store.save_item(item)
+    with open(tmp_path / "questions.log.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"op":"delete","id":"q')
+    
+    reloaded = _reopen()
+    assert len(reloaded) == 3
+    assert reloaded.get_by_id("q1").question == "已写入"
+
+def _wait_compaction(store):
+    thread = store._compaction
+    if thread is not None:
+        thread.join()
+
+# Test the change log is compacted into the JSON file
+def test_compaction(question_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_LOG_COMPACT_THRESHOLD", 2)
+    log_file = tmp_path / "questions.log.jsonl"
+    
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"question": "第一次"}))
+    assert log_file.exists()
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"question": "第二次"}))
+    _wait_compaction(question_store)
+    assert not log_file.exists()
+    assert question_store.stats()["log_entries"] == 0
+    
+    data = {item["id"]: item for item in json.loads((tmp_path / "questions.json").read_text(encoding="utf-8"))}
+    assert data["q1"]["question"] == "第二次"
+    # 没有修改过的数据项保留文件中的原始字段，无效的数据项也原样保留
+    assert data["q2"] == RAW_QUESTIONS[1] and data["bad"] == RAW_QUESTIONS[3]
+    assert _reopen().get_by_id("q1").question == "第二次"
+    # 没有留下临时文件
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["questions.json"]
+
+# Test saves during a background compaction go to the new log and are kept
+def test_background_compaction(question_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_LOG_COMPACT_THRESHOLD", 2)
+    compacted_records = question_store._compacted_records
+
+    def records(overrides):
+        # 写入JSON文件期间保存另一个数据项
+        assert question_store.save_item(question_store.get_by_id("q2").model_copy(update={"question": "合并期间"}))
+        yield from compacted_records(overrides)
+
+    monkeypatch.setattr(question_store, "_compacted_records", records)
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"question": "第一次"}))
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"question": "第二次"}))
+    _wait_compaction(question_store)
+
+    data = {item["id"]: item for item in json.loads((tmp_path / "questions.json").read_text(encoding="utf-8"))}
+    assert data["q1"]["question"] == "第二次" and data["q2"] == RAW_QUESTIONS[1]
+    assert len((tmp_path / "questions.log.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+    assert not (tmp_path / "questions.log.compacting.jsonl").exists()
+    assert question_store.stats()["log_entries"] == 1
+    reloaded = _reopen()
+    assert reloaded.get_by_id("q1").question == "第二次" and reloaded.get_by_id("q2").question == "合并期间"
+
+# Test edits build a new snapshot and leave the one readers hold untouched
+def test_edits_copy_on_write(question_store):
+    snapshot = question_store._snapshot
+    index = snapshot.indexes["categories"]["基金"]
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"categories": ["基金"]}))
+    assert question_store.delete_item("q2")
+    assert [item.id for item in snapshot.items] == ["q3", "q2", "q1"] and "q2" in snapshot.by_id
+    assert [item.id for item in index.items] == ["q3", "q2"]
+    assert [item.id for item in question_store.filter_by("categories", "基金")] == ["q3", "q1"]
+
+# Test in-place updates keep the same order and indexes as a full reload
+def test_in_place_updates_match_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    raw = [
+        {"id": f"q{i}", "question": f"问题{i % 4}", "fullAnswer": "回答", "category": ["股票", "基金", "债券"][i % 3]}
+        for i in range(12)
+    ]
+    (tmp_path / "questions.json").write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+    # 按问题排序，问题相同的数据项保持文件中的顺序
+    open_store = lambda: DataService(
+        "questions.json", QuestionItem, adapter=_adapt_question, index_fields=("categories",),
+        sort_key=lambda item: item.question, reverse=True,
+    )
+    store = open_store()
+    store.save_item(store.get_by_id("q5").model_copy(update={"question": "问题9", "categories": ["股票"]}))
+    store.save_item(store.get_by_id("q2").model_copy(update={"answer": "新的回答"}))
+    store.save_item(store.get_by_id("q0").model_copy(update={"id": "q20", "question": "问题1"}))
+    store.delete_item("q7")
+
+    reloaded = open_store()
+    ids = lambda items: [item.id for item in items]
+    assert ids(store.get_all()) == ids(reloaded.get_all())
+    assert ids(store.get_all())[:2] == ["q5", "q3"]
+    for category in ("股票", "基金", "债券"):
+        assert ids(store.filter_by("categories", category)) == ids(reloaded.filter_by("categories", category))
+    assert ids(store.search("新的回答")) == ["q2"]
+
+# Test a snapshot built from the current JSON file is loaded, and other snapshots are ignored
+def test_load_from_catalog_snapshot(question_store, tmp_path):
+    items = [item.model_dump() for item in question_store.get_all()]
+    files = {"questions": question_store.data_file_info()}
+    write_snapshot(default_snapshot_path(), {"questions": items}, source="json", files=files)
+    assert question_store.save_item(question_store.get_by_id("q1").model_copy(update={"question": "快照之后的修改"}))
+
+    open_store = lambda: DataService(
+        "questions.json", QuestionItem, adapter=_adapt_question, index_fields=("categories", "difficulty"),
+        sort_key=lambda item: item.id, reverse=True, snapshot_section="questions",
+    )
+    store = open_store()
+    assert store.stats()["source"] == "snapshot"
+    assert store.get_all() == question_store.get_all()
+    assert store.get_by_id("q1").question == "快照之后的修改"
+    assert [item.id for item in store.filter_by("categories", "基金")] == ["q3", "q2"]
+    assert [item.id for item in store.search("ETF")] == ["q2"]
+
+    # 由数据库生成的快照不替代JSON文件
+    write_snapshot(default_snapshot_path(), {"questions": items[:1]}, source="db", files=files)
+    assert open_store().stats()["source"] == "json"
+
+    # JSON文件变化后从JSON文件加载
+    write_snapshot(default_snapshot_path(), {"questions": items}, source="json", files=files)
+    data_file = tmp_path / "questions.json"
+    data_file.write_text(json.dumps(RAW_QUESTIONS[1:2], ensure_ascii=False), encoding="utf-8")
+    store = open_store()
+    assert store.stats()["source"] == "json"
+    assert [item.id for item in store.get_all()] == ["q2", "q1"]
+
+# Test the streaming parser across chunk boundaries
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_iter_json_array(chunk_size):
+    data = RAW_QUESTIONS + [1, 2.5, -1e10, "a]b", [1, [2]], None, True]
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+    
+    for bad in ("[1,,2]", "[1 2]", "[1,2", "[1,]", "{}"):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(bad), chunk_size))
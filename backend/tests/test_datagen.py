@@ -0,0 +1,37 @@
+from benchmarks.datagen import generate_learning, generate_news, generate_questions, parse_scale
+from app.services.news import _adapt_news
+from app.services.questions import _adapt_question
+from app.models.news import NewsItem
+from app.models.questions import QuestionItem
+
+# Test scale strings are parsed
+def test_parse_scale():
+    assert parse_scale("10k") == 10_000
+    assert parse_scale("1M") == 1_000_000
+    assert parse_scale("2500") == 2500
+
+# Test the same seed always produces the same corpus
+def test_deterministic():
+    assert list(generate_news(50, seed=7)) == list(generate_news(50, seed=7))
+    assert list(generate_news(50, seed=7)) != list(generate_news(50, seed=8))
+    assert list(generate_questions(20, seed=7)) == list(generate_questions(20, seed=7))
+    assert list(generate_learning(10, seed=7)) == list(generate_learning(10, seed=7))
+
+# Test generated items are valid and ids are unique
+def test_items_are_valid():
+    news = list(generate_news(300))
+    assert len({item["id"] for item in news}) == 300
+    assert any(item["id"].startswith("xueqiu-") for item in news)
+    for item in news[:20]:
+        NewsItem(**_adapt_news(item))
+    
+    questions = list(generate_questions(200))
+    ids = {item["id"] for item in questions}
+    for item in questions:
+        QuestionItem(**_adapt_question(item))
+        assert item["relatedQuestions"]
+        assert set(item["relatedQuestions"]) <= ids - {item["id"]}
+    
+    learning = list(generate_learning(30))
+    learning_ids = {item["id"] for item in learning}
+    assert all(set(item["nextSteps"]) <= learning_ids for item in learning)
@@ -0,0 +1,78 @@
+import shutil
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+import app.core.database as database
+from app.core.database import Base, EngineRegistry, get_async_read_db
+from app.models.db.news import News
+
+def _create_db(path, title):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(News(id="n1", title=title, content="内容"))
+        session.commit()
+    engine.dispose()
+
+async def _read_title():
+    dependency = get_async_read_db()
+    session = await dependency.__anext__()
+    try:
+        return (await session.execute(select(News.title).where(News.id == "n1"))).scalar_one()
+    finally:
+        await dependency.aclose()
+
+@pytest.fixture
+def databases(tmp_path):
+    _create_db(tmp_path / "primary.db", "主库")
+    _create_db(tmp_path / "replica.db", "副本")
+    return tmp_path
+
+@pytest_asyncio.fixture
+async def primary(databases):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{databases / 'primary.db'}")
+    yield engine
+    await engine.dispose()
+
+# Test reads go to the replica through a read-only session
+@pytest.mark.asyncio
+async def test_reads_use_replica(databases, primary, monkeypatch):
+    registry = EngineRegistry(primary, [f"sqlite+aiosqlite:///{databases / 'replica.db'}"])
+    monkeypatch.setattr(database, "engine_registry", registry)
+    try:
+        assert await _read_title() == "副本"
+        assert [target.name for target in registry.read_targets()] == ["replica-0", "primary"]
+
+        async with (await registry.read_session_factory())() as session:
+            session.add(News(id="n2", title="写入", content="内容"))
+            with pytest.raises(RuntimeError):
+                await session.commit()
+    finally:
+        await registry.stop()
+
+# Test an unreachable replica fails over to the primary, also for session factories, and recovers after a health check
+@pytest.mark.asyncio
+async def test_replica_failover_and_recovery(databases, primary, monkeypatch):
+    missing = databases / "offline" / "replica.db"
+    registry = EngineRegistry(primary, [f"sqlite+aiosqlite:///{missing}"], retry_seconds=60)
+    monkeypatch.setattr(database, "engine_registry", registry)
+    try:
+        assert await registry.read_session_factory() is registry.primary.session_factory
+        assert await _read_title() == "主库"
+        replica = registry.replicas[0]
+        assert not replica.healthy and replica.last_error
+        # 重试时间之前不再尝试该副本
+        assert registry.read_targets() == [registry.primary]
+
+        missing.parent.mkdir()
+        shutil.copy(databases / "replica.db", missing)
+        status = await registry.check_health()
+        assert [(item["name"], item["healthy"]) for item in status] == [("primary", True), ("replica-0", True)]
+        assert await _read_title() == "副本"
+        assert await registry.read_session_factory() is replica.session_factory
+    finally:
+        await registry.stop()
@@ -0,0 +1,94 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_async_read_db
+from app.main import app
+from app.services.facet_service import DIMENSIONS, FacetIndex, facet_service
+
+async def _create(client, title, difficulty, tags):
+    response = await client.post("/api/learning", json={
+        "title": title, "shortDescription": "摘要", "content": f"{title}的内容", "difficulty": difficulty, "tags": tags,
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+async def _learning_facets(client, **params):
+    response = await client.get("/api/facets", params={"type": "learning", **params})
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    return item["total"], {
+        dimension: {facet["value"]: facet["count"] for facet in facets} for dimension, facets in item["facets"].items()
+    }
+
+# Test the bitmap index counts, reuses slots and intersects with a result set
+def test_facet_index():
+    index = FacetIndex.build(DIMENSIONS["learning"], [
+        ("a", {"difficulty": "入门", "tags": '["股票", "基金"]'}),
+        ("b", {"difficulty": "入门", "tags": '["股票"]'}),
+        ("c", {"difficulty": "进阶", "tags": None}),
+    ])
+    assert index.counts("difficulty") == [("入门", 2), ("进阶", 1)]
+    assert index.counts("tag", index.mask(["b", "c", "missing"])) == [("股票", 1)]
+
+    index.remove("a")
+    index.put("d", {"difficulty": "进阶", "tags": '["基金"]'})
+    assert len(index) == 3
+    assert index.counts("difficulty") == [("进阶", 2), ("入门", 1)]
+    assert index.counts("tag") == [("基金", 1), ("股票", 1)]
+    assert index.select("tag", ["基金"]).bit_count() == 1
+
+# Test the facets endpoint follows creates, updates and deletes and narrows by search and tag
+@pytest.mark.asyncio
+async def test_facets_endpoint(async_client: AsyncClient):
+    facet_service.invalidate()
+    first = await _create(async_client, "股票入门", "入门", ["股票"])
+    assert await _learning_facets(async_client) == (1, {"difficulty": {"入门": 1}, "tag": {"股票": 1}})
+
+    # 索引已构建，之后的写入增量更新，不再重建
+    loaded_at = facet_service._loaded_at["learning"]
+    second = await _create(async_client, "基金入门", "入门", ["基金", "股票"])
+    await _create(async_client, "期权策略", "高级", ["期权"])
+    total, facets = await _learning_facets(async_client)
+    assert total == 3
+    assert facets == {"difficulty": {"入门": 2, "高级": 1}, "tag": {"股票": 2, "基金": 1, "期权": 1}}
+
+    await async_client.put(f"/api/learning/{second}", json={"difficulty": "进阶", "tags": ["基金"]})
+    await async_client.delete(f"/api/learning/{first}")
+    total, facets = await _learning_facets(async_client)
+    assert total == 2
+    assert facets == {"difficulty": {"进阶": 1, "高级": 1}, "tag": {"基金": 1, "期权": 1}}
+
+    assert await _learning_facets(async_client, q="基金") == (1, {"difficulty": {"进阶": 1}, "tag": {"基金": 1}})
+    assert (await _learning_facets(async_client, tag="期权"))[0] == 1
+    assert facet_service._loaded_at["learning"] == loaded_at
+
+    response = await async_client.get("/api/facets")
+    items = {item["type"]: item for item in response.json()["items"]}
+    assert set(items) == {"news", "learning", "questions"}
+    # 没有新闻时雪球分类仍作为筛选项返回
+    assert {"value": "股市", "count": 0} in items["news"]["facets"]["category"]
+
+# Test the index is rebuilt from the primary even when the read session is a lagging replica
+@pytest.mark.asyncio
+async def test_facets_rebuild_from_primary(async_client: AsyncClient):
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    replica_session = sessionmaker(bind=replica, class_=AsyncSession)
+
+    async def lagging_read_db():
+        async with replica_session() as session:
+            yield session
+
+    await _create(async_client, "股票入门", "入门", ["股票"])
+    facet_service.invalidate()
+    primary_read_db = app.dependency_overrides[get_async_read_db]
+    app.dependency_overrides[get_async_read_db] = lagging_read_db
+    try:
+        assert await _learning_facets(async_client) == (1, {"difficulty": {"入门": 1}, "tag": {"股票": 1}})
+    finally:
+        app.dependency_overrides[get_async_read_db] = primary_read_db
+        await replica.dispose()
@@ -0,0 +1,43 @@
+import pytest
+from httpx import AsyncClient
+
+# Test get home feed
+@pytest.mark.asyncio
+async def test_get_home_feed(async_client: AsyncClient):
+    response = await async_client.get("/api/home")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["news"], list)
+    assert isinstance(data["learning"], list)
+    assert isinstance(data["questions"], list)
+    assert "generatedAt" in data
+
+# Test home feed limit validation
+@pytest.mark.asyncio
+async def test_get_home_feed_invalid_limit(async_client: AsyncClient):
+    response = await async_client.get("/api/home?limit=0")
+    assert response.status_code == 422
+
+# Test home feed is served from cache until the underlying tables change
+@pytest.mark.asyncio
+async def test_home_feed_rebuilt_after_write(async_client: AsyncClient):
+    first = (await async_client.get("/api/home?limit=3")).json()
+    cached = (await async_client.get("/api/home?limit=3")).json()
+    assert cached["generatedAt"] == first["generatedAt"]
+    
+    new_item = {
+        "title": "首页缓存测试",
+        "shortDescription": "用于验证首页缓存失效",
+        "content": "首页缓存测试内容",
+        "difficulty": "入门",
+        "tags": ["测试"],
+        "relatedItems": []
+    }
+    create_response = await async_client.post("/api/learning", json=new_item)
+    assert create_response.status_code == 201
+    
+    rebuilt = (await async_client.get("/api/home?limit=3")).json()
+    assert rebuilt["generatedAt"] != first["generatedAt"]
+    assert create_response.json()["id"] in [item["id"] for item in rebuilt["learning"]]
+    # 首页学习板块不返回全文内容
+    assert all(item["content"] is None for item in rebuilt["learning"])
@@ -0,0 +1,39 @@
+import httpx
+import pytest
+
+from benchmarks.loadtest import SCENARIOS, compare, find_regressions, run_load, to_markdown
+from benchmarks.stats import percentile, summarize
+
+# Test percentile and latency summary
+def test_summarize():
+    assert percentile([3, 1, 2], 50) == 2
+    summary = summarize([0.001 * i for i in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(51, abs=1)
+    assert summary["p99_ms"] == pytest.approx(99, abs=1)
+    assert summarize([]) == {"count": 0}
+
+# Test comparison against a baseline flags latency and error regressions
+def test_compare_with_baseline():
+    def route(p95, rps, error_rate=0.0):
+        return {"p95_ms": p95, "throughput_rps": rps, "error_rate": error_rate}
+
+    baseline = {"routes": {"a": route(10, 100), "b": route(10, 100), "c": route(10, 100)}}
+    report = {"routes": {"a": route(11, 95), "b": route(15, 80), "c": route(9, 100, 0.01), "d": route(1, 1)}}
+    comparison = compare(report, baseline)
+    assert comparison["a"]["p95_change_pct"] == 10.0
+    assert comparison["b"]["throughput_change_pct"] == -20.0
+    assert "d" not in comparison
+    assert find_regressions(comparison, 20) == ["b", "c"]
+
+# Test a short run against the app produces a per-route report
+@pytest.mark.asyncio
+async def test_run_load(async_client: httpx.AsyncClient):
+    scenarios = {name: SCENARIOS[name] for name in ("news.list", "news.detail", "search")}
+    report = await run_load(async_client, scenarios, concurrency=4, duration=30, requests=40)
+    assert report["total"]["count"] == 40
+    assert set(report["routes"]) <= set(scenarios)
+    for route in report["routes"].values():
+        assert route["error_rate"] == 0
+        assert "p95_ms" in route and "slo_met" in route
+    assert "| news.list |" in to_markdown(report, compare(report, report))
@@ -0,0 +1,102 @@
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.logging import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    RequestIdMiddleware,
+    SamplingFilter,
+)
+
+def _record(name="app", level=logging.INFO, msg="消息 %s", args=(1,), lineno=10):
+    return logging.LogRecord(name, level, "/srv/app/module.py", lineno, msg, args, None)
+
+# Test LOG_LEVEL accepts level names in any case and rejects unknown ones
+def test_log_level_setting():
+    assert Settings(LOG_LEVEL="warning").LOG_LEVEL == "WARNING"
+    assert Settings(LOG_LEVEL="").LOG_LEVEL == ""
+    with pytest.raises(ValidationError):
+        Settings(LOG_LEVEL="verbose")
+
+# Test records are queued with merged arguments and request id, and rendered as one JSON line
+def test_queue_handler_and_json_formatter():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    record = _record()
+    record.user = "u1"
+    handler.handle(record)
+    handler.handle(_record())  # 队列已满时直接丢弃
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "消息 1" and queued.args is None
+    assert queued.request_id == "-"
+    assert handler.queue.empty()
+
+    try:
+        raise ValueError("出错了")
+    except ValueError:
+        queued.exc_info = sys.exc_info()
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["message"] == "消息 1"
+    assert entry["level"] == "INFO" and entry["logger"] == "app"
+    assert entry["user"] == "u1"
+    assert "request_id" not in entry
+    assert "ValueError: 出错了" in entry["exc"]
+
+# Test sampling applies per logger name prefix and never drops warnings
+def test_sampling_filter():
+    sampler = SamplingFilter({"app.hot": 0.25, "app.off": 0})
+    kept = sum(sampler.filter(_record("app.hot.child")) for _ in range(100))
+    assert kept == 25
+    assert all(sampler.filter(_record("app.hot", logging.WARNING)) for _ in range(10))
+    assert all(sampler.filter(_record("app.other")) for _ in range(10))
+    assert not any(sampler.filter(_record("app.off")) for _ in range(10))
+
+# Test the rate limit is per call site and reports suppressed records once tokens refill
+def test_rate_limit_filter():
+    limiter = RateLimitFilter(per_second=1e-9, burst=3)
+    passed = [limiter.filter(_record(msg=f"第{i}条", args=())) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.filter(_record(lineno=20))  # 其他调用位置不受影响
+    assert limiter.filter(_record(level=logging.ERROR))
+
+    limiter.per_second = 1e9
+    record = _record()
+    assert limiter.filter(record)
+    assert record.suppressed == 7
+
+# Test every request gets a request id that appears in its log records and response header
+@pytest.mark.asyncio
+async def test_request_id_middleware():
+    log = logging.getLogger("app.test_request_id")
+    handler = NonBlockingQueueHandler(queue.Queue())
+    log.addHandler(handler)
+
+    async def endpoint(scope, receive, send):
+        log.warning("处理请求 %s", scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"x-request-id", b"stale")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    try:
+        async with AsyncClient(app=RequestIdMiddleware(endpoint), base_url="http://test") as client:
+            generated = await client.get("/a")
+            forwarded = await client.get("/b", headers={"X-Request-ID": "abc-123"})
+            invalid = await client.get("/c", headers={"X-Request-ID": "bad id\n"})
+    finally:
+        log.removeHandler(handler)
+
+    assert generated.headers.get_list("x-request-id") == [generated.headers["x-request-id"]]
+    assert len(generated.headers["x-request-id"]) == 32
+    assert forwarded.headers["x-request-id"] == "abc-123"
+    assert invalid.headers["x-request-id"] not in ("bad id\n", "stale")
+
+    records = [handler.queue.get_nowait() for _ in range(3)]
+    assert [record.request_id for record in records] == [
+        generated.headers["x-request-id"], "abc-123", invalid.headers["x-request-id"],
+    ]
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor, loop_lag
+
+def _lag_observations() -> int:
+    return sum(sum(counts[:-1]) for counts in loop_lag.values().values())
+
+async def _blocking_step_for_monitor():
+    time.sleep(0.2)
+
+# Test a blocking coroutine step is recorded with the stack at the time it blocked
+@pytest.mark.asyncio
+async def test_detects_blocking_callback(caplog):
+    before = _lag_observations()
+    monitor = LoopMonitor(interval=0.02, threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="app"):
+            await asyncio.create_task(_blocking_step_for_monitor(), name="blocker")
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    blocked = [item for item in monitor.recent if "blocker" in item["callback"]]
+    assert blocked and blocked[0]["seconds"] >= 0.2
+    assert "_blocking_step_for_monitor" in blocked[0]["stack"]
+    assert "time.sleep" in blocked[0]["stack"] or "sleep(0.2)" in blocked[0]["stack"]
+    assert any("事件循环被阻塞" in record.getMessage() for record in caplog.records)
+    assert monitor.max_lag >= 0.1
+    assert _lag_observations() > before
+
+# Test the patched handle is restored and non-blocking work is not reported
+@pytest.mark.asyncio
+async def test_quiet_loop_and_restore():
+    original = asyncio.events.Handle._run
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    assert asyncio.events.Handle._run is not original
+    try:
+        for _ in range(20):
+            await asyncio.sleep(0.001)
+    finally:
+        await monitor.stop()
+    assert asyncio.events.Handle._run is original
+    assert not list(monitor.recent)
+    assert monitor.stats()["running"] is False
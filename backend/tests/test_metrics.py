@@ -0,0 +1,69 @@
+import re
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import MetricsRegistry
+
+def _sample(text: str, name: str, **labels) -> float:
+    """Find a sample value in Prometheus text output"""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    return 0.0
+
+# Test counters from many threads add up without locks
+def test_counter_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs", "jobs", ("kind",))
+
+    def work():
+        for _ in range(10000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.values() == {("a",): 80000}
+    assert 'jobs_total{kind="a"} 80000' in registry.render()
+
+# Test histogram buckets are cumulative with sum and count
+def test_histogram_render():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert _sample(text, "latency_seconds_bucket", le="0.1") == 1
+    assert _sample(text, "latency_seconds_bucket", le="1") == 3
+    assert _sample(text, "latency_seconds_bucket", le="+Inf") == 4
+    assert _sample(text, "latency_seconds_count") == 4
+    assert _sample(text, "latency_seconds_sum") == pytest.approx(6.05)
+
+# Test requests are recorded by route template and status
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client: AsyncClient):
+    before = (await async_client.get("/metrics")).text
+    labels = {"method": "GET", "route": "/api/news/{news_id}", "status": "404"}
+    for news_id in ("missing-1", "missing-2"):
+        await async_client.get(f"/api/news/{news_id}")
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert _sample(text, "http_requests_total", **labels) - _sample(before, "http_requests_total", **labels) == 2
+    assert "missing-1" not in text
+    assert _sample(text, "http_request_duration_seconds_count", method="GET", route="/api/news/{news_id}") >= 2
+    assert "# TYPE db_pool_checkouts_total counter" in text
+    assert "coalesce_calls_total" in text
+    assert "data_service_items" in text
+    assert "# TYPE xueqiu_fetch_runs_total counter" in text
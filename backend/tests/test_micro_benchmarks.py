@@ -0,0 +1,26 @@
+from benchmarks.micro import BENCHMARKS, compare, run_benchmarks, to_text
+
+# Test every registered microbenchmark runs and reports timing and memory
+def test_run_benchmarks():
+    report = run_benchmarks(list(BENCHMARKS), size=20, repeat=3, min_time=0.001)
+    assert set(report["results"]) == set(BENCHMARKS)
+    for result in report["results"].values():
+        assert result["items"] > 0
+        assert len(result["samples_us"]) == 3
+        assert result["min_us"] <= result["median_us"]
+        assert result["peak_bytes"] >= 0
+    assert "news.to_items" in to_text(report)
+
+# Test baseline comparison only flags changes beyond threshold and noise
+def test_compare_with_baseline():
+    def result(median, ci=1.0):
+        return {"median_us": median, "ci95_us": ci}
+
+    baseline = {"results": {"a": result(100), "b": result(100), "c": result(100, ci=30)}}
+    report = {"results": {"a": result(103), "b": result(150), "c": result(130, ci=30), "d": result(1)}}
+    comparison = compare(report, baseline, threshold_pct=5)
+    assert comparison["a"]["status"] == "same"
+    assert comparison["b"] == {"change_pct": 50.0, "status": "slower"}
+    assert comparison["c"]["status"] == "same"
+    assert "d" not in comparison
+    assert compare({"results": {"a": result(50)}}, baseline)["a"]["status"] == "faster"
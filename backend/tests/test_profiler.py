@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.profiler import StackSampler, route_profiles
+
+TOKEN = "test-admin-token"
+
+def _busy_loop_for_profiler(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    route_profiles.reset()
+    yield {"X-Admin-Token": TOKEN}
+    route_profiles.reset()
+
+# Test the sampler sees busy threads and produces collapsed stacks
+def test_stack_sampler():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop_for_profiler, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        profile = StackSampler(interval=0.002).run(0.3)
+    finally:
+        stop.set()
+        worker.join()
+    assert profile.samples > 10
+    collapsed = profile.to_collapsed()
+    line = next(line for line in collapsed.splitlines() if "_busy_loop_for_profiler" in line)
+    stack, count = line.rsplit(" ", 1)
+    assert stack.startswith("thread:busy-worker;")
+    assert int(count) > 0
+    assert profile.summary()["top"]
+
+# Test admin endpoints are hidden without a token and reject a wrong one
+@pytest.mark.asyncio
+async def test_admin_requires_token(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert (await async_client.get("/admin/profile", params={"seconds": 0.1})).status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    response = await async_client.get("/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+
+# Test the sampling endpoint returns a flamegraph-compatible file
+@pytest.mark.asyncio
+async def test_sample_profile_endpoint(async_client: AsyncClient, admin_token):
+    response = await async_client.get(
+        "/admin/profile", params={"seconds": 0.2, "interval_ms": 2, "idle": True}, headers=admin_token,
+    )
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    assert "thread:MainThread;" in response.text
+
+    response = await async_client.get("/admin/profile", params={"seconds": 0.1, "format": "json"}, headers=admin_token)
+    assert response.status_code == 200
+    assert response.json()["samples"] > 0
+
+# Test requests with the profile header are aggregated per route
+@pytest.mark.asyncio
+async def test_request_profiling(async_client: AsyncClient, admin_token):
+    headers = {**admin_token, "X-Profile": "1"}
+    for news_id in ("a", "b"):
+        await async_client.get(f"/api/news/{news_id}", headers=headers)
+    # 没有令牌的请求不做分析
+    await async_client.get("/api/news/c", headers={"X-Profile": "1"})
+
+    summary = (await async_client.get("/admin/profile/requests", headers=admin_token)).json()
+    assert {"route": "/api/news/{news_id}", "requests": 2} == {
+        key: value for key, value in summary[0].items() if key != "total_seconds"
+    }
+    response = await async_client.get(
+        "/admin/profile/requests/report", params={"route": "/api/news/{news_id}", "limit": 5}, headers=admin_token,
+    )
+    assert response.status_code == 200
+    assert "function calls" in response.text
+
+    assert (await async_client.delete("/admin/profile/requests", headers=admin_token)).status_code == 200
+    assert (await async_client.get("/admin/profile/requests", headers=admin_token)).json() == []
@@ -0,0 +1,54 @@
+import json
+import pytest
+
+from app.api.push import _sse_stream
+from app.services.push_service import NewsBroker, format_sse
+
+def _event(news_id: str) -> dict:
+    return {"type": "news", "id": news_id, "title": "测试新闻", "category": None, "source": None, "publishDate": None}
+
+# Test fan-out to all subscribers
+@pytest.mark.asyncio
+async def test_broker_fan_out():
+    broker = NewsBroker(buffer_size=4)
+    subscriptions = [broker.subscribe() for _ in range(3)]
+    assert broker.publish(_event("n1")) == 3
+    for subscription in subscriptions:
+        event = await subscription.get(timeout=1)
+        assert event["id"] == "n1"
+    subscriptions[0].close()
+    assert broker.subscriber_count == 2
+
+# Test slow subscribers are dropped once their buffer is full
+@pytest.mark.asyncio
+async def test_broker_drops_slow_subscriber():
+    broker = NewsBroker(buffer_size=2)
+    slow = broker.subscribe()
+    fast = broker.subscribe()
+    for i in range(3):
+        broker.publish(_event(f"n{i}"))
+        await fast.get(timeout=1)
+    assert slow.dropped is True
+    assert broker.subscriber_count == 1
+    assert broker.dropped_count == 1
+    # 被丢弃的订阅者收到结束标记
+    assert await slow.get(timeout=1) is None
+
+# Test SSE stream formatting
+@pytest.mark.asyncio
+async def test_sse_stream():
+    broker = NewsBroker(buffer_size=4)
+    subscription = broker.subscribe()
+    stream = _sse_stream(subscription)
+    assert (await stream.__anext__()).startswith("retry:")
+    
+    broker.publish(_event("n1"))
+    message = await stream.__anext__()
+    assert message == format_sse(_event("n1"))
+    lines = message.strip().split("\n")
+    assert lines[0] == "id: n1"
+    assert lines[1] == "event: news"
+    assert json.loads(lines[2][len("data: "):])["id"] == "n1"
+    
+    await stream.aclose()
+    assert broker.subscriber_count == 0
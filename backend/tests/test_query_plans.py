@@ -0,0 +1,125 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.db import News
+from app.models.learning import Learning
+from app.models.questions import Question
+from app.services.facet_service import FacetService
+from app.services.learning_service import learning_service
+from app.services.news_service import news_service
+from app.services.questions_service import questions_service
+from app.services.search_service import search_service
+from app.services.tag_service import tag_service
+from benchmarks.startup import BACKEND_DIR
+
+# EXPLAIN QUERY PLAN 中不使用任何索引的全表扫描，如 "SCAN news"
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+@pytest_asyncio.fixture
+async def plan_db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    now = datetime.now()
+    async with factory() as db:
+        for i in range(20):
+            db.add(News(id=f"n{i}", title=f"新闻{i}", summary="摘要", source="来源", content="内容", category=["股市", "宏观"][i % 2],
+                        publish_date=now - timedelta(hours=i), tags=f'["标签{i % 3}", "财经"]'))
+            db.add(Learning(id=f"l{i}", title=f"学习{i}", short_description="摘要", content="内容",
+                            difficulty=["入门", "进阶"][i % 2], tags=f'["标签{i % 3}"]'))
+            db.add(Question(id=f"q{i}", question=f"问题{i}", answer="回答", difficulty="基础", categories='["股票"]',
+                            tags=f'["标签{i % 3}"]', title=f"问题{i}", content="回答", category=["股票", "基金"][i % 2]))
+        await db.commit()
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    yield factory, engine, statements
+    await engine.dispose()
+
+async def _full_scans(engine, statements):
+    """对记录的语句执行 EXPLAIN QUERY PLAN，返回被全表扫描的表"""
+    scanned = set()
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in plan.all():
+                match = FULL_SCAN.match(row[-1])
+                if match:
+                    scanned.add(match.group(1))
+    return scanned
+
+# 每个服务查询允许全表扫描的表；只有不加筛选返回全部内容和 LIKE 模糊搜索才允许
+CASES = [
+    ("news.get_all", lambda db: news_service.get_all(db=db), set()),
+    ("news.get_all category", lambda db: news_service.get_all(db=db, category="股市"), set()),
+    ("news.get_all tag", lambda db: news_service.get_all(db=db, tags=["标签1"]), set()),
+    ("news.get_all category+tags", lambda db: news_service.get_all(db=db, category="股市", tags=["标签1", "财经"]), set()),
+    ("news.get_latest", lambda db: news_service.get_latest(db, 5), set()),
+    ("news.get_by_id", lambda db: news_service.get_by_id("n1", db=db), set()),
+    ("news.search", lambda db: news_service.search("新闻", db=db), {"news"}),
+    ("learning.get_all", lambda db: learning_service.get_all(db=db), {"learning"}),
+    ("learning.get_all difficulty", lambda db: learning_service.get_all(db=db, difficulty="入门"), set()),
+    ("learning.get_all tag", lambda db: learning_service.get_all(db=db, tags=["标签2"]), set()),
+    ("learning.get_recommended", lambda db: learning_service.get_recommended(db, 5), set()),
+    ("learning.get_by_id", lambda db: learning_service.get_by_id("l1", db=db), set()),
+    ("questions.get_all", lambda db: questions_service.get_all(db=db), {"questions"}),
+    ("questions.get_all category", lambda db: questions_service.get_all(db=db, category="基金"), set()),
+    ("questions.get_all tag", lambda db: questions_service.get_all(db=db, tags=["标签0"]), set()),
+    ("questions.get_popular", lambda db: questions_service.get_popular(db, 5), set()),
+    ("questions.get_by_ids", lambda db: questions_service.get_by_ids(["q1", "q2"], db=db), set()),
+    ("tag facets", lambda db: tag_service.facets(db, "news"), set()),
+    ("search ids", lambda db: search_service.matching_ids("questions", "问题", db), {"questions"}),
+    ("facet index load", lambda db: FacetService().load(db, "learning"), {"learning"}),
+]
+
+# Test every service query uses an index unless a full scan is expected for it
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name,query,allowed", CASES, ids=[case[0] for case in CASES])
+async def test_query_plans(plan_db, name, query, allowed):
+    factory, engine, statements = plan_db
+    async with factory() as db:
+        await query(db)
+    assert statements, f"{name} 没有执行查询"
+    assert await _full_scans(engine, list(statements)) <= allowed
+
+# Test the index migration adds the missing indexes on an existing database and can be reverted
+def test_list_query_index_migration(tmp_path):
+    path = tmp_path / "migrate.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in ("news", "learning", "questions")])
+    with engine.begin() as conn:
+        # 模拟索引加入之前创建的数据库
+        for name in ("ix_news_category_publish_date", "ix_learning_difficulty_id", "ix_questions_view_count"):
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    # 不读取 alembic.ini，否则其中的日志配置会关闭应用已有的日志器
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+    indexes = lambda table: {index["name"]: index["column_names"] for index in inspect(engine).get_indexes(table)}
+    assert indexes("news")["ix_news_category_publish_date"] == ["category", "publish_date", "id"]
+    assert "ix_learning_difficulty_id" in indexes("learning")
+    assert "ix_questions_view_count" in indexes("questions")
+    assert indexes("item_tags")["ix_item_tags_item"] == ["entity_type", "item_id", "tag_id"]
+
+    command.downgrade(config, "5c1e2f7a9d40")
+    assert "ix_news_publish_date" not in indexes("news")
+    assert indexes("item_tags")["ix_item_tags_item"] == ["entity_type", "item_id"]
+    engine.dispose()
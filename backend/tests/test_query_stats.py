@@ -0,0 +1,62 @@
+import json
+import logging
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.query_stats import instrument_queries, statement_shape
+from app.models.questions import Question
+
+def _server_timing(response) -> dict:
+    """Parse the db entry of a Server-Timing header"""
+    entry = next(part for part in response.headers["server-timing"].split(",") if part.strip().startswith("db"))
+    params = dict(param.strip().split("=", 1) for param in entry.split(";")[1:])
+    return {"dur": float(params["dur"]), "queries": int(params["desc"].strip('"').split()[0])}
+
+# Test statements differing only in parameters share a shape
+def test_statement_shape():
+    assert statement_shape("SELECT * FROM q WHERE id = ?") == statement_shape("SELECT *\n  FROM q WHERE id = ?")
+    assert statement_shape("SELECT * FROM q WHERE id IN (?, ?)") == statement_shape("SELECT * FROM q WHERE id IN (?, ?, ?, ?)")
+    assert statement_shape("SELECT * FROM q WHERE id = 'a' LIMIT 5") == "SELECT * FROM q WHERE id = ? LIMIT ?"
+    assert statement_shape("SELECT * FROM q WHERE id = %(id_1)s") == "SELECT * FROM q WHERE id = ?"
+
+# Test per-request query counts appear in Server-Timing and loops are logged as N+1
+@pytest.mark.asyncio
+async def test_related_questions_n_plus_one(async_client: AsyncClient, session_factory, caplog, monkeypatch):
+    instrument_queries(session_factory.kw["bind"].sync_engine, "test")
+    monkeypatch.setattr(settings, "SQL_REPEAT_THRESHOLD", 5)
+
+    related_ids = [str(uuid.uuid4()) for _ in range(6)]
+    main_id = str(uuid.uuid4())
+    async with session_factory() as session:
+        for question_id, related in [(main_id, related_ids)] + [(rid, []) for rid in related_ids]:
+            session.add(Question(
+                id=question_id, title="相关问题", question="相关问题", content="内容", answer="回答",
+                difficulty="基础", categories='["测试"]', related_questions=json.dumps(related),
+                view_count=0, answer_count=0,
+            ))
+        await session.commit()
+
+    response = await async_client.get(f"/api/questions/{main_id}")
+    assert response.status_code == 200
+    single = _server_timing(response)
+    assert single["queries"] >= 1
+
+    with caplog.at_level(logging.WARNING, logger="app"):
+        response = await async_client.get(f"/api/questions/related/{main_id}", params={"limit": 6})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 6
+    assert _server_timing(response)["queries"] >= 7
+    assert any("疑似 N+1 查询" in record.getMessage() for record in caplog.records)
+
+# Test slow queries are logged above the configured threshold
+@pytest.mark.asyncio
+async def test_slow_query_log(async_client: AsyncClient, session_factory, caplog, monkeypatch):
+    instrument_queries(session_factory.kw["bind"].sync_engine, "test")
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app"):
+        response = await async_client.get("/api/questions/most-viewed")
+    assert response.status_code == 200
+    assert any(record.getMessage().startswith("慢查询") for record in caplog.records)
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.database as database
+from app.core.database import Base, WriteQueue, apply_sqlite_pragmas, pool_options, sqlite_pragmas
+from app.models.db.news import News
+from benchmarks.sqlite_concurrency import run
+
+def _engine(path, read_only=False, pool_size=2):
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url, **pool_options(url, pool_size, 0))
+    apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(read_only=read_only))
+    return engine
+
+# Test writer connections use WAL with tuned pragmas and read connections refuse writes
+@pytest.mark.asyncio
+async def test_sqlite_pragmas(tmp_path):
+    writer = _engine(tmp_path / "app.db")
+    reader = _engine(tmp_path / "app.db", read_only=True)
+    try:
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+        async with reader.connect() as conn:
+            assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+            assert (await conn.execute(select(func.count(News.id)))).scalar() == 0
+            with pytest.raises(OperationalError):
+                await conn.execute(text("DELETE FROM news"))
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+# Test queued writes run one at a time in submission order and a failed job only rolls back itself
+@pytest.mark.asyncio
+async def test_write_queue(tmp_path):
+    engine = _engine(tmp_path / "app.db", pool_size=1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    queue = WriteQueue(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    running = []
+
+    async def insert(db, index):
+        running.append(index)
+        assert len(running) == 1
+        db.add(News(id=f"n{index}", title=f"新闻{index}", content="内容"))
+        await asyncio.sleep(0)
+        running.remove(index)
+        if index == 3:
+            raise ValueError("写入失败")
+        return index
+
+    try:
+        results = await asyncio.gather(
+            *(queue.submit(lambda db, index=index: insert(db, index)) for index in range(6)),
+            return_exceptions=True,
+        )
+        assert [type(result).__name__ if isinstance(result, Exception) else result for result in results] == [
+            0, 1, 2, "ValueError", 4, 5,
+        ]
+        async with engine.connect() as conn:
+            ids = (await conn.execute(select(News.id).order_by(News.id))).scalars().all()
+        assert ids == ["n0", "n1", "n2", "n4", "n5"]
+    finally:
+        await queue.stop()
+        await engine.dispose()
+
+# Test stop waits for the running and queued jobs, and cancelling it cancels unfinished jobs
+@pytest.mark.asyncio
+async def test_write_queue_stop(tmp_path):
+    engine = _engine(tmp_path / "app.db", pool_size=1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    queue = WriteQueue(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    started = asyncio.Event()
+
+    async def insert(db, index):
+        started.set()
+        await asyncio.sleep(0.05)
+        db.add(News(id=f"n{index}", title=f"新闻{index}", content="内容"))
+        return index
+
+    try:
+        submitted = [asyncio.ensure_future(queue.submit(lambda db, index=index: insert(db, index))) for index in range(2)]
+        await started.wait()
+        await queue.stop()
+        assert [await future for future in submitted] == [0, 1]
+
+        blocked = asyncio.ensure_future(queue.submit(lambda db: asyncio.Event().wait()))
+        waiting = asyncio.ensure_future(queue.submit(lambda db: insert(db, 9)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(queue.stop(), 0.05)
+        for future in (blocked, waiting):
+            with pytest.raises(asyncio.CancelledError):
+                await future
+        async with engine.connect() as conn:
+            ids = (await conn.execute(select(News.id).order_by(News.id))).scalars().all()
+        assert ids == ["n0", "n1"]
+    finally:
+        await queue.stop()
+        await engine.dispose()
+
+# Test the primary SQLite engine keeps a single writer connection shared with the write queue
+@pytest.mark.skipif(not database.SQLITE_SINGLE_WRITER, reason="只在SQLite使用单独的只读连接池时限制写连接")
+def test_single_writer_engine():
+    assert database.async_engine.pool.size() == 1 and database.async_engine.pool._max_overflow == 0
+    assert database.async_engine.pool.timeout() == database.settings.DB_WRITE_POOL_TIMEOUT
+    assert database.write_queue.session_factory is database.AsyncSessionLocal
+
+# Test the concurrency benchmark reports reads and writes for both profiles
+def test_concurrency_benchmark():
+    results = run(duration=0.3, readers=2, writers=1, batch=5, rows=50)
+    assert [result["profile"] for result in results] == ["default", "tuned"]
+    for result in results:
+        assert result["reads"] > 0 and result["rows_written"] > 0
+        assert result["read_errors"] == result["write_errors"] == 0
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import BACKEND_DIR, compare, run_benchmark
+
+# Test importing the app does not touch the database or load crawler dependencies
+def test_import_has_no_side_effects(tmp_path):
+    db_path = tmp_path / "untouched.db"
+    code = (
+        "import asyncio, json, sys\n"
+        "import app.main\n"
+        "print(json.dumps({'bs4': 'bs4' in sys.modules, 'aiohttp': 'aiohttp' in sys.modules,"
+        " 'tasks': len(asyncio.all_tasks(asyncio.get_event_loop_policy().get_event_loop()))}))\n"
+    )
+    env = {**os.environ, "SQLITE_DB": str(db_path), "DEBUG": "false", "LOG_LEVEL": "WARNING"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == {"bs4": False, "aiohttp": False, "tasks": 0}
+    assert not db_path.exists()
+
+# Test the startup benchmark measures a cold start and flags regressions against a baseline
+def test_startup_benchmark():
+    report = run_benchmark(repeat=1, imports=False)
+    run = report["runs"][0]
+    assert run["status"] == 200
+    assert run["total_ms"] >= run["import_ms"] > 0
+    assert set(report["metrics"]) == {"import_ms", "startup_ms", "first_request_ms", "total_ms"}
+
+    baseline = {"metrics": {metric: {"median": stats["median"] / 2} for metric, stats in report["metrics"].items()}}
+    regressions = compare(report, baseline, max_regression=20)
+    assert len(regressions) == 4
+    assert report["metrics"]["total_ms"]["change_pct"] == 100.0
@@ -0,0 +1,72 @@
+import pytest
+from httpx import AsyncClient
+
+# Test initial sync
+@pytest.mark.asyncio
+async def test_sync_initial(async_client: AsyncClient):
+    response = await async_client.get("/api/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["upserts"].keys()) == {"news", "learning", "questions"}
+    assert set(data["deletes"].keys()) == {"news", "learning", "questions"}
+    assert "nextToken" in data
+    assert data["hasMore"] is False
+
+# Test invalid sync token
+@pytest.mark.asyncio
+async def test_sync_invalid_token(async_client: AsyncClient):
+    response = await async_client.get("/api/sync?since=abc")
+    assert response.status_code == 400
+
+# Test sync returns only changes since the token, including tombstones
+@pytest.mark.asyncio
+async def test_sync_upserts_and_deletes(async_client: AsyncClient):
+    token = (await async_client.get("/api/sync")).json()["nextToken"]
+    
+    new_item = {
+        "title": "同步测试",
+        "shortDescription": "增量同步测试内容",
+        "content": "增量同步测试",
+        "difficulty": "入门",
+        "tags": ["测试"],
+        "relatedItems": []
+    }
+    kept_id = (await async_client.post("/api/learning", json=new_item)).json()["id"]
+    deleted_id = (await async_client.post("/api/learning", json=new_item)).json()["id"]
+    await async_client.put(f"/api/learning/{kept_id}", json={"title": "同步测试-更新"})
+    await async_client.delete(f"/api/learning/{deleted_id}")
+    
+    response = await async_client.get(f"/api/sync?since={token}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["upserts"]["learning"]] == [kept_id]
+    assert data["upserts"]["learning"][0]["title"] == "同步测试-更新"
+    assert data["deletes"]["learning"] == [deleted_id]
+    
+    # 用新游标同步时没有变更
+    next_data = (await async_client.get(f"/api/sync?since={data['nextToken']}")).json()
+    assert next_data["upserts"]["learning"] == []
+    assert next_data["deletes"]["learning"] == []
+    assert next_data["nextToken"] == data["nextToken"]
+
+# Test sync paging
+@pytest.mark.asyncio
+async def test_sync_paging(async_client: AsyncClient):
+    token = (await async_client.get("/api/sync")).json()["nextToken"]
+    new_item = {
+        "title": "分页测试",
+        "shortDescription": "分页测试内容",
+        "content": "分页测试",
+        "difficulty": "入门",
+        "tags": ["测试"],
+        "relatedItems": []
+    }
+    for _ in range(3):
+        await async_client.post("/api/learning", json=new_item)
+    
+    first_page = (await async_client.get(f"/api/sync?since={token}&limit=2")).json()
+    assert first_page["hasMore"] is True
+    assert len(first_page["upserts"]["learning"]) == 2
+    second_page = (await async_client.get(f"/api/sync?since={first_page['nextToken']}&limit=2")).json()
+    assert second_page["hasMore"] is False
+    assert len(second_page["upserts"]["learning"]) == 1
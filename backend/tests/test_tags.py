@@ -0,0 +1,129 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from httpx import AsyncClient
+from sqlalchemy import create_engine, delete, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.db import ItemTag, Tag
+from app.utils.bulk_import import BulkImporter
+from app.utils.db_migration import backfill_tag_index
+from benchmarks.startup import BACKEND_DIR
+
+async def _create(client, title, tags):
+    response = await client.post("/api/learning", json={
+        "title": title, "shortDescription": "摘要", "content": "内容", "difficulty": "入门", "tags": tags,
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def _facets(data):
+    return {facet["name"]: facet["count"] for facet in data["facets"]}
+
+# Test tag filters and facet counts follow creates, updates and deletes
+@pytest.mark.asyncio
+async def test_tag_filter_and_facets(async_client: AsyncClient):
+    first = await _create(async_client, "股票入门", ["股票", "入门"])
+    second = await _create(async_client, "债券入门", ["债券", "入门", " 入门 "])
+    await _create(async_client, "股票进阶", ["股票"])
+
+    data = (await async_client.get("/api/learning")).json()
+    assert data["total"] == 3
+    # 按数量降序，数量相同时按标签名排序
+    assert data["facets"] == [
+        {"name": "入门", "count": 2}, {"name": "股票", "count": 2}, {"name": "债券", "count": 1},
+    ]
+
+    data = (await async_client.get("/api/learning", params={"tag": "入门"})).json()
+    assert sorted(item["title"] for item in data["items"]) == ["债券入门", "股票入门"]
+    assert _facets(data) == {"入门": 2, "股票": 1, "债券": 1}
+
+    data = (await async_client.get("/api/learning", params=[("tag", "入门"), ("tag", "股票")])).json()
+    assert [item["id"] for item in data["items"]] == [first]
+
+    response = await async_client.put(f"/api/learning/{second}", json={"tags": ["债券"]})
+    assert response.status_code == 200
+    await async_client.delete(f"/api/learning/{first}")
+    data = (await async_client.get("/api/learning", params={"tag": "入门"})).json()
+    assert data["total"] == 0 and data["facets"] == []
+    assert _facets((await async_client.get("/api/learning")).json()) == {"股票": 1, "债券": 1}
+
+# Test bulk imports write the index and the backfill rebuilds missing entries
+def test_bulk_import_and_backfill(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tags.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        BulkImporter(session).import_records("news", [
+            {"id": f"n{i}", "title": f"新闻{i}", "content": "内容", "tags": ["利率", f"标签{i % 2}"]}
+            for i in range(4)
+        ])
+        count = select(func.count()).select_from(ItemTag).where(ItemTag.entity_type == "news")
+        assert session.scalar(count) == 8
+        assert sorted(session.scalars(select(Tag.name))) == ["利率", "标签0", "标签1"]
+
+        session.execute(delete(ItemTag).where(ItemTag.item_id.in_(["n0", "n1"])))
+        session.commit()
+        backfill_tag_index(session)
+        assert session.scalar(count) == 8
+        # 再次运行不会重复写入
+        backfill_tag_index(session)
+        assert session.scalar(count) == 8
+    engine.dispose()
+
+# Test the alembic migration creates the index tables and backfills existing rows
+def test_tag_index_migration(tmp_path):
+    path = tmp_path / "migrate.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables["learning"]])
+    with engine.begin() as conn:
+        conn.execute(Base.metadata.tables["learning"].insert(), [
+            {"id": "l1", "title": "标题", "short_description": "摘要", "content": "内容",
+             "difficulty": "入门", "tags": '["股票", "入门"]'},
+            {"id": "l2", "title": "标题", "short_description": "摘要", "content": "内容",
+             "difficulty": "入门", "tags": "不是JSON"},
+        ])
+
+    # 不读取 alembic.ini，否则其中的日志配置会关闭应用已有的日志器
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "5c1e2f7a9d40")
+    with engine.connect() as conn:
+        names = conn.execute(
+            select(Tag.name).join(ItemTag, ItemTag.tag_id == Tag.id).where(ItemTag.item_id == "l1").order_by(Tag.name)
+        ).scalars().all()
+        assert names == ["入门", "股票"]
+    assert "ix_item_tags_item" in [index["name"] for index in inspect(engine).get_indexes("item_tags")]
+
+    command.downgrade(config, "bb97a79e1756")
+    assert "tags" not in inspect(engine).get_table_names()
+    engine.dispose()
+
+# Test a database created with create_all upgrades to head and gets its missing tag entries backfilled
+def test_migrate_create_all_database_to_head(tmp_path):
+    path = tmp_path / "create_all.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        # 批量导入同时写入标签索引
+        BulkImporter(session).import_records("news", [{"id": "n1", "title": "新闻", "content": "内容", "tags": ["利率"]}])
+    with engine.begin() as conn:
+        conn.execute(Base.metadata.tables["learning"].insert(), [
+            {"id": "l1", "title": "标题", "short_description": "摘要", "content": "内容",
+             "difficulty": "入门", "tags": '["股票"]'},
+        ])
+
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(ItemTag.item_id, Tag.name).join(Tag, ItemTag.tag_id == Tag.id).order_by(ItemTag.item_id)
+        ).all()
+        assert [tuple(row) for row in rows] == [("l1", "股票"), ("n1", "利率")]
+        head = ScriptDirectory.from_config(config).get_current_head()
+        assert conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar() == head
+    engine.dispose()
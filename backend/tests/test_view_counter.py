@@ -0,0 +1,76 @@
+import uuid
+import pytest
+from httpx import AsyncClient
+
+from app.models.questions import Question
+from app.services.view_counter import ViewCounter, view_counter
+
+async def _create_question(session_factory, title: str, view_count: int = 0) -> str:
+    async with session_factory() as session:
+        question_id = str(uuid.uuid4())
+        question = Question(
+            id=question_id,
+            title=title,
+            question=title,
+            content="测试内容",
+            answer="测试回答",
+            difficulty="入门",
+            categories='["测试"]',
+            view_count=view_count,
+            answer_count=0
+        )
+        session.add(question)
+        await session.commit()
+        return question_id
+
+async def _stored_view_count(session_factory, question_id: str) -> int:
+    async with session_factory() as session:
+        question = await session.get(Question, question_id)
+        return question.view_count
+
+# Test increments are buffered in memory and flushed in one batch
+@pytest.mark.asyncio
+async def test_flush_batches_increments(async_client: AsyncClient, session_factory):
+    first_id = await _create_question(session_factory, "浏览量测试1", view_count=5)
+    second_id = await _create_question(session_factory, "浏览量测试2")
+    
+    counter = ViewCounter(shards=4)
+    for _ in range(3):
+        counter.increment(first_id)
+    counter.increment(second_id)
+    assert counter.pending(first_id) == 3
+    assert await _stored_view_count(session_factory, first_id) == 5
+    
+    assert await counter.flush(session_factory) == 2
+    assert counter.pending(first_id) == 0
+    assert await _stored_view_count(session_factory, first_id) == 8
+    assert await _stored_view_count(session_factory, second_id) == 1
+    # 没有新增浏览时不写数据库
+    assert await counter.flush(session_factory) == 0
+
+# Test most viewed ranking from in-memory counts
+def test_most_viewed_ranking():
+    counter = ViewCounter(shards=4)
+    for question_id, views in (("a", 3), ("b", 7), ("c", 1), ("d", 5)):
+        counter.increment(question_id, views)
+    assert counter.most_viewed(2) == [("b", 7), ("d", 5)]
+    # 写入数据库后排行仍然保留
+    counter._drain()
+    assert counter.most_viewed(1) == [("b", 7)]
+
+# Test question detail counts views without writing on the read path
+@pytest.mark.asyncio
+async def test_question_detail_counts_view(async_client: AsyncClient, session_factory):
+    question_id = await _create_question(session_factory, "详情浏览测试")
+    
+    first = (await async_client.get(f"/api/questions/{question_id}")).json()
+    second = (await async_client.get(f"/api/questions/{question_id}")).json()
+    assert second["viewCount"] == first["viewCount"] + 1
+    assert await _stored_view_count(session_factory, question_id) == 0
+    
+    response = await async_client.get("/api/questions/most-viewed?limit=50")
+    assert response.status_code == 200
+    assert question_id in [item["id"] for item in response.json()["items"]]
+    
+    await view_counter.flush(session_factory)
+    assert await _stored_view_count(session_factory, question_id) == 2
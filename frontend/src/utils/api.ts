@@ -84,6 +84,12 @@ export const api = {
     })
   },
   
+  // 首页API
+  home: {
+    // 一次请求获取首页所有板块数据
+    get: (limit?: number) => get(`/home${limit ? `?limit=${limit}` : ''}`)
+  },
+  
   // 聊天API
   chat: {
     // 发送消息